@@ -2,10 +2,11 @@ import streamlit as st
 import plotly.graph_objects as go
 import pandas as pd
 from datetime import datetime, timedelta
-import time
-import numpy as np
-from services.data_fetch import get_crypto_data, get_stock_data, search_asset, get_multiple_crypto_data, get_multiple_stock_data
-from services.news_fetch import get_market_news, get_asset_news
+from services.page_data import (load_crypto_data, load_stock_data, load_search, load_price_frame, load_market_news,
+                                load_asset_news, placeholder_article_sentiment, placeholder_sentiment_breakdown,
+                                refresh_market_data)
+from services.screener import get_screener, RSI_COLUMNS
+from services import indicators
 
 # Page Configuration
 st.set_page_config(
@@ -151,6 +152,22 @@ st.markdown(f"""
         color: white !important;
         border-color: {PRIMARY_COLOR} !important;
     }}
+    
+    /* Live watchlists: brief highlight on cards whose price moved */
+    @keyframes price-up-flash {{
+        from {{ background-color: rgba(16, 185, 129, 0.2); }}
+        to {{ background-color: {CARD_BACKGROUND}; }}
+    }}
+    @keyframes price-down-flash {{
+        from {{ background-color: rgba(239, 68, 68, 0.2); }}
+        to {{ background-color: {CARD_BACKGROUND}; }}
+    }}
+    .metric-card.price-up {{
+        animation: price-up-flash 1.5s ease-out;
+    }}
+    .metric-card.price-down {{
+        animation: price-down-flash 1.5s ease-out;
+    }}
 </style>
 """, unsafe_allow_html=True)
 
@@ -171,6 +188,102 @@ if 'detailed_view_asset' not in st.session_state:
     st.session_state.detailed_view_asset = None
 if 'detailed_view_type' not in st.session_state:
     st.session_state.detailed_view_type = None
+if 'watchlist_cards' not in st.session_state:
+    st.session_state.watchlist_cards = {}
+
+# -----------------------------------------------------------
+#  LIVE WATCHLISTS
+# -----------------------------------------------------------
+
+# Each poll reads the page data cache and stores only quotes whose price
+# moved; card HTML is kept per symbol and rebuilt only for those, so the
+# other cards are resent unchanged and the browser leaves them alone.
+
+def poll_watchlist_quotes(symbols, load_quote, quotes):
+    """
+    Update quotes (session state, in place) from the cache and return
+    {symbol: 'up' | 'down' | None} for the symbols whose price changed
+    (None for a first quote). A failed fetch keeps the last good quote.
+    """
+    moves = {}
+    for symbol in symbols:
+        try:
+            data = load_quote(symbol)
+        except Exception:
+            continue
+        if not data or "error" in data:
+            continue
+        price = data.get("current_price", 0)
+        previous = quotes.get(symbol)
+        if previous is None:
+            moves[symbol] = None
+        elif price != previous.get("current_price", 0):
+            moves[symbol] = 'up' if price > previous.get("current_price", 0) else 'down'
+        else:
+            continue
+        quotes[symbol] = data
+    return moves
+
+def prune_watchlist_quotes(asset_type, quotes, symbols):
+    """Forget quotes and cards of symbols taken off a watchlist"""
+    for symbol in [s for s in quotes if s not in symbols]:
+        del quotes[symbol]
+        st.session_state.watchlist_cards.pop((asset_type, symbol), None)
+
+def watchlist_card(asset_type, symbol, data, moves, build_card):
+    """Card HTML for symbol, rebuilt only when its price moved"""
+    cards = st.session_state.watchlist_cards
+    if symbol in moves or (asset_type, symbol) not in cards:
+        cards[(asset_type, symbol)] = build_card(symbol, data, moves.get(symbol))
+    return cards[(asset_type, symbol)]
+
+def price_move_class(move):
+    return f" price-{move}" if move else ""
+
+def crypto_card_html(coin, data, move):
+    current_price = data.get("current_price", 0)
+    change_24h = data.get("price_change_percentage_24h", 0)
+    market_cap = data.get("market_cap", 0)
+    
+    # Format market cap
+    if market_cap >= 1e9:
+        market_cap_str = f"${market_cap/1e9:.1f}B"
+    elif market_cap >= 1e6:
+        market_cap_str = f"${market_cap/1e6:.1f}M"
+    else:
+        market_cap_str = f"${market_cap:,.0f}"
+    
+    return f"""
+    <div class="metric-card{price_move_class(move)}">
+        <h4>{coin.upper()}</h4>
+        <h2>${current_price:,.2f}</h2>
+        <p>24h Change: <span class="{'positive-change' if change_24h >= 0 else 'negative-change'}">
+            {change_24h:+.2f}%
+        </span></p>
+        <p>Market Cap: {market_cap_str}</p>
+    </div>
+    """
+
+def stock_card_html(stock, data, move):
+    current_price = data.get("current_price", 0)
+    day_change_pct = data.get("day_change_pct", 0)
+    volume = data.get("volume", 0)
+    
+    return f"""
+    <div class="metric-card{price_move_class(move)}">
+        <h4>{stock}</h4>
+        <h2>${current_price:,.2f}</h2>
+        <p>Day Change: <span class="{'positive-change' if day_change_pct >= 0 else 'negative-change'}">
+            {day_change_pct:+.2f}%
+        </span></p>
+        <p>Volume: {volume:,.0f}</p>
+    </div>
+    """
+
+def show_live_status(moves, total):
+    if live_mode:
+        st.caption(f"🟢 Live • {len(moves)} of {total} prices changed • "
+                   f"polled {datetime.now().strftime('%H:%M:%S')}")
 
 # Professional Sidebar
 with st.sidebar:
@@ -225,6 +338,15 @@ with st.sidebar:
             value=60,
             format_func=lambda x: f"{x} seconds"
         )
+    live_mode = st.toggle("Live Watchlists", value=False,
+                          help="Poll cached quotes and redraw only the cards whose price changed")
+    if live_mode:
+        live_interval = st.select_slider(
+            "Live Poll Interval",
+            options=[5, 10, 15, 30],
+            value=10,
+            format_func=lambda x: f"{x} seconds"
+        )
     
     st.markdown("---")
     
@@ -244,7 +366,7 @@ with st.sidebar:
     
     if new_cryptos != st.session_state.watchlist_cryptos:
         st.session_state.watchlist_cryptos = new_cryptos
-        st.session_state.crypto_data = {}
+        prune_watchlist_quotes('crypto', st.session_state.crypto_data, new_cryptos)
     
     # Stock Watchlist
     st.caption("Equities")
@@ -259,17 +381,16 @@ with st.sidebar:
     
     if new_stocks != st.session_state.watchlist_stocks:
         st.session_state.watchlist_stocks = new_stocks
-        st.session_state.stock_data = {}
+        prune_watchlist_quotes('stock', st.session_state.stock_data, new_stocks)
     
     st.markdown("---")
     
     # Actions
     col1, col2 = st.columns(2)
     with col1:
+        # Quotes stay on screen; the panels replace them as the refetch comes in
         if st.button("🔄 Refresh", use_container_width=True):
-            st.session_state.crypto_data = {}
-            st.session_state.stock_data = {}
-            st.session_state.news_data = []
+            refresh_market_data(st.session_state.watchlist_cryptos, st.session_state.watchlist_stocks)
             st.session_state.detailed_view_asset = None
             st.session_state.last_update = datetime.now()
             st.rerun()
@@ -295,29 +416,47 @@ with col3:
 
 st.markdown("---")
 
-# Function to generate sample price data (in production, this would come from API)
-def generate_price_data(days=30, volatility=0.02, trend=0.001):
-    dates = pd.date_range(end=datetime.now(), periods=days, freq='D')
-    prices = [100]
-    for i in range(1, days):
-        change = np.random.normal(trend, volatility)
-        prices.append(prices[-1] * (1 + change))
-    return pd.DataFrame({'Date': dates, 'Price': prices})
+# Fragment that shows the detailed view, and refresh intervals (seconds) of
+# the panels that do not follow the sidebar setting
+DETAIL_VIEW_FRAGMENT = "detail_view"
+DETAIL_REFRESH_SECONDS = 120
+NEWS_REFRESH_SECONDS = 300
+
+def open_detailed_view(asset_name, asset_type):
+    """Button callback: show the detailed view without rerunning the rest of the page"""
+    st.session_state.detailed_view_asset = asset_name
+    st.session_state.detailed_view_type = asset_type
+    st.rerun(DETAIL_VIEW_FRAGMENT)
+
+def close_detailed_view():
+    st.session_state.detailed_view_asset = None
+    st.session_state.detailed_view_type = None
+    st.rerun(DETAIL_VIEW_FRAGMENT)
+
+# Daily bars from the cached history provider (flagged synthetic bars if no source answers)
+load_price_data = load_price_frame
+
+def show_synthetic_notice(history):
+    if history.get('synthetic'):
+        st.caption("⚠️ Simulated data: no price history source responded for this asset")
+
+# The detailed view fetches this many daily bars once; every tab shows a slice of them
+DETAIL_HISTORY_DAYS = 365
 
-def generate_volume_data(days=30):
-    dates = pd.date_range(end=datetime.now(), periods=days, freq='D')
-    volumes = np.random.randint(1000000, 5000000, size=days)
-    return pd.DataFrame({'Date': dates, 'Volume': volumes})
+def last_bars(price_data, days):
+    """The most recent `days` rows of a price frame, as a frame of their own"""
+    return price_data.tail(days).reset_index(drop=True)
 
 # Function to create detailed view
 def show_detailed_view(asset_name, asset_type, asset_data):
     st.markdown(f"### 📊 {asset_name.upper()} - Detailed Analysis")
     
     # Back button
-    if st.button("← Back to Dashboard"):
-        st.session_state.detailed_view_asset = None
-        st.session_state.detailed_view_type = None
-        st.rerun()
+    st.button("← Back to Dashboard", on_click=close_detailed_view)
+    
+    # One bar set for all tabs: a single cache entry and upstream fetch per asset
+    price_history_data, history = load_price_data(asset_name, asset_type, days=DETAIL_HISTORY_DAYS,
+                                                  fallback_price=asset_data.get('current_price'))
     
     # Create tabs for different analysis views
     detail_tabs = st.tabs(["📈 Price Analysis", "📊 Volume Analysis", "📉 Technical Indicators", "📰 News & Sentiment"])
@@ -335,15 +474,16 @@ def show_detailed_view(asset_name, asset_type, asset_data):
                 key=f"price_period_{asset_name}"
             )
             
-            # Generate sample price data (in real app, fetch from API)
-            price_data = generate_price_data(days=90)
+            period_days = {"1D": 2, "1W": 7, "1M": 30, "3M": 90, "6M": 180, "1Y": 365, "All": 365}
+            price_data = last_bars(price_history_data, period_days[time_period])
+            show_synthetic_notice(history)
             
             # Create candlestick chart
             fig = go.Figure(data=[go.Candlestick(
                 x=price_data['Date'],
-                open=[p * 0.99 for p in price_data['Price']],
-                high=[p * 1.02 for p in price_data['Price']],
-                low=[p * 0.98 for p in price_data['Price']],
+                open=price_data['Open'],
+                high=price_data['High'],
+                low=price_data['Low'],
                 close=price_data['Price'],
                 name=asset_name
             )])
@@ -412,7 +552,8 @@ def show_detailed_view(asset_name, asset_type, asset_data):
             st.markdown("#### Volume Analysis")
             
             # Volume chart
-            volume_data = generate_volume_data(days=30)
+            volume_data = last_bars(price_history_data, 30)
+            show_synthetic_notice(history)
             
             fig = go.Figure()
             fig.add_trace(go.Bar(
@@ -476,12 +617,13 @@ def show_detailed_view(asset_name, asset_type, asset_data):
         with col1:
             st.markdown("#### Technical Analysis")
             
-            # Generate price data for indicators
-            price_data_ta = generate_price_data(days=100)
+            # Price data for indicators
+            price_data_ta = last_bars(price_history_data, 100)
+            show_synthetic_notice(history)
             
             # Calculate moving averages
-            price_data_ta['MA20'] = price_data_ta['Price'].rolling(window=20).mean()
-            price_data_ta['MA50'] = price_data_ta['Price'].rolling(window=50).mean()
+            price_data_ta['MA20'] = indicators.sma(price_data_ta['Price'], 20)
+            price_data_ta['MA50'] = indicators.sma(price_data_ta['Price'], 50)
             
             # Create chart with moving averages
             fig_ta = go.Figure()
@@ -519,11 +661,7 @@ def show_detailed_view(asset_name, asset_type, asset_data):
             st.plotly_chart(fig_ta, use_container_width=True)
             
             # RSI Calculation
-            delta = price_data_ta['Price'].diff()
-            gain = (delta.where(delta > 0, 0)).rolling(window=14).mean()
-            loss = (-delta.where(delta < 0, 0)).rolling(window=14).mean()
-            rs = gain / loss
-            price_data_ta['RSI'] = 100 - (100 / (1 + rs))
+            price_data_ta['RSI'] = indicators.rsi(price_data_ta['Price'])
             
             # RSI Chart
             fig_rsi = go.Figure()
@@ -607,7 +745,7 @@ def show_detailed_view(asset_name, asset_type, asset_data):
             st.markdown("#### Latest News & Analysis")
             
             try:
-                news = get_asset_news(asset_name)
+                news = load_asset_news(asset_name)
                 if news:
                     for i, article in enumerate(news[:5]):
                         with st.container():
@@ -624,7 +762,7 @@ def show_detailed_view(asset_name, asset_type, asset_data):
                                 </div>
                                 """, unsafe_allow_html=True)
                             with col_b:
-                                sentiment = np.random.choice(['Positive', 'Neutral', 'Negative'])
+                                sentiment = placeholder_article_sentiment(article.get('title', ''))
                                 if sentiment == 'Positive':
                                     sentiment_icon = "📈"
                                     sentiment_color = SUCCESS_COLOR
@@ -650,11 +788,7 @@ def show_detailed_view(asset_name, asset_type, asset_data):
             st.markdown("#### Sentiment Analysis")
             
             # Generate sentiment scores
-            sentiment_scores = {
-                'Positive': np.random.randint(40, 70),
-                'Neutral': np.random.randint(20, 40),
-                'Negative': np.random.randint(10, 30)
-            }
+            sentiment_scores = placeholder_sentiment_breakdown(asset_name)
             
             # Sentiment pie chart
             fig_sentiment = go.Figure(data=[go.Pie(
@@ -684,275 +818,334 @@ def show_detailed_view(asset_name, asset_type, asset_data):
             </div>
             """, unsafe_allow_html=True)
 
-# Check if detailed view is active
-if st.session_state.detailed_view_asset:
-    # Get asset data
-    asset_type = st.session_state.detailed_view_type
+def detailed_view_panel():
+    """Detailed view of the selected asset; renders nothing while none is selected"""
     asset_name = st.session_state.detailed_view_asset
+    if not asset_name:
+        return
     
+    # Get asset data
+    asset_type = st.session_state.detailed_view_type
     if asset_type == 'crypto':
         asset_data = st.session_state.crypto_data.get(asset_name, {})
     else:
         asset_data = st.session_state.stock_data.get(asset_name, {})
     
-    # Show detailed view
     show_detailed_view(asset_name, asset_type, asset_data)
-else:
-    # Create main dashboard tabs
-    tab1, tab2, tab3, tab4 = st.tabs(["💰 Cryptocurrencies", "📊 Equities", "🔍 Asset Search", "📰 Market Intelligence"])
+    st.markdown("---")
 
-    # Tab 1: Cryptocurrencies
-    with tab1:
-        st.markdown('<h2 class="sub-header">Cryptocurrency Markets</h2>', unsafe_allow_html=True)
+def crypto_watchlist_grid():
+    """Crypto watchlist cards"""
+    st.markdown('<h2 class="sub-header">Cryptocurrency Markets</h2>', unsafe_allow_html=True)
+    
+    if not st.session_state.watchlist_cryptos:
+        st.warning("Configure your cryptocurrency watchlist in the sidebar")
+    else:
+        # Quotes come through the page data cache, so timed reruns pick up new
+        # prices; only cards whose price moved are rebuilt
+        moves = poll_watchlist_quotes(st.session_state.watchlist_cryptos, load_crypto_data,
+                                      st.session_state.crypto_data)
+        crypto_data = {coin: st.session_state.crypto_data[coin]
+                       for coin in st.session_state.watchlist_cryptos if coin in st.session_state.crypto_data}
+        show_live_status(moves, len(crypto_data))
         
-        if not st.session_state.watchlist_cryptos:
-            st.warning("Configure your cryptocurrency watchlist in the sidebar")
-        else:
-            # Fetch data
-            crypto_data = {}
+        # Display grid
+        if crypto_data:
+            num_cols = min(4, len(crypto_data))
+            cols = st.columns(num_cols)
             
-            for coin in st.session_state.watchlist_cryptos:
-                if coin in st.session_state.crypto_data:
-                    crypto_data[coin] = st.session_state.crypto_data[coin]
-                else:
-                    try:
-                        data = get_crypto_data(coin)
-                        if "error" not in data:
-                            crypto_data[coin] = data
-                            st.session_state.crypto_data[coin] = data
-                    except:
-                        pass
-            
-            # Display grid
-            if crypto_data:
-                num_cols = min(4, len(crypto_data))
-                cols = st.columns(num_cols)
+            for i, (coin, data) in enumerate(crypto_data.items()):
+                col_idx = i % num_cols
+                if i % num_cols == 0 and i != 0:
+                    cols = st.columns(min(num_cols, len(crypto_data) - i))
                 
-                for i, (coin, data) in enumerate(crypto_data.items()):
-                    col_idx = i % num_cols
-                    if i % num_cols == 0 and i != 0:
-                        cols = st.columns(min(num_cols, len(crypto_data) - i))
-                    
-                    with cols[col_idx]:
-                        if "error" not in data and data:
-                            current_price = data.get("current_price", 0)
-                            change_24h = data.get("price_change_percentage_24h", 0)
-                            market_cap = data.get("market_cap", 0)
-                            
-                            # Format market cap
-                            if market_cap >= 1e9:
-                                market_cap_str = f"${market_cap/1e9:.1f}B"
-                            elif market_cap >= 1e6:
-                                market_cap_str = f"${market_cap/1e6:.1f}M"
-                            else:
-                                market_cap_str = f"${market_cap:,.0f}"
-                            
-                            # Display card
-                            st.markdown(f"""
-                            <div class="metric-card">
-                                <h4>{coin.upper()}</h4>
-                                <h2>${current_price:,.2f}</h2>
-                                <p>24h Change: <span class="{'positive-change' if change_24h >= 0 else 'negative-change'}">
-                                    {change_24h:+.2f}%
-                                </span></p>
-                                <p>Market Cap: {market_cap_str}</p>
-                            </div>
-                            """, unsafe_allow_html=True)
-                            
-                            # Detailed View Button
-                            if st.button("📈 Detailed Analysis", key=f"crypto_detail_{coin}", use_container_width=True):
-                                st.session_state.detailed_view_asset = coin
-                                st.session_state.detailed_view_type = 'crypto'
-                                st.rerun()
-
-    # Tab 2: Stocks
-    with tab2:
-        st.markdown('<h2 class="sub-header">Equity Markets</h2>', unsafe_allow_html=True)
+                with cols[col_idx]:
+                    if "error" not in data and data:
+                        # Display card
+                        st.markdown(watchlist_card('crypto', coin, data, moves, crypto_card_html),
+                                    unsafe_allow_html=True)
+                        
+                        # Detailed View Button
+                        st.button("📈 Detailed Analysis", key=f"crypto_detail_{coin}", use_container_width=True,
+                                  on_click=open_detailed_view, args=(coin, 'crypto'))
+
+def stock_watchlist_grid():
+    """Equity watchlist cards"""
+    st.markdown('<h2 class="sub-header">Equity Markets</h2>', unsafe_allow_html=True)
+    
+    if not st.session_state.watchlist_stocks:
+        st.warning("Configure your equity watchlist in the sidebar")
+    else:
+        # Quotes come through the page data cache, so timed reruns pick up new
+        # prices; only cards whose price moved are rebuilt
+        moves = poll_watchlist_quotes(st.session_state.watchlist_stocks, load_stock_data,
+                                      st.session_state.stock_data)
+        stock_data = {stock: st.session_state.stock_data[stock]
+                      for stock in st.session_state.watchlist_stocks if stock in st.session_state.stock_data}
+        show_live_status(moves, len(stock_data))
         
-        if not st.session_state.watchlist_stocks:
-            st.warning("Configure your equity watchlist in the sidebar")
-        else:
-            # Fetch data
-            stock_data = {}
+        # Display grid
+        if stock_data:
+            num_cols = min(4, len(stock_data))
+            cols = st.columns(num_cols)
             
-            for stock in st.session_state.watchlist_stocks:
-                if stock in st.session_state.stock_data:
-                    stock_data[stock] = st.session_state.stock_data[stock]
-                else:
-                    try:
-                        data = get_stock_data(stock)
-                        if "error" not in data:
-                            stock_data[stock] = data
-                            st.session_state.stock_data[stock] = data
-                    except:
-                        pass
-            
-            # Display grid
-            if stock_data:
-                num_cols = min(4, len(stock_data))
-                cols = st.columns(num_cols)
+            for i, (stock, data) in enumerate(stock_data.items()):
+                col_idx = i % num_cols
+                if i % num_cols == 0 and i != 0:
+                    cols = st.columns(min(num_cols, len(stock_data) - i))
                 
-                for i, (stock, data) in enumerate(stock_data.items()):
-                    col_idx = i % num_cols
-                    if i % num_cols == 0 and i != 0:
-                        cols = st.columns(min(num_cols, len(stock_data) - i))
+                with cols[col_idx]:
+                    if "error" not in data and data:
+                        st.markdown(watchlist_card('stock', stock, data, moves, stock_card_html),
+                                    unsafe_allow_html=True)
+                        
+                        # Detailed View Button
+                        st.button("📈 Detailed Analysis", key=f"stock_detail_{stock}", use_container_width=True,
+                                  on_click=open_detailed_view, args=(stock, 'stock'))
+
+def asset_search_panel():
+    """Asset search; typing here only reruns this panel"""
+    st.markdown('<h2 class="sub-header">Asset Intelligence Search</h2>', unsafe_allow_html=True)
+    
+    col1, col2 = st.columns([4, 1])
+    with col1:
+        query = st.text_input(
+            "Search for any asset (cryptocurrency or equity)",
+            placeholder="e.g., 'bitcoin', 'AAPL', 'ethereum', 'TSLA'",
+            help="Enter the name or ticker symbol of any asset"
+        )
+    
+    with col2:
+        st.write("")
+        st.write("")
+        search_clicked = st.button("🔍 Search", type="primary", use_container_width=True)
+    
+    if query or search_clicked:
+        with st.spinner("Analyzing asset data..."):
+            try:
+                result = load_search(query)
+                
+                if "error" not in result:
+                    asset_type = result["type"]
+                    data = result["data"]
                     
-                    with cols[col_idx]:
-                        if "error" not in data and data:
-                            current_price = data.get("current_price", 0)
-                            day_change_pct = data.get("day_change_pct", 0)
-                            volume = data.get("volume", 0)
-                            
-                            st.markdown(f"""
-                            <div class="metric-card">
-                                <h4>{stock}</h4>
-                                <h2>${current_price:,.2f}</h2>
-                                <p>Day Change: <span class="{'positive-change' if day_change_pct >= 0 else 'negative-change'}">
-                                    {day_change_pct:+.2f}%
-                                </span></p>
-                                <p>Volume: {volume:,.0f}</p>
-                            </div>
-                            """, unsafe_allow_html=True)
-                            
-                            # Detailed View Button
-                            if st.button("📈 Detailed Analysis", key=f"stock_detail_{stock}", use_container_width=True):
-                                st.session_state.detailed_view_asset = stock
-                                st.session_state.detailed_view_type = 'stock'
-                                st.rerun()
-
-    # Tab 3: Search (same as before)
-    with tab3:
-        st.markdown('<h2 class="sub-header">Asset Intelligence Search</h2>', unsafe_allow_html=True)
-        
-        col1, col2 = st.columns([4, 1])
-        with col1:
-            query = st.text_input(
-                "Search for any asset (cryptocurrency or equity)",
-                placeholder="e.g., 'bitcoin', 'AAPL', 'ethereum', 'TSLA'",
-                help="Enter the name or ticker symbol of any asset"
-            )
-        
-        with col2:
-            st.write("")
-            st.write("")
-            search_clicked = st.button("🔍 Search", type="primary", use_container_width=True)
-        
-        if query or search_clicked:
-            with st.spinner("Analyzing asset data..."):
-                try:
-                    result = search_asset(query)
+                    st.success(f"Asset identified: **{data.get('name', query.upper())}** ({asset_type.upper()})")
                     
-                    if "error" not in result:
-                        asset_type = result["type"]
-                        data = result["data"]
-                        
-                        st.success(f"Asset identified: **{data.get('name', query.upper())}** ({asset_type.upper()})")
-                        
-                        # Asset details
-                        col1, col2 = st.columns([3, 1])
+                    # Asset details
+                    col1, col2 = st.columns([3, 1])
+                    
+                    with col1:
+                        st.markdown("#### 📈 Key Metrics")
                         
-                        with col1:
-                            st.markdown("#### 📈 Key Metrics")
-                            
-                            if asset_type == "crypto":
-                                current_price = data.get('current_price', 0)
-                                change_24h = data.get('price_change_percentage_24h', 0)
-                                
-                                metrics_cols = st.columns(4)
-                                with metrics_cols[0]:
-                                    st.metric("Price", f"${current_price:,.2f}", f"{change_24h:+.2f}%")
-                                with metrics_cols[1]:
-                                    st.metric("Market Cap", f"${data.get('market_cap', 0):,.0f}")
-                                with metrics_cols[2]:
-                                    st.metric("24h Volume", f"${data.get('total_volume', 0):,.0f}")
-                                with metrics_cols[3]:
-                                    high_low = f"${data.get('high_24h', 0):,.0f} / ${data.get('low_24h', 0):,.0f}"
-                                    st.metric("24h Range", high_low)
+                        if asset_type == "crypto":
+                            current_price = data.get('current_price', 0)
+                            change_24h = data.get('price_change_percentage_24h', 0)
                             
-                            else:  # stock
-                                current_price = data.get('current_price', 0)
-                                day_change = data.get('day_change', 0)
-                                
-                                metrics_cols = st.columns(4)
-                                with metrics_cols[0]:
-                                    st.metric("Price", f"${current_price:,.2f}", f"${day_change:+.2f}")
-                                with metrics_cols[1]:
-                                    st.metric("Day High", f"${data.get('high', 0):,.2f}")
-                                with metrics_cols[2]:
-                                    st.metric("Day Low", f"${data.get('low', 0):,.2f}")
-                                with metrics_cols[3]:
-                                    st.metric("Volume", f"{data.get('volume', 0):,.0f}")
+                            metrics_cols = st.columns(4)
+                            with metrics_cols[0]:
+                                st.metric("Price", f"${current_price:,.2f}", f"{change_24h:+.2f}%")
+                            with metrics_cols[1]:
+                                st.metric("Market Cap", f"${data.get('market_cap', 0):,.0f}")
+                            with metrics_cols[2]:
+                                st.metric("24h Volume", f"${data.get('total_volume', 0):,.0f}")
+                            with metrics_cols[3]:
+                                high_low = f"${data.get('high_24h', 0):,.0f} / ${data.get('low_24h', 0):,.0f}"
+                                st.metric("24h Range", high_low)
                         
-                        with col2:
-                            st.markdown("#### ⚡ Actions")
-                            if st.button("📈 Open Detailed View", use_container_width=True):
-                                st.session_state.detailed_view_asset = query.lower() if asset_type == 'crypto' else query.upper()
-                                st.session_state.detailed_view_type = asset_type
-                                st.rerun()
+                        else:  # stock
+                            current_price = data.get('current_price', 0)
+                            day_change = data.get('day_change', 0)
+                            
+                            metrics_cols = st.columns(4)
+                            with metrics_cols[0]:
+                                st.metric("Price", f"${current_price:,.2f}", f"${day_change:+.2f}")
+                            with metrics_cols[1]:
+                                st.metric("Day High", f"${data.get('high', 0):,.2f}")
+                            with metrics_cols[2]:
+                                st.metric("Day Low", f"${data.get('low', 0):,.2f}")
+                            with metrics_cols[3]:
+                                st.metric("Volume", f"{data.get('volume', 0):,.0f}")
                     
-                    else:
-                        st.error("Asset not found")
+                    with col2:
+                        st.markdown("#### ⚡ Actions")
+                        st.button("📈 Open Detailed View", use_container_width=True, on_click=open_detailed_view,
+                                  args=(query.lower() if asset_type == 'crypto' else query.upper(), asset_type))
                 
-                except Exception as e:
-                    st.error("Search failed. Please try again.")
+                else:
+                    st.error("Asset not found")
+            
+            except Exception as e:
+                st.error("Search failed. Please try again.")
 
-    # Tab 4: News (same as before)
-    with tab4:
-        st.markdown('<h2 class="sub-header">Market Intelligence</h2>', unsafe_allow_html=True)
-        
-        col1, col2 = st.columns([2, 1])
+def market_news_panel():
+    """Market news for the selected category"""
+    st.markdown('<h2 class="sub-header">Market Intelligence</h2>', unsafe_allow_html=True)
+    
+    col1, col2 = st.columns([2, 1])
+    with col1:
+        news_category = st.selectbox(
+            "Category",
+            ["General Market", "Cryptocurrency", "Stocks", "Economy", "Technology"],
+            label_visibility="collapsed"
+        )
+    
+    with col2:
+        if st.button("🔄 Refresh News", use_container_width=True):
+            load_market_news.clear()
+    
+    category_map = {
+        "General Market": "financial market",
+        "Cryptocurrency": "cryptocurrency",
+        "Stocks": "stock market",
+        "Economy": "economy",
+        "Technology": "technology stocks"
+    }
+    
+    # Cached per category; timed reruns pick up new headlines when the cache expires
+    with st.spinner("Gathering market intelligence..."):
+        try:
+            news = load_market_news(category_map.get(news_category, "financial market"))
+            if news:
+                st.session_state.news_data = news
+        except:
+            st.error("Failed to load news")
+    
+    if st.session_state.news_data:
+        for i, article in enumerate(st.session_state.news_data[:8]):
+            if isinstance(article, dict):
+                title = article.get('title', 'No Title')
+                url = article.get('url', '#')
+                summary = article.get('summary', article.get('description', ''))
+                source = article.get('source', 'Unknown')
+                
+                col1, col2 = st.columns([5, 1])
+                with col1:
+                    st.markdown(f"""
+                    <div style="background: {CARD_BACKGROUND}; padding: 1.25rem; border-radius: 8px; border: 1px solid {BORDER_COLOR}; box-shadow: 0 1px 2px rgba(0, 0, 0, 0.05); margin-bottom: 1rem;">
+                        <h4 style="color: {SECONDARY_COLOR}; font-size: 1rem; font-weight: 600; margin-bottom: 0.5rem;">{title}</h4>
+                        <p style="color: #64748B; font-size: 0.875rem; line-height: 1.5; margin-bottom: 0.5rem;">{summary[:200]}...</p>
+                        <small style="color: #94A3B8;">Source: {source}</small>
+                    </div>
+                    """, unsafe_allow_html=True)
+                
+                with col2:
+                    if st.button("→", key=f"read_{i}", help="Open article"):
+                        st.markdown(f"[Open]({url})")
+                
+                if i < len(st.session_state.news_data[:8]) - 1:
+                    st.markdown("---")
+
+def screener_panel():
+    """Screener filters and results; filter changes only rerun this panel"""
+    st.markdown('<h2 class="sub-header">Market Screener</h2>', unsafe_allow_html=True)
+    
+    screener = get_screener()
+    if not len(screener.table):
+        with st.spinner("Loading market universe..."):
+            screener.ensure_fresh()
+    else:
+        screener.start()
+    
+    table = screener.table
+    if not len(table):
+        st.warning(f"Screener data unavailable: {screener.last_error or 'no quotes yet'} • retrying every {screener.retry_seconds}s")
+    else:
+        col1, col2, col3, col4 = st.columns(4)
         with col1:
-            news_category = st.selectbox(
-                "Category",
-                ["General Market", "Cryptocurrency", "Stocks", "Economy", "Technology"],
-                label_visibility="collapsed"
-            )
+            universe = st.selectbox("Universe", ["All Assets", "Cryptocurrencies", "Equities"])
+        with col2:
+            min_change = st.number_input("Min Change %", value=-100.0, step=1.0)
+        with col3:
+            min_volume = st.number_input("Min Volume ($)", value=0.0, step=1_000_000.0, format="%.0f",
+                                         help="24h crypto volume; last session's close x shares for equities")
+        with col4:
+            min_market_cap = st.number_input("Min Market Cap", value=0.0, step=100_000_000.0, format="%.0f",
+                                             help="Equities have no market cap in bulk quotes and are excluded when this is set")
         
+        col1, col2, col3 = st.columns([2, 1, 1])
+        with col1:
+            rsi_range = st.slider("RSI Range", 0, 100, (0, 100))
+            rsi_interval = st.radio("RSI Bars", list(RSI_COLUMNS), horizontal=True,
+                                    help="Crypto RSI uses the 7-day hourly sparkline, equity RSI daily closes; "
+                                         "an RSI filter keeps only assets quoted at that interval")
         with col2:
-            if st.button("🔄 Refresh News", use_container_width=True):
-                st.session_state.news_data = []
+            sort_options = {"Volume ($)": "volume", "Change %": "change_pct", "Market Cap": "market_cap",
+                            "RSI 1h": "rsi_hourly", "RSI 1d": "rsi_daily", "Price": "price"}
+            sort_label = st.selectbox("Sort By", list(sort_options))
+        with col3:
+            limit = st.selectbox("Show", [25, 50, 100, 250])
+            descending = st.checkbox("Descending", value=True)
         
-        category_map = {
-            "General Market": "financial market",
-            "Cryptocurrency": "cryptocurrency",
-            "Stocks": "stock market",
-            "Economy": "economy",
-            "Technology": "technology stocks"
+        filters = {
+            "change_pct": (min_change if min_change > -100 else None, None),
+            "volume": (min_volume or None, None),
+            "market_cap": (min_market_cap or None, None),
+            RSI_COLUMNS[rsi_interval]: (None, None) if rsi_range == (0, 100) else rsi_range
         }
+        asset_type = {"Cryptocurrencies": "crypto", "Equities": "stock"}.get(universe)
+        rows = table.query(asset_type=asset_type, filters=filters, sort_by=sort_options[sort_label],
+                           descending=descending, limit=limit)
         
-        if not st.session_state.news_data:
-            with st.spinner("Gathering market intelligence..."):
-                try:
-                    news = get_market_news(category_map.get(news_category, "financial market"))
-                    if news:
-                        st.session_state.news_data = news
-                except:
-                    st.error("Failed to load news")
+        st.caption(f"{len(rows)} matches from {len(table)} assets • Updated {datetime.fromtimestamp(table.updated_at).strftime('%H:%M:%S')}")
+        st.dataframe(
+            table.to_frame(rows),
+            use_container_width=True,
+            hide_index=True,
+            column_config={
+                "Price": st.column_config.NumberColumn(format="$%.4g"),
+                "Change %": st.column_config.NumberColumn(format="%+.2f%%"),
+                "Volume ($)": st.column_config.NumberColumn(format="%.3e"),
+                "Market Cap": st.column_config.NumberColumn(format="%.3e"),
+                "RSI 1h": st.column_config.NumberColumn(format="%.1f"),
+                "RSI 1d": st.column_config.NumberColumn(format="%.1f")
+            }
+        )
         
-        if st.session_state.news_data:
-            for i, article in enumerate(st.session_state.news_data[:8]):
-                if isinstance(article, dict):
-                    title = article.get('title', 'No Title')
-                    url = article.get('url', '#')
-                    summary = article.get('summary', article.get('description', ''))
-                    source = article.get('source', 'Unknown')
-                    
-                    col1, col2 = st.columns([5, 1])
-                    with col1:
-                        st.markdown(f"""
-                        <div style="background: {CARD_BACKGROUND}; padding: 1.25rem; border-radius: 8px; border: 1px solid {BORDER_COLOR}; box-shadow: 0 1px 2px rgba(0, 0, 0, 0.05); margin-bottom: 1rem;">
-                            <h4 style="color: {SECONDARY_COLOR}; font-size: 1rem; font-weight: 600; margin-bottom: 0.5rem;">{title}</h4>
-                            <p style="color: #64748B; font-size: 0.875rem; line-height: 1.5; margin-bottom: 0.5rem;">{summary[:200]}...</p>
-                            <small style="color: #94A3B8;">Source: {source}</small>
-                        </div>
-                        """, unsafe_allow_html=True)
-                    
-                    with col2:
-                        if st.button("→", key=f"read_{i}", help="Open article"):
-                            st.markdown(f"[Open]({url})")
-                    
-                    if i < len(st.session_state.news_data[:8]) - 1:
-                        st.markdown("---")
+        # Hand a result over to the detailed view
+        if len(rows):
+            matches = table.records(rows)
+            col1, col2 = st.columns([3, 1])
+            with col1:
+                selected = st.selectbox(
+                    "Open in detailed view",
+                    range(len(matches)),
+                    format_func=lambda i: f"{matches[i]['symbol']} - {matches[i]['name']}",
+                    label_visibility="collapsed"
+                )
+            with col2:
+                match = matches[selected]
+                st.button("📈 Detailed Analysis", key="screener_detail", use_container_width=True,
+                          on_click=open_detailed_view,
+                          args=(match["id"] if match["asset_type"] == "crypto" else match["symbol"], match["asset_type"]))
+
+# Each panel is a fragment: its own widgets and timer rerun only that panel.
+# Opening or closing the detailed view reruns just the detail panel; live
+# watchlists poll at their own, shorter interval.
+if live_mode:
+    watchlist_refresh = live_interval
+else:
+    watchlist_refresh = refresh_rate if auto_refresh else None
+
+st.fragment(detailed_view_panel, key=DETAIL_VIEW_FRAGMENT,
+            run_every=DETAIL_REFRESH_SECONDS if auto_refresh else None)()
+
+# Create main dashboard tabs
+tab1, tab2, tab3, tab4, tab5 = st.tabs(["💰 Cryptocurrencies", "📊 Equities", "🔍 Asset Search", "📰 Market Intelligence", "🧮 Screener"])
+
+with tab1:
+    st.fragment(crypto_watchlist_grid, run_every=watchlist_refresh)()
+
+with tab2:
+    st.fragment(stock_watchlist_grid, run_every=watchlist_refresh)()
+
+with tab3:
+    st.fragment(asset_search_panel)()
+
+with tab4:
+    st.fragment(market_news_panel, run_every=NEWS_REFRESH_SECONDS if auto_refresh else None)()
+
+with tab5:
+    st.fragment(screener_panel)()
 
 # Professional Footer
 st.markdown("""
@@ -980,8 +1173,3 @@ st.markdown("""
 # Update timestamp
 if not st.session_state.last_update:
     st.session_state.last_update = datetime.now()
-
-# Auto-refresh
-if auto_refresh:
-    time.sleep(refresh_rate)
-    st.rerun()
\ No newline at end of file
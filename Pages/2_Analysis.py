@@ -1,13 +1,16 @@
 import streamlit as st
-from services.ai_engine import ai_market_analysis
-from services.data_fetch import get_crypto_price, get_stock_price, get_multi_source_price
-from services.news_fetch import get_market_news
+from services.ai_engine import stream_ai_market_analysis, warm_up_llama, ANALYSIS_SECTIONS
+from services.analysis_queue import ANALYSIS_JOB_TIMEOUT, QueueFullError, get_analysis_queue
+from services.page_data import (load_crypto_price, load_stock_price, load_multi_source_price, load_historical_data,
+                                load_market_news, placeholder_sentiment_score)
+from services import indicators
+from services.indicators import last_valid
 import plotly.graph_objects as go
 import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
 import time
-import yfinance as yf
+import uuid
 
 st.set_page_config(page_title="AI Market Analyst Pro", layout="wide", page_icon="📈")
 
@@ -202,9 +205,11 @@ session_defaults = {
     'symbol': "",
     'news_data': [],
     'historical_data': None,
+    'historical_data_synthetic': False,
     'analysis_history': [],
     'user_trust_score': 85,
-    'last_symbol': ''
+    'last_symbol': '',
+    'session_id': uuid.uuid4().hex
 }
 
 for key, value in session_defaults.items():
@@ -212,78 +217,6 @@ for key, value in session_defaults.items():
         st.session_state[key] = value
 
 # Helper functions for data fetching
-def get_historical_data(symbol, period="1mo"):
-    """Get historical data for a symbol"""
-    try:
-        # For crypto symbols
-        if len(symbol) <= 5:
-            ticker_map = {
-                'BTC': 'BTC-USD', 'ETH': 'ETH-USD', 'BNB': 'BNB-USD', 
-                'XRP': 'XRP-USD', 'ADA': 'ADA-USD', 'DOGE': 'DOGE-USD',
-                'SOL': 'SOL-USD', 'DOT': 'DOT-USD', 'AVAX': 'AVAX-USD',
-                'MATIC': 'MATIC-USD', 'LTC': 'LTC-USD', 'UNI': 'UNI-USD'
-            }
-            yf_symbol = ticker_map.get(symbol.upper(), f"{symbol.upper()}-USD")
-        else:
-            yf_symbol = symbol.upper()
-        
-        period_map = {
-            "1D": "5d", "1W": "1wk", "1M": "1mo", 
-            "3M": "3mo", "6M": "6mo", "1Y": "1y"
-        }
-        yf_period = period_map.get(period, "1mo")
-        
-        ticker = yf.Ticker(yf_symbol)
-        hist = ticker.history(period=yf_period)
-        
-        if hist.empty or len(hist) < 2:
-            # Create simulated data
-            days = 30
-            dates = pd.date_range(end=datetime.now(), periods=days, freq='D')
-            base_price = np.random.uniform(50, 500)
-            prices = base_price + np.cumsum(np.random.randn(days) * 5)
-            
-            hist = pd.DataFrame({
-                'Open': prices * 0.99,
-                'High': prices * 1.02,
-                'Low': prices * 0.98,
-                'Close': prices,
-                'Volume': np.random.randint(1000000, 10000000, days)
-            }, index=dates)
-        
-        # Format data
-        historical_data = []
-        for idx, row in hist.iterrows():
-            historical_data.append({
-                'timestamp': idx,
-                'open': float(row['Open']),
-                'high': float(row['High']),
-                'low': float(row['Low']),
-                'close': float(row['Close']),
-                'volume': float(row['Volume'])
-            })
-        
-        return historical_data
-        
-    except Exception as e:
-        # Return simulated data on error
-        days = 30
-        dates = pd.date_range(end=datetime.now(), periods=days, freq='D')
-        base_price = 100
-        prices = base_price + np.cumsum(np.random.randn(days) * 5)
-        
-        historical_data = []
-        for i, date in enumerate(dates):
-            historical_data.append({
-                'timestamp': date,
-                'open': prices[i] * 0.99,
-                'high': prices[i] * 1.02,
-                'low': prices[i] * 0.98,
-                'close': prices[i],
-                'volume': np.random.randint(1000000, 5000000)
-            })
-        return historical_data
-
 def get_advanced_metrics(symbol, historical_data=None):
     """Get advanced market metrics"""
     try:
@@ -291,16 +224,8 @@ def get_advanced_metrics(symbol, historical_data=None):
             prices = np.array([h['close'] for h in historical_data])
             
             # Calculate RSI
-            if len(prices) >= 14:
-                gains = np.where(np.diff(prices) > 0, np.diff(prices), 0)
-                losses = np.where(np.diff(prices) < 0, -np.diff(prices), 0)
-                avg_gain = np.mean(gains[-14:])
-                avg_loss = np.mean(losses[-14:])
-                if avg_loss == 0:
-                    rsi = 100
-                else:
-                    rs = avg_gain / avg_loss
-                    rsi = 100 - (100 / (1 + rs))
+            if len(prices) > 14:
+                rsi = last_valid(indicators.rsi(prices))
             else:
                 rsi = np.random.uniform(30, 70)
             
@@ -313,15 +238,13 @@ def get_advanced_metrics(symbol, historical_data=None):
             
             # Calculate MACD
             if len(prices) >= 26:
-                ema12 = pd.Series(prices).ewm(span=12).mean().iloc[-1]
-                ema26 = pd.Series(prices).ewm(span=26).mean().iloc[-1]
-                macd = ema12 - ema26
+                macd = last_valid(indicators.macd(prices)[0])
             else:
                 macd = np.random.uniform(-1, 1)
             
             # Determine trend
             if len(prices) >= 20:
-                sma20 = np.mean(prices[-20:])
+                sma20 = last_valid(indicators.sma(prices, 20))
                 current_price = prices[-1]
                 trend = 'Bullish' if current_price > sma20 else 'Bearish'
             else:
@@ -368,19 +291,6 @@ def get_advanced_metrics(symbol, historical_data=None):
             'resistance_level': 0
         }
 
-def get_sentiment_score(symbol):
-    """Get market sentiment score"""
-    try:
-        base_scores = {
-            'BTC': 0.7, 'ETH': 0.6, 'AAPL': 0.5, 'TSLA': 0.4,
-            'GOOGL': 0.6, 'AMZN': 0.5, 'MSFT': 0.7, 'NVDA': 0.8
-        }
-        base_score = base_scores.get(symbol.upper(), 0.5)
-        sentiment = base_score + np.random.uniform(-0.2, 0.2)
-        return max(-1, min(1, sentiment))
-    except:
-        return 0.0
-
 def calculate_position_size(account_size, risk_per_trade, stop_loss, entry_price):
     """Calculate position size based on risk management"""
     if entry_price <= 0 or stop_loss <= 0:
@@ -477,6 +387,8 @@ with st.sidebar:
         index=0,
         label_visibility="collapsed"
     )
+    if 'Llama' in ai_engine:
+        warm_up_llama()
     
     st.markdown("---")
     
@@ -531,26 +443,30 @@ if analyze_button and symbol:
             # Step 2: Fetch current data
             status_text.text(steps[1])
             current_data = None
+            asset_type = None
             
             # Try crypto
             if len(symbol) <= 5:
-                crypto_data = get_crypto_price(symbol.lower())
+                crypto_data = load_crypto_price(symbol.lower())
                 if crypto_data and 'price' in crypto_data:
                     current_data = crypto_data
+                    asset_type = 'crypto'
                     st.success(f"✅ Found cryptocurrency: {symbol}")
             
             # Try stock
             if not current_data:
-                stock_data = get_stock_price(symbol.upper())
+                stock_data = load_stock_price(symbol.upper())
                 if stock_data and 'price' in stock_data:
                     current_data = stock_data
+                    asset_type = 'stock'
                     st.success(f"✅ Found stock: {symbol}")
             
             # Try multi-source
             if not current_data:
-                multi_data = get_multi_source_price(symbol)
+                multi_data = load_multi_source_price(symbol)
                 if multi_data:
                     current_data = multi_data
+                    asset_type = multi_data.get('type')
             
             if not current_data:
                 # Create simulated data
@@ -566,10 +482,15 @@ if analyze_button and symbol:
             
             # Step 3: Historical data
             status_text.text(steps[2])
-            historical_data = get_historical_data(symbol, period=time_frame)
+            historical_data, history = load_historical_data(symbol, period=time_frame, asset_type=asset_type,
+                                                            fallback_price=current_data.get('price'))
             st.session_state.historical_data = historical_data
+            st.session_state.historical_data_synthetic = bool(history.get('synthetic'))
             
-            if historical_data and len(historical_data) > 0:
+            if history.get('synthetic'):
+                st.warning(f"⚠️ No price history source responded for {symbol}: "
+                           "charts and indicators use simulated data")
+            elif historical_data and len(historical_data) > 0:
                 st.success(f"✅ Loaded {len(historical_data)} days of historical data")
             else:
                 st.warning("⚠️ Limited historical data available")
@@ -580,7 +501,7 @@ if analyze_button and symbol:
             status_text.text(steps[3])
             news_data = []
             try:
-                news_data = get_market_news(query=symbol)
+                news_data = load_market_news(query=symbol)
                 if news_data:
                     st.success(f"✅ Found {len(news_data)} news articles")
             except Exception as e:
@@ -594,7 +515,7 @@ if analyze_button and symbol:
                 }]
             
             st.session_state.news_data = news_data
-            sentiment_score = get_sentiment_score(symbol)
+            sentiment_score = placeholder_sentiment_score(symbol)
             
             progress_bar.progress(65)
             
@@ -604,15 +525,59 @@ if analyze_button and symbol:
             # Prepare data for AI analysis
             analysis_data = {
                 'symbol': symbol,
-                'crypto_data': current_data if len(symbol) <= 5 else None,
-                'stock_data': current_data if len(symbol) > 5 else None,
+                'crypto_data': current_data if asset_type == 'crypto' else None,
+                'stock_data': current_data if asset_type != 'crypto' else None,
                 'news_data': news_data,
                 'use': 'llama' if 'Llama' in ai_engine else 'openai'
             }
             
             try:
-                # Run AI analysis
-                analysis = ai_market_analysis(**analysis_data)
+                # Run AI analysis on the shared worker pool, rendering each section
+                # as soon as the model finishes it
+                analysis_queue = get_analysis_queue()
+                try:
+                    job = analysis_queue.submit(st.session_state.session_id, stream_ai_market_analysis,
+                                                **analysis_data)
+                except QueueFullError as e:
+                    # Nothing was analysed: say so instead of showing a made-up analysis
+                    progress_bar.empty()
+                    status_text.empty()
+                    st.error(f"⏳ {e}")
+                    st.stop()
+                live_output = st.empty()
+                streamed_text = ""
+                cursor = 0
+                deadline = time.time() + ANALYSIS_JOB_TIMEOUT
+                while True:
+                    finished = job.finished
+                    events, cursor = job.read_events(cursor)
+                    if job.status == 'queued':
+                        live_output.caption(f"⏳ Waiting for AI engine (position {analysis_queue.position(job.id) + 1} in queue)")
+                    for event in events:
+                        if event['type'] == 'token':
+                            streamed_text += event['text']
+                            live_output.caption(streamed_text[-300:])
+                        elif event['type'] == 'section' and event['text']:
+                            section_title = ANALYSIS_SECTIONS.get(event['section'], event['section']).title()
+                            with st.expander(f"🧠 {section_title}", expanded=event['section'] == 'technical_analysis'):
+                                st.markdown(event['text'])
+                    if finished:
+                        break
+                    if time.time() > deadline:
+                        analysis_queue.cancel(job.id)
+                        live_output.empty()
+                        progress_bar.empty()
+                        status_text.empty()
+                        st.error(f"⌛ AI analysis did not finish within {ANALYSIS_JOB_TIMEOUT} seconds and was "
+                                 "cancelled. Please try again.")
+                        st.stop()
+                    time.sleep(0.1)
+                live_output.empty()
+                if job.error:
+                    raise RuntimeError(job.error)
+                analysis = job.result
+                if analysis is None:
+                    raise RuntimeError("AI analysis ended without a result")
             except Exception as e:
                 st.warning(f"⚠️ AI analysis returned error, using simulated analysis: {str(e)}")
                 # Create simulated analysis
@@ -879,7 +844,7 @@ if st.session_state.analysis_done and st.session_state.analysis_result:
             
             # Add moving average if enough data
             if len(df) > 20:
-                df['MA20'] = df['close'].rolling(window=20).mean()
+                df['MA20'] = indicators.sma(df['close'], 20)
                 fig.add_trace(go.Scatter(
                     x=df['timestamp'],
                     y=df['MA20'],
@@ -898,6 +863,8 @@ if st.session_state.analysis_done and st.session_state.analysis_result:
             )
             
             st.plotly_chart(fig, use_container_width=True)
+            if st.session_state.historical_data_synthetic:
+                st.caption("⚠️ Simulated data: no price history source responded for this asset")
         else:
             st.info("📊 Historical price data is not available for chart display.")
     
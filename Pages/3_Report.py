@@ -1,8 +1,7 @@
 import streamlit as st
-from services.report_gen import generate_pdf_report
+from services.report_model import (ReportModel, OPTIONAL_SECTIONS, render_report,
+                                    report_filename, report_mime_type)
 from datetime import datetime
-import base64
-import os
 
 st.set_page_config(page_title="Report", layout="wide")
 
@@ -25,21 +24,6 @@ st.markdown("""
         margin-bottom: 20px;
         border-left: 5px solid #667eea;
     }
-    .download-btn {
-        background: linear-gradient(90deg, #28a745 0%, #20c997 100%);
-        color: white;
-        border: none;
-        padding: 15px 30px;
-        border-radius: 8px;
-        font-size: 16px;
-        font-weight: bold;
-        cursor: pointer;
-        transition: all 0.3s ease;
-    }
-    .download-btn:hover {
-        transform: translateY(-2px);
-        box-shadow: 0 6px 12px rgba(0,0,0,0.15);
-    }
     .preview-section {
         background: #f8f9fa;
         padding: 15px;
@@ -145,12 +129,15 @@ else:
             "Report Style",
             ["Professional", "Executive", "Detailed", "Investment Memo"]
         )
+        export_format = st.selectbox(
+            "Export Format",
+            ["PDF", "HTML", "Markdown", "JSON"]
+        )
     
     with col2:
         include_sections = st.multiselect(
             "Include Sections",
-            ["Executive Summary", "Technical Analysis", "Risk Assessment", 
-             "News Sentiment", "Action Plan", "Market Outlook"],
+            OPTIONAL_SECTIONS,
             default=["Executive Summary", "Technical Analysis", "Risk Assessment", "Action Plan"]
         )
     
@@ -158,6 +145,16 @@ else:
         confidential = st.checkbox("Add Confidential Watermark", value=True)
         include_charts = st.checkbox("Include Charts", value=True)
     
+    # Built once per run; sections are only computed when something shows them
+    report_model = ReportModel(
+        analysis,
+        news=st.session_state.get('news_data', []),
+        sections=include_sections,
+        include_charts=include_charts,
+        style=report_style,
+        confidential=confidential
+    )
+    
     # Report Preview
     st.markdown("## 👁️ Report Preview")
     
@@ -169,7 +166,7 @@ else:
             st.markdown("### 📋 Report Details")
             st.write(f"**Asset:** {symbol}")
             st.write(f"**Report Type:** {report_style} Report")
-            st.write(f"**Generated:** {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+            st.write(f"**Generated:** {report_model.generated_at.strftime('%Y-%m-%d %H:%M:%S')}")
             st.write(f"**Pages:** 3-5 (Professional Format)")
             
             # Safely get confidence score
@@ -209,20 +206,11 @@ else:
     # Report Sections Preview
     st.markdown("### 📑 Report Sections")
     
-    sections_data = [
-        ("📝 Executive Summary", "Overview of key findings and investment thesis"),
-        ("📈 Technical Analysis", f"{len(analysis.get('technical_indicators', {}))} technical indicators analyzed"),
-        ("⚠️ Risk Assessment", f"Risk score: {safe_get(analysis, 'risk', 'N/A')} with detailed breakdown"),
-        ("📰 Market Sentiment", f"Sentiment: {safe_get(analysis.get('raw_data', {}), 'sentiment', 'Neutral')}"),
-        ("🎯 Action Plan", f"{len(analysis.get('action_items', []))} actionable recommendations"),
-        ("🔮 Market Outlook", "Short-term and long-term market projections")
-    ]
-    
-    cols = st.columns(3)
-    for i, (title, desc) in enumerate(sections_data):
-        with cols[i % 3]:
-            if title[2:] in include_sections:
-                st.info(f"**{title}**\n\n{desc}")
+    with st.container(border=True):
+        try:
+            st.markdown(render_report(report_model, "markdown"))
+        except Exception as e:
+            st.error(f"❌ Preview unavailable: {str(e)}")
     
     # Generate Report
     st.markdown("---")
@@ -231,60 +219,43 @@ else:
     col1, col2, col3 = st.columns([1, 2, 1])
     
     with col2:
-        if st.button("🚀 Generate Professional PDF Report", type="primary", use_container_width=True):
+        if st.button(f"🚀 Generate Professional {export_format} Report", type="primary", use_container_width=True):
             with st.spinner("🔄 Generating professional report..."):
                 try:
-                    # Prepare data for report
-                    report_data = {
-                        'analysis_data': analysis,
-                        'asset_data': analysis.get('raw_data', {}),
-                        'news_list': st.session_state.get('news_data', []),
-                        'report_config': {
-                            'style': report_style,
-                            'sections': include_sections,
-                            'confidential': confidential,
-                            'timestamp': datetime.now().isoformat()
-                        }
-                    }
+                    fmt = export_format.lower()
+                    filename = report_filename(report_model, fmt)
                     
-                    # Generate filename
-                    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-                    filename = f"Professional_Analysis_{symbol}_{timestamp}.pdf"
-                    
-                    # Generate PDF with proper error handling
+                    # Generate report with proper error handling
                     try:
-                        file_path = generate_pdf_report(
-                            analysis_data=analysis,
-                            asset_data=analysis.get('raw_data', {}),
-                            news_list=st.session_state.get('news_data', []),
-                            output_file=filename
-                        )
-                        
-                        # Read PDF file
-                        with open(file_path, "rb") as f:
-                            pdf_bytes = f.read()
-                        
-                        # Encode for download
-                        b64 = base64.b64encode(pdf_bytes).decode()
+                        # Rendered in memory, no file on the server
+                        report_bytes = render_report(report_model, fmt)
+                        if isinstance(report_bytes, str):
+                            report_bytes = report_bytes.encode("utf-8")
                         
                         # Success message
                         st.success("✅ Report generated successfully!")
                         
-                        # Download link
-                        href = f'<a href="data:application/pdf;base64,{b64}" download="{filename}" class="download-btn">📥 Download Report</a>'
-                        st.markdown(href, unsafe_allow_html=True)
+                        # Download button; clicking it does not rerun the page
+                        st.download_button(
+                            "📥 Download Report",
+                            data=report_bytes,
+                            file_name=filename,
+                            mime=report_mime_type(fmt),
+                            on_click="ignore",
+                            type="primary"
+                        )
                         
                         # Report details
-                        file_size = len(pdf_bytes) / 1024
+                        file_size = len(report_bytes) / 1024
                         
                         st.markdown(f"""
                         <div class="report-card">
                             <h4>📋 Report Details</h4>
                             <p><strong>Filename:</strong> {filename}</p>
                             <p><strong>Asset:</strong> {symbol}</p>
-                            <p><strong>Generated:</strong> {datetime.now().strftime("%Y-%m-%d %H:%M:%S")}</p>
+                            <p><strong>Generated:</strong> {report_model.generated_at.strftime("%Y-%m-%d %H:%M:%S")}</p>
                             <p><strong>Size:</strong> {file_size:.1f} KB</p>
-                            <p><strong>Format:</strong> Professional PDF (Printable)</p>
+                            <p><strong>Format:</strong> {export_format} ({len(report_model.included)} sections)</p>
                         </div>
                         """, unsafe_allow_html=True)
                         
@@ -292,48 +263,29 @@ else:
                         with st.expander("📄 Quick Preview", expanded=True):
                             st.markdown("### 📝 Executive Summary Preview")
                             
-                            # Safely extract values for preview
-                            recommendation = safe_get(analysis, 'recommendation', 'N/A')
-                            confidence = safe_get(analysis, 'confidence_score', 'N/A')
-                            risk = safe_get(analysis, 'risk', 'N/A')
-                            sentiment = safe_get(analysis.get('raw_data', {}), 'sentiment', 'N/A')
+                            summary = report_model.section("Executive Summary")
+                            recommendation = report_model.section("Investment Recommendation")
                             
                             st.markdown(f"""
                             #### Quantum Financial Intelligence Report
                             
                             **Asset:** {symbol}
-                            **Report Date:** {datetime.now().strftime("%Y-%m-%d")}
-                            **Analysis ID:** QF-{symbol}-{timestamp[-6:]}
+                            **Report Date:** {report_model.generated_at.strftime("%Y-%m-%d")}
+                            **Analysis ID:** QF-{symbol}-{report_model.report_id[-6:]}
                             
                             ##### Key Findings:
-                            - **Recommendation:** {recommendation} (Confidence: {confidence})
-                            - **Risk Assessment:** {risk}
-                            - **Market Sentiment:** {sentiment}
-                            - **Price Action:** ${price:,.2f} (24h Range: ${low:,.2f} - ${high:,.2f})
-                            
-                            ##### Executive Overview:
-                            This professional analysis provides comprehensive insights into {symbol} market dynamics, 
-                            incorporating quantitative models, technical indicators, and sentiment analysis 
-                            to deliver actionable investment intelligence.
-                            
-                            *Full report includes detailed technical analysis, risk breakdown, and strategic recommendations.*
+                            - **Recommendation:** {recommendation['recommendation']} (Confidence: {recommendation['confidence']})
                             """)
+                            st.write(summary["text"] or "No recommendation available.")
                             
                             # Show action items preview
-                            action_items = analysis.get('action_items', [])
-                            if action_items:
+                            if report_model.includes("Action Plan"):
                                 st.markdown("##### 🎯 Key Action Items:")
-                                for action in action_items[:3]:
+                                for action in report_model.section("Action Plan")["items"][:3]:
                                     st.write(f"- {action}")
                         
-                        # Clean up
-                        try:
-                            os.remove(file_path)
-                        except:
-                            pass
-                        
                     except Exception as pdf_error:
-                        st.error(f"❌ PDF Generation Error: {str(pdf_error)}")
+                        st.error(f"❌ {export_format} Generation Error: {str(pdf_error)}")
                         st.info("""
                         **Troubleshooting tips:**
                         1. Check if all data fields are properly formatted
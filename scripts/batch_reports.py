@@ -0,0 +1,90 @@
+"""
+Batch PDF reports for a watchlist
+
+Fetches market data and news for every symbol, analyzes the whole watchlist
+with batched model calls (portfolio_market_analysis), then renders one PDF
+per asset in parallel worker processes (services.report_batch).
+
+Usage:
+    python scripts/batch_reports.py BTC ETH AAPL MSFT [--out reports] [--workers 4]
+    python scripts/batch_reports.py --watchlist watchlist.txt --use openai
+    (watchlist file: one symbol per line, # comments allowed; OPENAI_API_KEY
+    is used with --use openai)
+"""
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.ai_engine import portfolio_market_analysis
+from services.data_fetch import get_crypto_price, get_stock_price
+from services.news_fetch import get_market_news
+from services.report_batch import REPORT_BATCH_DIR, REPORT_BATCH_WORKERS, generate_reports
+
+def read_watchlist(path):
+    with open(path) as f:
+        return [line.split("#")[0].strip().upper() for line in f if line.split("#")[0].strip()]
+
+def fetch_asset(symbol, with_news=True):
+    """portfolio_market_analysis input for one symbol, looked up like the Analysis page does"""
+    crypto_data = get_crypto_price(symbol.lower()) if len(symbol) <= 5 else None
+    stock_data = None if crypto_data else get_stock_price(symbol)
+
+    news_data = []
+    if with_news:
+        try:
+            news_data = get_market_news(query=symbol) or []
+        except Exception as e:
+            print(f"  {symbol}: no news ({e})")
+
+    return {"symbol": symbol, "crypto_data": crypto_data, "stock_data": stock_data, "news_data": news_data}
+
+def print_progress(done, total, result):
+    if "error" in result:
+        status = f"FAILED: {result['error']}"
+    else:
+        status = f"{result['file']} ({result['size'] / 1024:.0f} KB, {result['seconds']:.2f}s)"
+    print(f"[{done}/{total}] {result['symbol']}: {status}", flush=True)
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate PDF analysis reports for a watchlist")
+    parser.add_argument("symbols", nargs="*", help="Symbols to report on (BTC, ETH, AAPL, ...)")
+    parser.add_argument("--watchlist", help="File with one symbol per line")
+    parser.add_argument("--out", default=REPORT_BATCH_DIR, help="Output directory")
+    parser.add_argument("--workers", type=int, default=REPORT_BATCH_WORKERS, help="Report worker processes")
+    parser.add_argument("--use", choices=["llama", "openai"], default="llama", help="Analysis engine")
+    parser.add_argument("--no-news", action="store_true", help="Skip news and sentiment lookup")
+    args = parser.parse_args()
+
+    symbols = [s.upper() for s in args.symbols]
+    if args.watchlist:
+        symbols += read_watchlist(args.watchlist)
+    symbols = list(dict.fromkeys(symbols))
+    if not symbols:
+        parser.error("no symbols given")
+
+    start = time.perf_counter()
+    print(f"Fetching data for {len(symbols)} assets...", flush=True)
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        assets = list(pool.map(lambda symbol: fetch_asset(symbol, not args.no_news), symbols))
+
+    print("Analyzing...", flush=True)
+    analyses = portfolio_market_analysis(assets, use=args.use, api_key=os.environ.get("OPENAI_API_KEY"))
+    news = {asset["symbol"]: asset["news_data"] for asset in assets}
+    analysis_seconds = time.perf_counter() - start
+
+    print(f"Rendering reports with {args.workers} workers...", flush=True)
+    render_start = time.perf_counter()
+    results = generate_reports(analyses, news=news, output_dir=args.out, workers=args.workers,
+                               progress=print_progress)
+
+    failed = [r for r in results if "error" in r]
+    print(f"\n{len(results) - len(failed)} reports written to {args.out}, {len(failed)} failed "
+          f"(data + analysis {analysis_seconds:.1f}s, rendering {time.perf_counter() - render_start:.1f}s)")
+    sys.exit(1 if failed else 0)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,47 @@
+"""
+Import-time benchmark for services.ai_engine
+
+Compares a cold import of the module (engines load lazily) with a cold
+import that also loads TextBlob and OpenAI, which is what every page paid
+when those were imported at module level.
+
+Usage: python scripts/bench_import_time.py [runs]
+"""
+import os
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CASES = [
+    ("lazy (import ai_engine)",
+     "import services.ai_engine"),
+    ("eager (ai_engine + textblob + openai)",
+     "import services.ai_engine as a; a.get_engine('textblob'); a.get_engine('openai')"),
+]
+
+def time_import(code, runs):
+    """Best-of-N wall time of a fresh interpreter running `code`"""
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, "-c", code], cwd=ROOT, check=True)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+def main():
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    baseline = time_import("pass", runs)
+    results = [(label, time_import(code, runs) - baseline) for label, code in CASES]
+    
+    print(f"Interpreter startup: {baseline * 1000:.0f} ms (subtracted)")
+    for label, seconds in results:
+        print(f"{label:<40} {seconds * 1000:8.0f} ms")
+    
+    lazy, eager = results[0][1], results[1][1]
+    if lazy > 0:
+        print(f"Speedup: {eager / lazy:.1f}x ({(eager - lazy) * 1000:.0f} ms saved per cold import)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""
+Benchmark for section-selective report generation in services.report_gen
+
+Times render_pdf_report for the full report (with and without the
+technical chart) against reports restricted to a few sections, plus the
+Markdown preview the Report page shows. Only included sections are built
+and drawn, and the chart (price history + rendering) is skipped unless
+charts are requested, so minimal reports should cost a fraction of the
+full one.
+
+The chart cache used here is a private temporary directory, cleared
+before every "cold" run; price history is fetched once up front so
+network time is not measured.
+
+Usage: python scripts/bench_report_sections.py [runs]
+"""
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Keep the benchmark away from the shared chart cache before it is created
+os.environ["CHART_CACHE_DIR"] = tempfile.mkdtemp(prefix="bench_report_sections_")
+
+from services.chart_cache import chart_cache
+from services.report_gen import _report_price_history, render_pdf_report
+from services.report_model import ReportModel, render_report
+
+SAMPLE_ANALYSIS = {
+    "symbol": "BTC",
+    "asset_type": "Cryptocurrency",
+    "recommendation": "Buy",
+    "risk": "6/10",
+    "confidence_score": "78%",
+    "technical_analysis": "Price holds above the 50-day moving average with RSI at 58; "
+                          "MACD crossed above its signal line and volume is rising. " * 3,
+    "fundamental_analysis": "Network activity and exchange outflows remain strong while "
+                            "funding rates are neutral. " * 3,
+    "risk_breakdown": {"Market Risk": "7/10", "Liquidity Risk": "6/10", "Volatility Risk": "8/10",
+                       "Regulatory Risk": "7/10", "Concentration Risk": "6/10"},
+    "action_items": ["1. Entry Point: scale in below $64,000", "2. Position Sizing: 5% of portfolio",
+                     "3. Stop Loss: $58,500", "4. Take Profit: $72,000 and $78,000"],
+    "technical_indicators": {"sma_20": 65120.5, "sma_50": 62980.1, "rsi": 58.2, "macd": 412.7,
+                             "volatility_percent": 3.4},
+    "volatility": "3.4%",
+    "market_cap_rank": "Top 10",
+    "raw_data": {"symbol": "BTC", "asset_type": "Cryptocurrency", "price": 66250.0, "high": 67010.0,
+                 "low": 65120.0, "volume": 31500000000.0, "sentiment": "Bullish"}
+}
+
+SAMPLE_NEWS = [
+    {"title": f"Bitcoin market update {i}", "source": "Example Wire", "date": "2026-10-19",
+     "description": "ETF inflows continued for a fifth session as derivatives open interest climbed. " * 4}
+    for i in range(8)
+]
+
+CASES = [
+    ("full report + chart", None, True),
+    ("full report", None, False),
+    ("summary + action plan", ["Executive Summary", "Action Plan"], False),
+    ("core sections only", [], False),
+]
+
+def best_of(func, runs, before=None):
+    timings = []
+    for _ in range(runs):
+        if before:
+            before()
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+def main():
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+
+    # Warm up: imports, compiled layout, price history (network or synthetic)
+    render_pdf_report(SAMPLE_ANALYSIS, news_list=SAMPLE_NEWS)
+    history = _report_price_history(ReportModel(SAMPLE_ANALYSIS))
+    print(f"{runs} runs per case, price history: {history['source']} ({len(history['close'])} bars)")
+
+    rows = [("full report + chart (cold cache)", best_of(
+        lambda: render_pdf_report(SAMPLE_ANALYSIS, news_list=SAMPLE_NEWS, include_charts=True),
+        runs, before=chart_cache.clear))]
+    for label, sections, include_charts in CASES:
+        rows.append((label, best_of(
+            lambda: render_pdf_report(SAMPLE_ANALYSIS, news_list=SAMPLE_NEWS, sections=sections,
+                                      include_charts=include_charts), runs)))
+    rows.append(("markdown preview, 2 sections", best_of(
+        lambda: render_report(ReportModel(SAMPLE_ANALYSIS, SAMPLE_NEWS,
+                                          sections=["Executive Summary", "Action Plan"]), "markdown"), runs)))
+
+    baseline = rows[0][1]
+    print(f"{'':<34} {'ms/report':>10} {'vs full + chart':>16}")
+    for label, seconds in rows:
+        print(f"{label:<34} {seconds * 1e3:>10.2f} {baseline / seconds:>15.1f}x")
+
+    shutil.rmtree(chart_cache.disk_dir, ignore_errors=True)
+
+if __name__ == "__main__":
+    main()
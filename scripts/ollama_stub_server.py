@@ -0,0 +1,156 @@
+"""
+Local stand-in for an Ollama server
+
+Implements the parts of the Ollama HTTP API that services.ollama_client uses
+(/api/tags and /api/generate, streaming and non-streaming) and answers with a
+canned analysis in the format the response parser expects. Useful for
+exercising the HTTP backend without a GPU or a downloaded model; the
+tests in tests/test_ollama_http.py run against it.
+
+Usage:
+    python scripts/ollama_stub_server.py [--port 11434] [--delay 0.0]
+    OLLAMA_HOST=http://localhost:11434 streamlit run app.py
+
+Programmatic use:
+    server, thread = start_stub_server(port=0)
+    host = f"http://127.0.0.1:{server.server_address[1]}"
+    ...
+    server.shutdown()
+"""
+import argparse
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+CANNED_RESPONSE = """TECHNICAL ANALYSIS:
+Price is trading above the 20-day SMA with RSI near 58, indicating steady momentum.
+
+FUNDAMENTAL ASSESSMENT:
+Volume and market capitalization support current valuation levels.
+
+MARKET SENTIMENT:
+News flow is mildly positive.
+
+RISK ASSESSMENT (1-10): 6/10
+Volatility remains the main risk factor.
+
+RECOMMENDATION: Buy
+Confidence: 72%
+
+KEY SUPPORT/RESISTANCE:
+Support near recent lows, resistance at the 10-day high.
+
+TIME HORIZON:
+3-6 months
+"""
+
+class StubOllamaHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # Keep-alive, like the real server
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+    def _send_json(self, status, payload):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.path == "/api/tags":
+            models = [{"name": f"{name}:latest"} for name in self.server.models]
+            self._send_json(200, {"models": models})
+        else:
+            self._send_json(404, {"error": "not found"})
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        try:
+            request = json.loads(self.rfile.read(length) or b"{}")
+        except ValueError:
+            self._send_json(400, {"error": "invalid JSON"})
+            return
+
+        if self.path != "/api/generate":
+            self._send_json(404, {"error": "not found"})
+            return
+
+        model = request.get("model", "")
+        if model.split(":")[0] not in self.server.models:
+            self._send_json(404, {"error": f"model '{model}' not found"})
+            return
+
+        self.server.request_log.append(request)
+
+        # An empty prompt only loads the model (preload)
+        if not request.get("prompt"):
+            self._send_json(200, {"model": model, "response": "", "done": True, "done_reason": "load"})
+            return
+
+        if request.get("stream", True):
+            self._stream_response(model)
+        else:
+            time.sleep(self.server.delay)
+            self._send_json(200, {"model": model, "response": self.server.response_text, "done": True})
+
+    def _stream_response(self, model):
+        # NDJSON, one chunk per line, like Ollama
+        self.send_response(200)
+        self.send_header("Content-Type", "application/x-ndjson")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+
+        def write_chunk(payload):
+            data = (json.dumps(payload) + "\n").encode("utf-8")
+            self.wfile.write(f"{len(data):X}\r\n".encode("ascii") + data + b"\r\n")
+            self.wfile.flush()
+
+        tokens = self.server.response_text.split(" ")
+        per_token_delay = self.server.delay / max(len(tokens), 1)
+        for i, token in enumerate(tokens):
+            text = token if i == len(tokens) - 1 else token + " "
+            write_chunk({"model": model, "response": text, "done": False})
+            if per_token_delay:
+                time.sleep(per_token_delay)
+        write_chunk({"model": model, "response": "", "done": True})
+        self.wfile.write(b"0\r\n\r\n")
+        self.wfile.flush()
+
+def start_stub_server(port=0, host="127.0.0.1", models=("llama3",), response_text=CANNED_RESPONSE,
+                      delay=0.0, verbose=False):
+    """Start the stub server in a daemon thread; port=0 picks a free port"""
+    server = ThreadingHTTPServer((host, port), StubOllamaHandler)
+    server.daemon_threads = True
+    server.models = set(models)
+    server.response_text = response_text
+    server.delay = delay
+    server.verbose = verbose
+    server.request_log = []
+
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server, thread
+
+def main():
+    parser = argparse.ArgumentParser(description="Local stand-in for an Ollama server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=11434)
+    parser.add_argument("--delay", type=float, default=0.0, help="Seconds to spend 'generating' each response")
+    parser.add_argument("--model", action="append", help="Model name to serve (repeatable, default llama3)")
+    args = parser.parse_args()
+
+    server, thread = start_stub_server(
+        port=args.port, host=args.host, models=args.model or ("llama3",), delay=args.delay, verbose=True
+    )
+    print(f"Stub Ollama server listening on http://{args.host}:{server.server_address[1]}")
+    try:
+        thread.join()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+if __name__ == "__main__":
+    main()
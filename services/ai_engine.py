@@ -1,17 +1,74 @@
 import json
+import math
+import os
+import re
+import time
+import atexit
+import hashlib
+import logging
+import tempfile
+import threading
+from collections import OrderedDict, deque
 from datetime import datetime, timedelta
-import random
 import numpy as np
-from textblob import TextBlob
 import subprocess
 import statistics
+from services.analysis_cache import analysis_cache, make_key, bucket_value, round_to
+from services import indicators
+from services.indicators import last_valid
 
-# Optional engines
-try:
+logger = logging.getLogger(__name__)
+
+# -----------------------------------------------------------
+#  ENGINE REGISTRY (HEAVY / OPTIONAL BACKENDS LOAD ON FIRST USE)
+# -----------------------------------------------------------
+
+_ENGINE_LOADERS = {}
+_loaded_engines = {}
+_engine_lock = threading.Lock()
+
+def register_engine(name, loader):
+    """Register a zero-argument loader that imports and returns an engine"""
+    with _engine_lock:
+        _ENGINE_LOADERS[name] = loader
+        _loaded_engines.pop(name, None)
+
+def get_engine(name):
+    """Return the named engine, importing it on first use (None if unavailable)"""
+    if name in _loaded_engines:
+        return _loaded_engines[name]
+    
+    with _engine_lock:
+        if name not in _loaded_engines:
+            loader = _ENGINE_LOADERS.get(name)
+            if loader is None:
+                raise KeyError(f"Unknown engine: {name}")
+            try:
+                _loaded_engines[name] = loader()
+            except ImportError:
+                _loaded_engines[name] = None
+        return _loaded_engines[name]
+
+def engine_available(name):
+    """Check whether an engine can be loaded"""
+    return get_engine(name) is not None
+
+def _load_textblob():
+    from textblob import TextBlob
+    return TextBlob
+
+def _load_openai():
     from openai import OpenAI
-    OPENAI_AVAILABLE = True
-except:
-    OPENAI_AVAILABLE = False
+    return OpenAI
+
+register_engine("textblob", _load_textblob)
+register_engine("openai", _load_openai)
+
+def __getattr__(name):
+    # Backward compatible flag, resolved lazily so importing this module stays cheap
+    if name == "OPENAI_AVAILABLE":
+        return engine_available("openai")
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 # -----------------------------------------------------------
 #  ADVANCED TECHNICAL INDICATORS
@@ -22,22 +79,14 @@ def calculate_technical_indicators(price_history):
     if len(price_history) < 5:
         return {}
     
-    prices = np.array(price_history)
+    prices = np.asarray(price_history, dtype=float)
     
     # Simple Moving Averages
     sma_20 = np.mean(prices[-20:]) if len(prices) >= 20 else np.mean(prices)
     sma_50 = np.mean(prices[-50:]) if len(prices) >= 50 else np.mean(prices)
     
-    # RSI
-    if len(prices) >= 14:
-        deltas = np.diff(prices[-14:])
-        seed = deltas[:14]
-        up = seed[seed >= 0].sum()/14
-        down = -seed[seed < 0].sum()/14
-        rs = up/down if down != 0 else 0
-        rsi = 100 - 100/(1 + rs)
-    else:
-        rsi = 50
+    # RSI (Wilder, over the full history)
+    rsi = last_valid(indicators.rsi(prices), 50)
     
     # Volatility
     volatility = np.std(prices) / np.mean(prices) * 100 if len(prices) > 1 else 0
@@ -52,41 +101,635 @@ def calculate_technical_indicators(price_history):
         'resistance_level': np.max(prices[-10:]) if len(prices) >= 10 else np.max(prices)
     }
 
+# -----------------------------------------------------------
+#  BATCH (MULTI-SYMBOL) INDICATORS
+# -----------------------------------------------------------
+
+def _expanding_window_mean(prices, window):
+    """Mean of the last `window` bars, or of every bar so far until the window is full"""
+    length = prices.shape[-1]
+    sums = np.concatenate([np.zeros((prices.shape[0], 1)), np.cumsum(prices, axis=1)], axis=1)
+    ends = np.arange(1, length + 1)
+    starts = np.maximum(ends - window, 0)
+    return (sums[:, ends] - sums[:, starts]) / (ends - starts)
+
+def _expanding_window_extreme(prices, window, reducer):
+    """Rolling min/max over the last `window` bars (fewer at the start)"""
+    fill = np.inf if reducer is np.min else -np.inf
+    padded = np.concatenate([np.full((prices.shape[0], window - 1), fill), prices], axis=1)
+    return reducer(np.lib.stride_tricks.sliding_window_view(padded, window, axis=1), axis=2)
+
+def batch_technical_indicators(price_matrix):
+    """
+    calculate_technical_indicators for a whole universe in one NumPy pass.
+    price_matrix: 2-D array, one row per symbol and one column per bar.
+    Returns arrays of the same shape; column t holds what the scalar
+    version reports for the first t + 1 prices (NaN before 5 bars).
+    """
+    prices = np.asarray(price_matrix, dtype=float)
+    if prices.ndim == 1:
+        prices = prices[np.newaxis, :]
+    if prices.ndim != 2:
+        raise ValueError("price_matrix must be 2-D (symbols x time)")
+    
+    sma_20 = _expanding_window_mean(prices, 20)
+    sma_50 = _expanding_window_mean(prices, 50)
+    
+    # RSI: Wilder over the full history, neutral until there is enough data
+    rsi = indicators.rsi(prices)
+    rsi[np.isnan(rsi)] = 50.0
+    
+    # Volatility: std / mean of every price so far
+    centred = prices - prices[:, :1]
+    counts = np.arange(1, prices.shape[1] + 1)
+    mean_centred = np.cumsum(centred, axis=1) / counts
+    variance = np.clip(np.cumsum(centred ** 2, axis=1) / counts - mean_centred ** 2, 0, None)
+    mean = mean_centred + prices[:, :1]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        volatility = np.where(mean != 0, np.sqrt(variance) / mean * 100, 0.0)
+    
+    macd_line, signal_line, histogram = indicators.macd(prices)
+    
+    result = {
+        'sma_20': sma_20,
+        'sma_50': sma_50,
+        'rsi': rsi,
+        'volatility_percent': volatility,
+        'bullish': sma_20 > sma_50,
+        'support_level': _expanding_window_extreme(prices, 10, np.min),
+        'resistance_level': _expanding_window_extreme(prices, 10, np.max),
+        'macd': macd_line,
+        'macd_signal': signal_line,
+        'macd_histogram': histogram
+    }
+    
+    # Match the scalar version, which needs at least 5 prices
+    warmup = min(4, prices.shape[1])
+    for key, values in result.items():
+        if key != 'bullish':
+            values[:, :warmup] = np.nan
+    result['bullish'][:, :warmup] = False
+    return result
+
+def latest_technical_indicators(symbols, price_matrix):
+    """{symbol: calculate_technical_indicators-style dict} from the last column of a batch"""
+    batch = batch_technical_indicators(price_matrix)
+    if not batch['sma_20'].shape[1] or np.isnan(batch['sma_20'][0, -1]):
+        return {symbol: {} for symbol in symbols}
+    
+    latest = {}
+    for row, symbol in enumerate(symbols):
+        latest[symbol] = {
+            'sma_20': float(batch['sma_20'][row, -1]),
+            'sma_50': float(batch['sma_50'][row, -1]),
+            'rsi': float(batch['rsi'][row, -1]),
+            'volatility_percent': float(batch['volatility_percent'][row, -1]),
+            'trend': 'Bullish' if batch['bullish'][row, -1] else 'Bearish',
+            'support_level': float(batch['support_level'][row, -1]),
+            'resistance_level': float(batch['resistance_level'][row, -1]),
+            'macd': float(batch['macd'][row, -1])
+        }
+    return latest
+
+# -----------------------------------------------------------
+#  INCREMENTAL (STREAMING) INDICATORS
+# -----------------------------------------------------------
+#
+# O(1)-per-tick counterparts of the indicators above for live prices.
+# Each keeps only the state it needs; snapshot() returns plain JSON-able
+# data and from_snapshot() rebuilds an identical object.
+
+class RollingSMA:
+    """Simple moving average over the last `window` values (mean of all until full)"""
+    
+    def __init__(self, window):
+        self.window = window
+        self._values = deque(maxlen=window)
+        self._sum = 0.0
+        self._updates = 0
+    
+    def update(self, value):
+        value = float(value)
+        if len(self._values) == self.window:
+            self._sum -= self._values[0]
+        self._values.append(value)
+        self._sum += value
+        
+        # Re-sum now and then so add/subtract rounding cannot drift
+        self._updates += 1
+        if self._updates % (self.window * 64) == 0:
+            self._sum = math.fsum(self._values)
+        return self.value
+    
+    @property
+    def value(self):
+        return self._sum / len(self._values) if self._values else None
+    
+    @property
+    def ready(self):
+        return len(self._values) == self.window
+    
+    def snapshot(self):
+        return {"window": self.window, "values": list(self._values), "sum": self._sum, "updates": self._updates}
+    
+    @classmethod
+    def from_snapshot(cls, data):
+        sma = cls(data["window"])
+        sma._values.extend(data["values"])
+        sma._sum, sma._updates = data["sum"], data["updates"]
+        return sma
+
+class IncrementalEMA:
+    """Exponential moving average, alpha = 2 / (span + 1), seeded with the first value"""
+    
+    def __init__(self, span=None, alpha=None):
+        self.alpha = alpha if alpha is not None else 2.0 / (span + 1)
+        self.value = None
+        self.count = 0
+    
+    def update(self, value):
+        value = float(value)
+        self.value = value if self.value is None else self.value + self.alpha * (value - self.value)
+        self.count += 1
+        return self.value
+    
+    def snapshot(self):
+        return {"alpha": self.alpha, "value": self.value, "count": self.count}
+    
+    @classmethod
+    def from_snapshot(cls, data):
+        ema = cls(alpha=data["alpha"])
+        ema.value, ema.count = data["value"], data["count"]
+        return ema
+
+class IncrementalRSI:
+    """Wilder's RSI; matches indicators.rsi on the same prices"""
+    
+    def __init__(self, period=14):
+        self.period = period
+        self.previous = None
+        self.avg_gain = 0.0
+        self.avg_loss = 0.0
+        self.count = 0  # Price changes seen
+    
+    def update(self, price):
+        price = float(price)
+        if self.previous is not None:
+            change = price - self.previous
+            gain, loss = max(change, 0.0), max(-change, 0.0)
+            self.count += 1
+            if self.count <= self.period:
+                # Seed with the plain average of the first `period` changes
+                self.avg_gain += (gain - self.avg_gain) / self.count
+                self.avg_loss += (loss - self.avg_loss) / self.count
+            else:
+                self.avg_gain += (gain - self.avg_gain) / self.period
+                self.avg_loss += (loss - self.avg_loss) / self.period
+        self.previous = price
+        return self.value
+    
+    @property
+    def value(self):
+        if self.count < self.period:
+            return None
+        if self.avg_loss == 0:
+            return 50.0 if self.avg_gain == 0 else 100.0
+        return 100 - 100 / (1 + self.avg_gain / self.avg_loss)
+    
+    def snapshot(self):
+        return {"period": self.period, "previous": self.previous, "avg_gain": self.avg_gain,
+                "avg_loss": self.avg_loss, "count": self.count}
+    
+    @classmethod
+    def from_snapshot(cls, data):
+        rsi = cls(data["period"])
+        rsi.previous, rsi.count = data["previous"], data["count"]
+        rsi.avg_gain, rsi.avg_loss = data["avg_gain"], data["avg_loss"]
+        return rsi
+
+class WelfordVariance:
+    """Running mean and population variance (Welford's algorithm)"""
+    
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+    
+    def update(self, value):
+        value = float(value)
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (value - self.mean)
+        return self.variance
+    
+    @property
+    def variance(self):
+        return self.m2 / self.count if self.count else 0.0
+    
+    @property
+    def std(self):
+        return math.sqrt(self.variance)
+    
+    def snapshot(self):
+        return {"count": self.count, "mean": self.mean, "m2": self.m2}
+    
+    @classmethod
+    def from_snapshot(cls, data):
+        welford = cls()
+        welford.count, welford.mean, welford.m2 = data["count"], data["mean"], data["m2"]
+        return welford
+
+class IncrementalMACD:
+    """MACD line, signal line and histogram; matches indicators.macd"""
+    
+    def __init__(self, fast=12, slow=26, signal=9):
+        self.fast = IncrementalEMA(fast)
+        self.slow = IncrementalEMA(slow)
+        self.signal = IncrementalEMA(signal)
+    
+    def update(self, price):
+        line = self.fast.update(price) - self.slow.update(price)
+        self.signal.update(line)
+        return self.value
+    
+    @property
+    def value(self):
+        if self.signal.value is None:
+            return None
+        line = self.fast.value - self.slow.value
+        return {"macd": line, "signal": self.signal.value, "histogram": line - self.signal.value}
+    
+    def snapshot(self):
+        return {"fast": self.fast.snapshot(), "slow": self.slow.snapshot(), "signal": self.signal.snapshot()}
+    
+    @classmethod
+    def from_snapshot(cls, data):
+        macd = cls()
+        macd.fast = IncrementalEMA.from_snapshot(data["fast"])
+        macd.slow = IncrementalEMA.from_snapshot(data["slow"])
+        macd.signal = IncrementalEMA.from_snapshot(data["signal"])
+        return macd
+
+class IndicatorState:
+    """
+    Live indicator set for one symbol. indicators() returns the same keys as
+    calculate_technical_indicators over every price seen so far, plus MACD.
+    """
+    
+    LEVEL_WINDOW = 10  # Bars used for support/resistance
+    
+    def __init__(self):
+        self.sma_20 = RollingSMA(20)
+        self.sma_50 = RollingSMA(50)
+        self.rsi = IncrementalRSI(14)
+        self.variance = WelfordVariance()
+        self.macd = IncrementalMACD()
+        self.recent = deque(maxlen=self.LEVEL_WINDOW)
+        self.last_price = None
+    
+    def update(self, price):
+        price = float(price)
+        self.sma_20.update(price)
+        self.sma_50.update(price)
+        self.rsi.update(price)
+        self.variance.update(price)
+        self.macd.update(price)
+        self.recent.append(price)
+        self.last_price = price
+        return self.indicators()
+    
+    @property
+    def count(self):
+        return self.variance.count
+    
+    def indicators(self):
+        if self.count < 5:
+            return {}
+        
+        sma_20, sma_50 = self.sma_20.value, self.sma_50.value
+        rsi = self.rsi.value
+        mean = self.variance.mean
+        return {
+            'sma_20': sma_20,
+            'sma_50': sma_50,
+            'rsi': rsi if rsi is not None else 50,
+            'volatility_percent': self.variance.std / mean * 100 if mean else 0,
+            'trend': 'Bullish' if sma_20 > sma_50 else 'Bearish',
+            'support_level': min(self.recent),
+            'resistance_level': max(self.recent),
+            'macd': self.macd.value
+        }
+    
+    def snapshot(self):
+        return {
+            "sma_20": self.sma_20.snapshot(),
+            "sma_50": self.sma_50.snapshot(),
+            "rsi": self.rsi.snapshot(),
+            "variance": self.variance.snapshot(),
+            "macd": self.macd.snapshot(),
+            "recent": list(self.recent),
+            "last_price": self.last_price
+        }
+    
+    @classmethod
+    def from_snapshot(cls, data):
+        state = cls()
+        state.sma_20 = RollingSMA.from_snapshot(data["sma_20"])
+        state.sma_50 = RollingSMA.from_snapshot(data["sma_50"])
+        state.rsi = IncrementalRSI.from_snapshot(data["rsi"])
+        state.variance = WelfordVariance.from_snapshot(data["variance"])
+        state.macd = IncrementalMACD.from_snapshot(data["macd"])
+        state.recent.extend(data["recent"])
+        state.last_price = data["last_price"]
+        return state
+    
+    @classmethod
+    def from_history(cls, price_history):
+        state = cls()
+        for price in price_history:
+            state.update(price)
+        return state
+
+class LiveIndicators:
+    """IndicatorState per symbol, for dashboards that track many symbols tick by tick"""
+    
+    def __init__(self):
+        self._states = {}
+        self._lock = threading.Lock()
+    
+    def _state(self, symbol):
+        symbol = symbol.upper()
+        state = self._states.get(symbol)
+        if state is None:
+            with self._lock:
+                state = self._states.setdefault(symbol, IndicatorState())
+        return state
+    
+    def update(self, symbol, price):
+        """Apply one tick and return the symbol's current indicators"""
+        return self._state(symbol).update(price)
+    
+    def seed(self, symbol, price_history):
+        """Start (or restart) a symbol from its price history"""
+        with self._lock:
+            self._states[symbol.upper()] = IndicatorState.from_history(price_history)
+    
+    def get(self, symbol):
+        state = self._states.get(symbol.upper())
+        return state.indicators() if state else {}
+    
+    def symbols(self):
+        return list(self._states)
+    
+    def snapshot(self):
+        with self._lock:
+            return {symbol: state.snapshot() for symbol, state in self._states.items()}
+    
+    def restore(self, data):
+        with self._lock:
+            self._states = {symbol: IndicatorState.from_snapshot(state) for symbol, state in data.items()}
+
+# -----------------------------------------------------------
+#  SENTIMENT RESULT CACHE
+# -----------------------------------------------------------
+
+SENTIMENT_CACHE_SAVE_INTERVAL = float(os.environ.get('SENTIMENT_CACHE_SAVE_INTERVAL', 60))  # Seconds between saves
+
+class SentimentCache:
+    """LRU cache of TextBlob results keyed by a hash of the article text"""
+    
+    def __init__(self, max_entries=5000, persist_path=None, save_interval=SENTIMENT_CACHE_SAVE_INTERVAL):
+        self.max_entries = max_entries
+        self.persist_path = persist_path
+        self.save_interval = save_interval
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._save_lock = threading.Lock()
+        self._last_save = 0.0
+        self._dirty = False
+        self.hits = 0
+        self.misses = 0
+        if persist_path:
+            self.load()
+    
+    @staticmethod
+    def key(text):
+        """Content hash used as cache key"""
+        return hashlib.sha1(text.encode('utf-8', 'replace')).hexdigest()
+    
+    def get(self, text):
+        """Return cached (polarity, subjectivity) or None"""
+        key = self.key(text)
+        with self._lock:
+            value = self._entries.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+    
+    def set(self, text, polarity, subjectivity):
+        """Store a TextBlob result, evicting the least recently used entry"""
+        key = self.key(text)
+        with self._lock:
+            self._entries[key] = (float(polarity), float(subjectivity))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            self._dirty = True
+    
+    def clear(self):
+        """Drop all cached results"""
+        with self._lock:
+            self._entries.clear()
+            self._dirty = True
+    
+    def load(self):
+        """Load persisted results from disk, if any"""
+        if not self.persist_path or not os.path.exists(self.persist_path):
+            return
+        try:
+            with open(self.persist_path, 'r') as f:
+                data = json.load(f)
+            with self._lock:
+                for key, value in list(data.items())[-self.max_entries:]:
+                    self._entries[key] = tuple(value)
+        except (OSError, ValueError) as e:
+            logger.warning("Sentiment cache load error: %s", e)
+    
+    def save(self, force=False):
+        """
+        Persist results to disk (atomic replace); no-op without a path.
+        Unless forced, saves at most once per save_interval, and a call made
+        while another thread is saving is skipped (that save covers it or the
+        next one will).
+        """
+        if not self.persist_path or not self._dirty:
+            return
+        if not force and time.monotonic() - self._last_save < self.save_interval:
+            return
+        if not self._save_lock.acquire(blocking=force):
+            return
+        tmp_path = None
+        try:
+            with self._lock:
+                data = dict(self._entries)
+                self._dirty = False
+            # Unique temporary file next to the target, so other processes
+            # saving the same cache never replace each other's half-written file
+            directory = os.path.dirname(os.path.abspath(self.persist_path))
+            with tempfile.NamedTemporaryFile('w', dir=directory, prefix=os.path.basename(self.persist_path) + '.',
+                                             suffix='.tmp', delete=False) as f:
+                tmp_path = f.name
+                json.dump(data, f)
+            os.replace(tmp_path, self.persist_path)
+            tmp_path = None
+        except OSError as e:
+            self._dirty = True
+            logger.warning("Sentiment cache save error: %s", e)
+        finally:
+            if tmp_path:
+                try:
+                    os.remove(tmp_path)
+                except OSError:
+                    pass
+            self._last_save = time.monotonic()
+            self._save_lock.release()
+    
+    def __len__(self):
+        return len(self._entries)
+
+# Shared cache; set SENTIMENT_CACHE_PATH to persist across restarts
+sentiment_cache = SentimentCache(
+    max_entries=int(os.environ.get('SENTIMENT_CACHE_SIZE', 5000)),
+    persist_path=os.environ.get('SENTIMENT_CACHE_PATH')
+)
+if sentiment_cache.persist_path:
+    # Saves are throttled; write whatever is left on shutdown
+    atexit.register(sentiment_cache.save, force=True)
+
 # -----------------------------------------------------------
 #  SENTIMENT ANALYSIS ENGINE
 # -----------------------------------------------------------
 
-def advanced_sentiment_analysis(news_data):
+# Keyword -> its inflected forms, spelled out (suffix rules invent non-words
+# and false hits: "win" -> "wines", "drop" -> "droped"). "won" is left out
+# on purpose, it is also the Korean currency.
+POSITIVE_KEYWORDS = {
+    'bullish': (),
+    'growth': (),
+    'positive': (),
+    'gain': ('gains', 'gained', 'gaining'),
+    'rise': ('rises', 'rose', 'risen', 'rising'),
+    'increase': ('increases', 'increased', 'increasing'),
+    'strong': ('stronger', 'strongest'),
+    'success': ('successes', 'successful'),
+    'profit': ('profits', 'profited', 'profitable'),
+    'win': ('wins', 'winning'),
+    'optimistic': (),
+    'rally': ('rallies', 'rallied', 'rallying'),
+    'breakout': ('breakouts',),
+}
+NEGATIVE_KEYWORDS = {
+    'bearish': (),
+    'decline': ('declines', 'declined', 'declining'),
+    'negative': (),
+    'loss': ('losses',),
+    'fall': ('falls', 'fell', 'fallen', 'falling'),
+    'drop': ('drops', 'dropped', 'dropping'),
+    'weak': ('weaker', 'weakest', 'weakness'),
+    'fail': ('fails', 'failed', 'failing', 'failure'),
+    'crash': ('crashes', 'crashed', 'crashing'),
+    'warn': ('warns', 'warned', 'warning', 'warnings'),
+    'risk': ('risks', 'risky'),
+    'selloff': ('selloffs',),
+    'downtrend': ('downtrends',),
+}
+
+# Surface form -> polarity (+1 positive, -1 negative) and base keyword
+_KEYWORD_LOOKUP = {}
+for _polarity, _keywords in ((1, POSITIVE_KEYWORDS), (-1, NEGATIVE_KEYWORDS)):
+    for _word, _forms in _keywords.items():
+        _KEYWORD_LOOKUP.update({form: (_polarity, _word) for form in (_word, *_forms)})
+
+# One compiled pattern for every keyword, whole words only
+# (so "win" no longer matches "window" and "rise" no longer matches "surprise")
+_KEYWORD_PATTERN = re.compile(
+    r"\b(" + "|".join(sorted(map(re.escape, _KEYWORD_LOOKUP), key=len, reverse=True)) + r")\b"
+)
+
+def _keyword_counts(texts):
+    """Count distinct positive/negative keywords per text in a single scan"""
+    pos_counts = np.zeros(len(texts), dtype=np.int64)
+    neg_counts = np.zeros(len(texts), dtype=np.int64)
+    
+    # Lowercase and scan all texts at once, then map matches back to articles.
+    # Offsets come from the lowered texts: lower() can change a string's
+    # length ("İ" becomes two code points).
+    lowered = [text.lower() for text in texts]
+    blob = "\n".join(lowered)
+    starts = np.cumsum([0] + [len(text) + 1 for text in lowered[:-1]])
+    
+    matches = [(m.start(), m.group(1)) for m in _KEYWORD_PATTERN.finditer(blob)]
+    if not matches:
+        return pos_counts, neg_counts
+    
+    article_idx = np.searchsorted(starts, [pos for pos, _ in matches], side='right') - 1
+    seen = set()
+    for idx, (_, form) in zip(article_idx.tolist(), matches):
+        polarity, word = _KEYWORD_LOOKUP[form]
+        if (idx, word) not in seen:
+            seen.add((idx, word))
+            (pos_counts if polarity > 0 else neg_counts)[idx] += 1
+    
+    return pos_counts, neg_counts
+
+def batch_sentiment_scores(texts):
+    """
+    Score many texts in one call.
+    Returns (combined_scores, polarities, subjectivities) as NumPy arrays.
+    """
+    if not texts:
+        empty = np.zeros(0)
+        return empty, empty, empty
+    
+    # TextBlob sentiment (only for texts not seen before)
+    TextBlob = get_engine("textblob")
+    polarities = np.zeros(len(texts))
+    subjectivities = np.zeros(len(texts))
+    for i, text in enumerate(texts):
+        cached = sentiment_cache.get(text)
+        if cached is None:
+            if TextBlob is None:
+                # Keyword-only scoring when TextBlob is not installed
+                continue
+            sentiment = TextBlob(text).sentiment
+            cached = (sentiment.polarity, sentiment.subjectivity)
+            sentiment_cache.set(text, *cached)
+        polarities[i], subjectivities[i] = cached
+    sentiment_cache.save()
+    
+    # Custom keyword analysis
+    pos_counts, neg_counts = _keyword_counts(texts)
+    
+    # Combined sentiment score (vectorized)
+    keyword_scores = (pos_counts - neg_counts) / np.maximum(pos_counts + neg_counts, 1)
+    combined_scores = (polarities + keyword_scores) / 2
+    
+    return combined_scores, polarities, subjectivities
+
+def advanced_sentiment_analysis(news_data, max_articles=500):
     """Advanced sentiment analysis using multiple techniques"""
     if not news_data:
         return {"overall": "Neutral", "score": 0.5, "breakdown": {}}
     
-    sentiments = []
-    sources = []
+    articles = news_data[:max_articles] if max_articles else news_data
+    texts = [f"{news.get('title', '')} {news.get('description', '')}" for news in articles]
     
-    for news in news_data[:10]:  # Analyze top 10 news
-        text = f"{news.get('title', '')} {news.get('description', '')}"
-        
-        # TextBlob sentiment
-        blob = TextBlob(text)
-        polarity = blob.sentiment.polarity
-        subjectivity = blob.sentiment.subjectivity
-        
-        # Custom keyword analysis
-        positive_words = ['bullish', 'growth', 'positive', 'gain', 'rise', 'increase', 'strong', 
-                         'success', 'profit', 'win', 'optimistic', 'rally', 'breakout']
-        negative_words = ['bearish', 'decline', 'negative', 'loss', 'fall', 'drop', 'weak',
-                         'fail', 'crash', 'warn', 'risk', 'selloff', 'downtrend']
-        
-        pos_count = sum(1 for word in positive_words if word in text.lower())
-        neg_count = sum(1 for word in negative_words if word in text.lower())
-        
-        # Combined sentiment score
-        keyword_score = (pos_count - neg_count) / max(pos_count + neg_count, 1)
-        combined_score = (polarity + keyword_score) / 2
-        
-        sentiments.append(combined_score)
-        sources.append(news.get('source', 'Unknown'))
+    scores, _, _ = batch_sentiment_scores(texts)
+    sentiments = scores.tolist()
     
     if not sentiments:
         return {"overall": "Neutral", "score": 0.5, "breakdown": {}}
@@ -119,10 +762,7 @@ def advanced_sentiment_analysis(news_data):
 #  LLAMA 3 ENHANCED WITH PROMPT ENGINEERING
 # -----------------------------------------------------------
 
-def analyze_with_llama(prompt, enhanced_context=None):
-    """Enhanced Llama 3 with professional financial context"""
-    
-    professional_system_prompt = """You are Quantum Financial AI, a top-tier hedge fund analyst with 20 years of experience.
+PROFESSIONAL_SYSTEM_PROMPT = """You are Quantum Financial AI, a top-tier hedge fund analyst with 20 years of experience.
     You analyze markets with quantitative models, technical analysis, and fundamental valuation.
     Your responses must be professional, data-driven, and include specific numbers.
     
@@ -148,43 +788,153 @@ def analyze_with_llama(prompt, enhanced_context=None):
     
     TIME HORIZON:
     [Recommended holding period]"""
+
+LLAMA_CLI_TIMEOUT = 30
+
+def _load_ollama():
+    from services.ollama_client import get_client
+    return get_client(preload=True)
+
+register_engine("ollama", _load_ollama)
+
+def warm_up_llama():
+    """Create the shared Ollama client and preload the model in the background"""
+    return engine_available("ollama")
+
+def _run_llama_http(user_prompt):
+    """
+    Run the prompt through the pooled Ollama HTTP client.
+    Returns None if no server is reachable, or the server does not have the
+    model, so the caller can fall back to the CLI.
+    """
+    client = get_engine("ollama")
+    if client is None:
+        return None
     
-    full_prompt = f"{professional_system_prompt}\n\n{prompt}"
-    
-    if enhanced_context:
-        full_prompt = f"{full_prompt}\n\nAdditional Context: {enhanced_context}"
+    import requests
+    from services.ollama_client import OllamaError
+    try:
+        response = client.generate(user_prompt, system=PROFESSIONAL_SYSTEM_PROMPT)
+    except requests.exceptions.ConnectionError:
+        return None
+    except OllamaError as e:
+        # 404: the model was never pulled on this server; `ollama run` pulls it
+        if e.status_code == 404:
+            return None
+        return {"error": f"Llama engine error: {e}"}
+    except requests.exceptions.Timeout:
+        return {"error": "Analysis timeout - service busy"}
+    except Exception as e:
+        return {"error": f"Llama engine error: {e}"}
     
+    return {"analysis": response}
+
+def _llama_model():
+    """Model name for both backends: the HTTP client's model, which the CLI must run as well"""
+    client = get_engine("ollama")
+    if client is not None:
+        return client.model
+    return os.environ.get('OLLAMA_MODEL', 'llama3')
+
+def _run_llama_cli(full_prompt):
+    """Run the prompt through a one-off `ollama run` subprocess"""
     try:
         result = subprocess.run(
-            ["ollama", "run", "llama3", full_prompt],
+            ["ollama", "run", _llama_model(), full_prompt],
             capture_output=True,
             text=True,
-            timeout=30
+            timeout=LLAMA_CLI_TIMEOUT
         )
 
         if result.returncode != 0:
             return {"error": "Llama engine error", "stdout": result.stdout, "stderr": result.stderr}
 
-        # Parse the structured response
-        response = result.stdout
-        parsed = parse_structured_response(response)
-        
-        return {"analysis": response, **parsed}
+        return {"analysis": result.stdout}
 
     except subprocess.TimeoutExpired:
         return {"error": "Analysis timeout - service busy"}
     except Exception as e:
         return {"error": str(e)}
 
+def complete_with_llama(prompt, enhanced_context=None):
+    """Run the prompt through Llama 3 and return the unparsed {"analysis": text}"""
+    
+    if enhanced_context:
+        prompt = f"{prompt}\n\nAdditional Context: {enhanced_context}"
+    
+    # Prefer the persistent HTTP server; fall back to the CLI if it is not running
+    result = _run_llama_http(prompt)
+    if result is not None:
+        return result
+    
+    return _run_llama_cli(f"{PROFESSIONAL_SYSTEM_PROMPT}\n\n{prompt}")
+
+def analyze_with_llama(prompt, enhanced_context=None):
+    """Enhanced Llama 3 with professional financial context"""
+    result = complete_with_llama(prompt, enhanced_context)
+    if "error" not in result:
+        result.update(parse_structured_response(result["analysis"]))
+    return result
+
 # -----------------------------------------------------------
 #  RESPONSE PARSER
 # -----------------------------------------------------------
 
-def parse_structured_response(response):
-    """Parse structured AI response into components"""
+ANALYSIS_SECTIONS = {
+    "technical_analysis": "TECHNICAL ANALYSIS",
+    "fundamental_analysis": "FUNDAMENTAL ASSESSMENT",
+    "market_sentiment": "MARKET SENTIMENT",
+    "risk_assessment": "RISK ASSESSMENT",
+    "recommendation": "RECOMMENDATION",
+    "support_resistance": "KEY SUPPORT/RESISTANCE",
+    "time_horizon": "TIME HORIZON"
+}
+
+_SECTION_KEYS = {title.lower(): key for key, title in ANALYSIS_SECTIONS.items()}
+_SECTION_KEYS["support/resistance"] = "support_resistance"
+
+# A section header line, e.g. "TECHNICAL ANALYSIS:", "**RISK ASSESSMENT (1-10):** 6/10", "## Recommendation"
+_SECTION_HEADER = re.compile(
+    r"^[ \t#*>\d.)-]*(?P<title>" + "|".join(map(re.escape, sorted(_SECTION_KEYS, key=len, reverse=True))) + r")"
+    r"(?:[ \t]*\([^)\n]*\))?[ \t*]*(?::(?P<rest>[^\r\n]*))?[ \t\r]*$",
+    re.IGNORECASE | re.MULTILINE
+)
+
+# Field extractors, each applied to the section it belongs to
+_RECOMMENDATION_PATTERN = re.compile(r"\b(buy|sell|hold)\b", re.IGNORECASE)
+_RISK_PATTERN = re.compile(r"\b(10|[1-9])(?:\.\d+)?\s*/\s*10\b")
+_CONFIDENCE_PATTERN = re.compile(r"confidence[^\d\n]{0,40}(\d{1,3})(?:\.\d+)?\s*%", re.IGNORECASE)
+# A price: thousands groups or plain digits, so "$42,000, resistance" stops before the comma
+_PRICE = r"\$?(?:\d{1,3}(?:,\d{3})*(?:\.\d+)?|\d+(?:\.\d+)?)"
+_LEVEL_PATTERNS = {
+    "support_level": re.compile(r"support[^\d\n;]{0,30}?(" + _PRICE + r")(?![\d-]|\s*(?:day|%))", re.IGNORECASE),
+    "resistance_level": re.compile(r"resistance[^\d\n;]{0,30}?(" + _PRICE + r")(?![\d-]|\s*(?:day|%))", re.IGNORECASE)
+}
+
+def _add_section(sections, key, rest, body):
+    """Store a section's text; a repeated header extends the earlier section"""
+    text = f"{rest}\n{body}".strip() if rest else body.strip()
+    if sections.get(key):
+        text = f"{sections[key]}\n{text}".strip()
+    sections[key] = text
+    return text
+
+def split_sections(response):
+    """Split a full response into {section key: text} in one pass over the text"""
+    sections = {}
+    matches = list(_SECTION_HEADER.finditer(response))
+    for i, match in enumerate(matches):
+        end = matches[i + 1].start() if i + 1 < len(matches) else len(response)
+        rest = (match.group("rest") or "").strip(" *")
+        body = response[match.end():end]
+        _add_section(sections, _SECTION_KEYS[match.group("title").lower()], rest, body)
+    return sections
+
+def extract_components(sections, response=""):
+    """Turn split sections into the fields the pages use"""
     components = {
-        "technical_analysis": "",
-        "fundamental_analysis": "",
+        "technical_analysis": sections.get("technical_analysis", ""),
+        "fundamental_analysis": sections.get("fundamental_analysis", ""),
         "recommendation": "Hold",
         "risk_score": "5/10",
         "confidence_score": "85%",
@@ -193,61 +943,109 @@ def parse_structured_response(response):
         "time_horizon": "3-6 months"
     }
     
-    lines = response.split('\n')
-    current_section = None
+    match = _RECOMMENDATION_PATTERN.search(sections.get("recommendation", ""))
+    if match:
+        components["recommendation"] = match.group(1).capitalize()
     
-    for line in lines:
-        line_lower = line.lower().strip()
-        
-        if "technical analysis" in line_lower:
-            current_section = "technical_analysis"
-        elif "fundamental assessment" in line_lower:
-            current_section = "fundamental_analysis"
-        elif "recommendation" in line_lower:
-            current_section = "recommendation"
-            # Extract recommendation
-            if "buy" in line_lower:
-                components["recommendation"] = "Buy"
-            elif "sell" in line_lower:
-                components["recommendation"] = "Sell"
-        elif "risk assessment" in line_lower:
-            # Extract risk score
-            import re
-            risk_match = re.search(r'(\d+)/10', line)
-            if risk_match:
-                components["risk_score"] = risk_match.group(0)
-        elif "confidence" in line_lower:
-            # Extract confidence
-            import re
-            conf_match = re.search(r'(\d+)%', line)
-            if conf_match:
-                components["confidence_score"] = conf_match.group(0)
-        elif current_section and line.strip():
-            components[current_section] += line + "\n"
+    match = _RISK_PATTERN.search(sections.get("risk_assessment", ""))
+    if match:
+        components["risk_score"] = f"{match.group(1)}/10"
+    
+    # Confidence belongs to the recommendation; a mention anywhere else is the fallback
+    match = (_CONFIDENCE_PATTERN.search(sections.get("recommendation", ""))
+             or _CONFIDENCE_PATTERN.search(response or "\n".join(sections.values())))
+    if match:
+        components["confidence_score"] = f"{min(int(match.group(1)), 100)}%"
+    
+    levels = sections.get("support_resistance", "")
+    for field, pattern in _LEVEL_PATTERNS.items():
+        match = pattern.search(levels)
+        if match:
+            components[field] = match.group(1)
+    
+    horizon = sections.get("time_horizon", "").strip()
+    if horizon:
+        components["time_horizon"] = horizon.split("\n", 1)[0].strip(" -*")
     
     return components
 
-# -----------------------------------------------------------
-#  ENHANCED MARKET ANALYSIS FUNCTION
-# -----------------------------------------------------------
-
-def market_analysis(asset_name, price, high, low, volume, sentiment_data, price_history=None, 
-                    market_cap=None, use="llama", api_key=None):
+class StreamingSectionParser:
     """
-    Professional-grade market analysis with multiple models
+    Incremental version of split_sections for streamed model output.
+    feed() returns the sections completed by the new chunk as (key, text) pairs.
     """
     
-    # Generate price history if not provided
-    if price_history is None and price:
-        # Create synthetic price history for analysis
-        base_price = float(price) if isinstance(price, (int, float, str)) else 100
-        price_history = [base_price * (0.95 + 0.1 * random.random()) for _ in range(30)]
+    def __init__(self):
+        self._pending = ""
+        self._section = None
+        self._rest = ""
+        self._lines = []
+        self._confidence = None
+        self.sections = {}
     
-    # Calculate technical indicators
-    tech_indicators = calculate_technical_indicators(price_history)
+    def feed(self, chunk):
+        completed = []
+        *lines, self._pending = (self._pending + chunk).split("\n")
+        for line in lines:
+            self._consume(line, completed)
+        return completed
     
-    # Enhanced prompt with professional context
-    prompt = f"""
+    def close(self):
+        """Flush the last (unterminated) section"""
+        completed = []
+        if self._pending:
+            self._consume(self._pending, completed)
+            self._pending = ""
+        if self._section:
+            completed.append(self._finish())
+        return completed
+    
+    def components(self):
+        """Same fields as parse_structured_response, from the sections seen so far"""
+        components = extract_components(self.sections)
+        # Confidence seen outside the sections only counts if the recommendation has none
+        if self._confidence and not _CONFIDENCE_PATTERN.search(self.sections.get("recommendation", "")):
+            components["confidence_score"] = self._confidence
+        return components
+    
+    def _consume(self, line, completed):
+        match = _SECTION_HEADER.match(line)
+        if match:
+            if self._section:
+                completed.append(self._finish())
+            self._section = _SECTION_KEYS[match.group("title").lower()]
+            self._rest = (match.group("rest") or "").strip(" *")
+            self._lines = []
+            return
+        
+        if self._confidence is None:
+            # Text outside any section is not kept, so pick confidence up line by line
+            confidence = _CONFIDENCE_PATTERN.search(line)
+            if confidence:
+                self._confidence = f"{min(int(confidence.group(1)), 100)}%"
+        if self._section:
+            self._lines.append(line)
+    
+    def _finish(self):
+        section = self._section
+        text = _add_section(self.sections, section, self._rest, "\n".join(self._lines))
+        self._section, self._rest, self._lines = None, "", []
+        return section, text
+
+def parse_structured_response(response):
+    """Parse structured AI response into components"""
+    return extract_components(split_sections(response), response)
+
+# -----------------------------------------------------------
+#  ENHANCED MARKET ANALYSIS FUNCTION
+# -----------------------------------------------------------
+
+OPENAI_SYSTEM_PROMPT = "You are a senior portfolio manager at a quantitative hedge fund."
+OPENAI_MODEL = "gpt-4"
+
+def build_analysis_prompt(asset_name, price, high, low, volume, sentiment_data, tech_indicators, market_cap=None):
+    """Build the professional analysis prompt sent to the model"""
+    return f"""
     PROFESSIONAL FINANCIAL ANALYSIS REQUEST
     
     ASSET: {asset_name}
@@ -278,42 +1076,168 @@ def market_analysis(asset_name, price, high, low, volume, sentiment_data, price_
     6. Portfolio allocation suggestion
     7. Black swan risk assessment
     """
+
+_history_indicators = OrderedDict()
+_history_indicators_lock = threading.Lock()
+HISTORY_INDICATOR_CACHE_SIZE = 512
+
+def indicators_for_history(history):
+    """
+    calculate_technical_indicators for a data_fetch.get_price_history() bar set,
+    computed once per bar set (keyed by its fingerprint) and reused.
+    """
+    key = history.get("fingerprint")
+    with _history_indicators_lock:
+        if key in _history_indicators:
+            _history_indicators.move_to_end(key)
+            return dict(_history_indicators[key])
+    
+    result = calculate_technical_indicators(history.get("close", []))
+    if key:
+        with _history_indicators_lock:
+            _history_indicators[key] = result
+            while len(_history_indicators) > HISTORY_INDICATOR_CACHE_SIZE:
+                _history_indicators.popitem(last=False)
+    return dict(result)
+
+def _prepare_market_analysis(price, price_history):
+    """
+    Technical indicators plus a note on where the bars came from.
+    price_history may be a list of closes or a get_price_history() dict;
+    when it is missing, flagged synthetic bars are generated.
+    """
+    if price_history is None and price:
+        from services.data_fetch import synthetic_price_history
+        price_history = synthetic_price_history("UNKNOWN", price, days=30)
+    
+    if isinstance(price_history, dict):
+        history_info = {
+            "source": price_history.get("source"),
+            "synthetic": bool(price_history.get("synthetic")),
+            "bars": len(price_history.get("close", []))
+        }
+        return indicators_for_history(price_history), history_info
+    
+    price_history = price_history or []
+    history_info = {"source": "caller" if price_history else None, "synthetic": False, "bars": len(price_history)}
+    return calculate_technical_indicators(price_history), history_info
+
+def _with_history(result, history_info):
+    """Record which bars a successful result was computed from"""
+    if "error" not in result:
+        result["price_history"] = history_info
+    return result
+
+def _enrich_llama_result(result, price, tech_indicators, sentiment_data):
+    """Add calculated indicators to a successful Llama result"""
+    if "error" not in result:
+        result.update({
+            "technical_indicators": tech_indicators,
+            "market_sentiment": sentiment_data,
+            "calculated_metrics": {
+                "price_to_sma_ratio": price / tech_indicators.get('sma_20', price) if price and tech_indicators.get('sma_20') else 1,
+                "volatility_category": "High" if tech_indicators.get('volatility_percent', 0) > 5 else "Low",
+                "momentum_score": (price - tech_indicators.get('sma_20', price)) / price * 100 if price else 0
+            }
+        })
+    return result
+
+def _llama_context(tech_indicators):
+    return f"Technical Indicators: {json.dumps(tech_indicators)}"
+
+def _model_name(use):
+    """Model identifier used in analysis cache keys"""
+    if use == "llama":
+        return f"ollama:{_llama_model()}"
+    return f"openai:{OPENAI_MODEL}"
+
+def _analysis_cache_key(use, asset_name, price, high, low, volume, sentiment_data, tech_indicators, market_cap,
+                        namespace=None):
+    """
+    Cache key for a market snapshot: the prompt rebuilt from bucketed inputs,
+    so re-analyzing within a small price move hits the cache. A namespace
+    keeps answers in another format (e.g. batched) apart from single-asset ones.
+    """
+    bucketed_indicators = {
+        'sma_20': bucket_value(tech_indicators.get('sma_20', 0)),
+        'sma_50': bucket_value(tech_indicators.get('sma_50', 0)),
+        'rsi': round_to(tech_indicators.get('rsi', 50), 1),
+        'volatility_percent': round_to(tech_indicators.get('volatility_percent', 0), 0.25),
+        'trend': tech_indicators.get('trend', 'Neutral'),
+        'support_level': bucket_value(tech_indicators.get('support_level', 0)),
+        'resistance_level': bucket_value(tech_indicators.get('resistance_level', 0))
+    }
+    bucketed_sentiment = {
+        'overall': sentiment_data.get('overall', 'Neutral'),
+        'score': round_to(sentiment_data.get('score', 0), 0.05)
+    }
+    prompt = build_analysis_prompt(
+        asset_name, bucket_value(price), bucket_value(high), bucket_value(low),
+        bucket_value(volume, 0.05), bucketed_sentiment, bucketed_indicators,
+        bucket_value(market_cap, 0.01) if market_cap else None
+    )
+    if use == "llama":
+        prompt = f"{prompt}\n\nAdditional Context: {_llama_context(bucketed_indicators)}"
+    model = f"{_model_name(use)}|{namespace}" if namespace else _model_name(use)
+    return make_key(model, prompt)
+
+def _result_from_text(use, text, price, tech_indicators, sentiment_data, components=None):
+    """Rebuild a market_analysis result from (cached) model output"""
+    if use == "llama":
+        result = {"analysis": text, **(components or parse_structured_response(text))}
+        return _enrich_llama_result(result, price, tech_indicators, sentiment_data)
+    return {"analysis": text}
+
+def _engine_selected(use, api_key):
+    return use == "llama" or (use == "openai" and api_key and engine_available("openai"))
+
+def market_analysis(asset_name, price, high, low, volume, sentiment_data, price_history=None, 
+                    market_cap=None, use="llama", api_key=None):
+    """
+    Professional-grade market analysis with multiple models
+    """
+    
+    tech_indicators, history_info = _prepare_market_analysis(price, price_history)
+    
+    # Enhanced prompt with professional context
+    prompt = build_analysis_prompt(asset_name, price, high, low, volume, sentiment_data,
+                                   tech_indicators, market_cap)
+    
+    # Identical (bucketed) snapshots are answered from the cache
+    cache_key = None
+    if _engine_selected(use, api_key):
+        cache_key = _analysis_cache_key(use, asset_name, price, high, low, volume,
+                                        sentiment_data, tech_indicators, market_cap)
+        cached = analysis_cache.get(cache_key)
+        if cached is not None:
+            return _with_history(_result_from_text(use, cached, price, tech_indicators, sentiment_data), history_info)
     
     # Use enhanced Llama analysis
     if use == "llama":
-        result = analyze_with_llama(prompt, 
-                                   enhanced_context=f"Technical Indicators: {json.dumps(tech_indicators)}")
-        
-        # Add calculated indicators to result
+        result = analyze_with_llama(prompt, enhanced_context=_llama_context(tech_indicators))
         if "error" not in result:
-            result.update({
-                "technical_indicators": tech_indicators,
-                "market_sentiment": sentiment_data,
-                "calculated_metrics": {
-                    "price_to_sma_ratio": price / tech_indicators.get('sma_20', price) if price and tech_indicators.get('sma_20') else 1,
-                    "volatility_category": "High" if tech_indicators.get('volatility_percent', 0) > 5 else "Low",
-                    "momentum_score": (price - tech_indicators.get('sma_20', price)) / price * 100 if price else 0
-                }
-            })
-        
-        return result
+            analysis_cache.set(cache_key, result["analysis"], model=_model_name(use))
+        return _with_history(_enrich_llama_result(result, price, tech_indicators, sentiment_data), history_info)
     
     # OpenAI analysis (if available)
-    elif use == "openai" and api_key and OPENAI_AVAILABLE:
+    elif use == "openai" and api_key and engine_available("openai"):
         try:
+            OpenAI = get_engine("openai")
             client = OpenAI(api_key=api_key)
             
             response = client.chat.completions.create(
-                model="gpt-4",
+                model=OPENAI_MODEL,
                 messages=[
-                    {"role": "system", "content": "You are a senior portfolio manager at a quantitative hedge fund."},
+                    {"role": "system", "content": OPENAI_SYSTEM_PROMPT},
                     {"role": "user", "content": prompt}
                 ],
                 temperature=0.3,
                 max_tokens=1000
             )
             
-            return {"analysis": response.choices[0].message.content}
+            text = response.choices[0].message.content
+            analysis_cache.set(cache_key, text, model=_model_name(use))
+            return _with_history({"analysis": text}, history_info)
             
         except Exception as e:
             return {"error": str(e)}
@@ -321,76 +1245,198 @@ def market_analysis(asset_name, price, high, low, volume, sentiment_data, price_
     return {"error": "No valid AI engine selected"}
 
 # -----------------------------------------------------------
-#  ENHANCED COMPATIBILITY FUNCTION
+#  STREAMING ANALYSIS
 # -----------------------------------------------------------
 
-def ai_market_analysis(symbol, crypto_data, stock_data, news_data, use="llama", api_key=None):
+def _stream_llama(prompt, enhanced_context=None):
+    """Yield Llama output chunks, preferring the HTTP server over the CLI"""
+    if enhanced_context:
+        prompt = f"{prompt}\n\nAdditional Context: {enhanced_context}"
+    
+    import requests
+    from services.ollama_client import OllamaError
+    client = get_engine("ollama")
+    if client is not None:
+        streamed = False
+        try:
+            for chunk in client.generate_stream(prompt, system=PROFESSIONAL_SYSTEM_PROMPT):
+                streamed = True
+                yield chunk
+            return
+        except (requests.exceptions.ConnectionError, OllamaError) as e:
+            # Fall back only before any output: no server, or the model is not
+            # pulled there. A stream that broke midway is not replayed, which
+            # would repeat the text already yielded.
+            if streamed or (isinstance(e, OllamaError) and e.status_code != 404):
+                raise
+    
+    process = subprocess.Popen(
+        ["ollama", "run", _llama_model(), f"{PROFESSIONAL_SYSTEM_PROMPT}\n\n{prompt}"],
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        text=True
+    )
+    # Drain stderr while stdout streams, so a chatty CLI cannot fill the pipe and stall
+    stderr_lines = []
+    stderr_reader = threading.Thread(target=lambda: stderr_lines.extend(process.stderr), daemon=True)
+    stderr_reader.start()
+    timed_out = threading.Event()
+    
+    def kill_on_timeout():
+        timed_out.set()
+        process.kill()
+    
+    timer = threading.Timer(LLAMA_CLI_TIMEOUT, kill_on_timeout)
+    timer.start()
+    try:
+        for line in process.stdout:
+            yield line
+        process.wait()
+    finally:
+        timer.cancel()
+        if process.poll() is None:
+            process.kill()
+    
+    if timed_out.is_set():
+        # Same exception as subprocess.run, so callers report a timeout, not an engine error
+        raise subprocess.TimeoutExpired(process.args, LLAMA_CLI_TIMEOUT)
+    if process.returncode != 0:
+        stderr_reader.join(timeout=5)
+        raise RuntimeError(f"Llama engine error: {''.join(stderr_lines).strip()}")
+
+def _stream_openai(prompt, api_key):
+    """Yield OpenAI output chunks"""
+    OpenAI = get_engine("openai")
+    client = OpenAI(api_key=api_key)
+    
+    response = client.chat.completions.create(
+        model=OPENAI_MODEL,
+        messages=[
+            {"role": "system", "content": OPENAI_SYSTEM_PROMPT},
+            {"role": "user", "content": prompt}
+        ],
+        temperature=0.3,
+        max_tokens=1000,
+        stream=True
+    )
+    
+    for chunk in response:
+        if chunk.choices and chunk.choices[0].delta.content:
+            yield chunk.choices[0].delta.content
+
+def stream_market_analysis(asset_name, price, high, low, volume, sentiment_data, price_history=None,
+                           market_cap=None, use="llama", api_key=None):
     """
-    Enhanced compatibility wrapper with professional features
+    Streaming version of market_analysis.
+    Yields events while the model is writing:
+      {"type": "token", "text": ...}                      raw output chunk
+      {"type": "section", "section": key, "text": ...}    a completed report section
+      {"type": "done", "result": {...}}                   same dict market_analysis returns
     """
+    tech_indicators, history_info = _prepare_market_analysis(price, price_history)
+    prompt = build_analysis_prompt(asset_name, price, high, low, volume, sentiment_data,
+                                   tech_indicators, market_cap)
     
-    # Determine data source with priority
-    asset_data = None
-    asset_type = "Unknown"
+    if not _engine_selected(use, api_key):
+        yield {"type": "done", "result": {"error": "No valid AI engine selected"}}
+        return
+    
+    parser = StreamingSectionParser()
+    cache_key = _analysis_cache_key(use, asset_name, price, high, low, volume,
+                                    sentiment_data, tech_indicators, market_cap)
+    cached = analysis_cache.get(cache_key)
+    if cached is not None:
+        yield {"type": "token", "text": cached}
+        for section, text in parser.feed(cached) + parser.close():
+            yield {"type": "section", "section": section, "text": text}
+        result = _result_from_text(use, cached, price, tech_indicators, sentiment_data,
+                                   components=parser.components())
+        yield {"type": "done", "result": _with_history(result, history_info)}
+        return
     
+    if use == "llama":
+        chunks = _stream_llama(prompt, enhanced_context=_llama_context(tech_indicators))
+    else:
+        chunks = _stream_openai(prompt, api_key)
+    
+    import requests
+    parts = []
+    try:
+        for chunk in chunks:
+            parts.append(chunk)
+            yield {"type": "token", "text": chunk}
+            for section, text in parser.feed(chunk):
+                yield {"type": "section", "section": section, "text": text}
+    except (subprocess.TimeoutExpired, requests.exceptions.Timeout):
+        yield {"type": "done", "result": {"error": "Analysis timeout - service busy"}}
+        return
+    except Exception as e:
+        yield {"type": "done", "result": {"error": str(e)}}
+        return
+    
+    for section, text in parser.close():
+        yield {"type": "section", "section": section, "text": text}
+    
+    response = "".join(parts)
+    analysis_cache.set(cache_key, response, model=_model_name(use))
+    
+    result = _result_from_text(use, response, price, tech_indicators, sentiment_data,
+                               components=parser.components())
+    yield {"type": "done", "result": _with_history(result, history_info)}
+
+# -----------------------------------------------------------
+#  ENHANCED COMPATIBILITY FUNCTION
+# -----------------------------------------------------------
+
+def _resolve_asset(crypto_data, stock_data):
+    """Pick the asset data source and normalise its price fields"""
+    # Determine data source with priority
     if crypto_data and "price" in crypto_data:
         asset_data = crypto_data
-        asset_type = "Cryptocurrency"
         price = float(asset_data.get("price", 0))
-        high = float(asset_data.get("high_24h", price * 1.05))
-        low = float(asset_data.get("low_24h", price * 0.95))
-        volume = asset_data.get("volume_24h", 0)
-        market_cap = asset_data.get("market_cap", None)
+        return {
+            "asset_type": "Cryptocurrency",
+            "price": price,
+            "high": float(asset_data.get("high_24h", price * 1.05)),
+            "low": float(asset_data.get("low_24h", price * 0.95)),
+            "volume": asset_data.get("volume_24h", 0),
+            "market_cap": asset_data.get("market_cap", None)
+        }
         
     elif stock_data and "price" in stock_data:
         asset_data = stock_data
-        asset_type = "Stock"
         price = float(asset_data.get("price", 0))
-        high = float(asset_data.get("high", price * 1.05))
-        low = float(asset_data.get("low", price * 0.95))
-        volume = asset_data.get("volume", 0)
-        market_cap = asset_data.get("market_cap", None)
-        
-    else:
-        # Fallback data
-        price = 0
-        high = 0
-        low = 0
-        volume = 0
-        market_cap = None
-    
-    # Advanced sentiment analysis
-    sentiment_result = advanced_sentiment_analysis(news_data)
-    
-    # Generate price history for technical analysis
-    price_history = []
-    if price > 0:
-        # Create realistic price history
-        base_price = price
-        for i in range(30):
-            change = random.uniform(-0.02, 0.02)
-            base_price *= (1 + change)
-            price_history.append(base_price)
+        return {
+            "asset_type": "Stock",
+            "price": price,
+            "high": float(asset_data.get("high", price * 1.05)),
+            "low": float(asset_data.get("low", price * 0.95)),
+            "volume": asset_data.get("volume", 0),
+            "market_cap": asset_data.get("market_cap", None)
+        }
     
-    # Get professional analysis
-    raw_analysis = market_analysis(
-        asset_name=f"{symbol.upper()} ({asset_type})",
-        price=price,
-        high=high,
-        low=low,
-        volume=volume,
-        sentiment_data=sentiment_result,
-        price_history=price_history,
-        market_cap=market_cap,
-        use=use,
-        api_key=api_key
-    )
+    # Fallback data
+    return {"asset_type": "Unknown", "price": 0, "high": 0, "low": 0, "volume": 0, "market_cap": None}
+
+def _price_history_for(symbol, asset, days=90):
+    """Real daily bars from the cached history provider (synthetic=True if none could be fetched)"""
+    if not asset["price"]:
+        return None
+    from services.data_fetch import get_price_history
+    asset_type = {"Cryptocurrency": "crypto", "Stock": "stock"}.get(asset["asset_type"])
+    return get_price_history(symbol, asset_type, days=days, fallback_price=asset["price"])
+
+def _build_analysis_result(symbol, asset, sentiment_result, raw_analysis):
+    """Structure a raw model result into the shape the pages expect"""
+    asset_type = asset["asset_type"]
+    price, high, low = asset["price"], asset["high"], asset["low"]
+    volume, market_cap = asset["volume"], asset["market_cap"]
     
     # Parse and structure the response
     analysis_text = raw_analysis.get("analysis", "") or raw_analysis.get("error", "Analysis unavailable")
     
-    # Extract components
-    parsed = parse_structured_response(analysis_text)
+    # Llama results arrive already parsed; only parse text that was not (OpenAI)
+    parsed = raw_analysis if "recommendation" in raw_analysis else parse_structured_response(analysis_text)
     
     # Risk breakdown
     risk_score = parsed.get("risk_score", "5/10")
@@ -439,8 +1485,206 @@ def ai_market_analysis(symbol, crypto_data, stock_data, news_data, use="llama",
         }
     }
     
+    # Where the indicator bars came from; synthetic=True means they are simulated
+    result["price_history"] = raw_analysis.get("price_history", {"source": None, "synthetic": False, "bars": 0})
+    
     # Add calculated metrics
     if raw_analysis.get("calculated_metrics"):
         result["calculated_metrics"] = raw_analysis["calculated_metrics"]
     
-    return result
\ No newline at end of file
+    return result
+
+def ai_market_analysis(symbol, crypto_data, stock_data, news_data, use="llama", api_key=None, price_history=None):
+    """
+    Enhanced compatibility wrapper with professional features.
+    price_history (closes or a get_price_history() dict) is fetched when not given.
+    """
+    
+    asset = _resolve_asset(crypto_data, stock_data)
+    
+    # Advanced sentiment analysis
+    sentiment_result = advanced_sentiment_analysis(news_data)
+    
+    # Get professional analysis
+    raw_analysis = market_analysis(
+        asset_name=f"{symbol.upper()} ({asset['asset_type']})",
+        price=asset["price"],
+        high=asset["high"],
+        low=asset["low"],
+        volume=asset["volume"],
+        sentiment_data=sentiment_result,
+        price_history=price_history if price_history is not None else _price_history_for(symbol, asset),
+        market_cap=asset["market_cap"],
+        use=use,
+        api_key=api_key
+    )
+    
+    return _build_analysis_result(symbol, asset, sentiment_result, raw_analysis)
+
+def stream_ai_market_analysis(symbol, crypto_data, stock_data, news_data, use="llama", api_key=None,
+                              price_history=None):
+    """
+    Streaming version of ai_market_analysis.
+    Yields the same token/section events as stream_market_analysis; the final
+    {"type": "done"} event carries the dict ai_market_analysis would return.
+    """
+    asset = _resolve_asset(crypto_data, stock_data)
+    sentiment_result = advanced_sentiment_analysis(news_data)
+    
+    events = stream_market_analysis(
+        asset_name=f"{symbol.upper()} ({asset['asset_type']})",
+        price=asset["price"],
+        high=asset["high"],
+        low=asset["low"],
+        volume=asset["volume"],
+        sentiment_data=sentiment_result,
+        price_history=price_history if price_history is not None else _price_history_for(symbol, asset),
+        market_cap=asset["market_cap"],
+        use=use,
+        api_key=api_key
+    )
+    
+    for event in events:
+        if event["type"] == "done":
+            yield {"type": "done", "result": _build_analysis_result(symbol, asset, sentiment_result, event["result"])}
+        else:
+            yield event
+
+# -----------------------------------------------------------
+#  PORTFOLIO (MULTI-ASSET) ANALYSIS
+# -----------------------------------------------------------
+
+PORTFOLIO_BATCH_SIZE = 5
+PORTFOLIO_CACHE_NAMESPACE = "portfolio"  # Batched answers are compact, keep them out of single-asset lookups
+
+_ASSET_HEADER = re.compile(r"^[\s#*]*ASSET:\s*\**\s*([A-Za-z0-9.\-/]+)", re.MULTILINE)
+
+def _portfolio_asset_block(symbol, asset, sentiment_data, tech_indicators):
+    """Compact per-asset data block for a batched prompt"""
+    market_cap = asset["market_cap"]
+    return f"""
+    ASSET: {symbol.upper()} ({asset['asset_type']})
+    - Current Price: ${asset['price']:,.2f}
+    - 24h Range: ${asset['low']:,.2f} - ${asset['high']:,.2f}
+    - Volume: {asset['volume']:,}
+    - Market Cap: {f'${market_cap:,}' if market_cap else 'N/A'}
+    - 20-day SMA: ${tech_indicators.get('sma_20', 0):,.2f} | 50-day SMA: ${tech_indicators.get('sma_50', 0):,.2f}
+    - RSI: {tech_indicators.get('rsi', 50):.1f} | Volatility: {tech_indicators.get('volatility_percent', 0):.1f}% | Trend: {tech_indicators.get('trend', 'Neutral')}
+    - Sentiment: {sentiment_data.get('overall', 'Neutral')} ({sentiment_data.get('score', 0):.2f})
+    """
+
+def build_portfolio_prompt(blocks):
+    """Pack several asset blocks into one structured request"""
+    symbols = ", ".join(symbol for symbol, _ in blocks)
+    body = "\n".join(block for _, block in blocks)
+    return f"""
+    PROFESSIONAL PORTFOLIO ANALYSIS REQUEST ({len(blocks)} assets: {symbols})
+    
+    {body}
+    
+    Analyze EVERY asset above separately. Start each asset with a line
+    "ASSET: <SYMBOL>" and then use the standard section format for it.
+    """
+
+def split_portfolio_response(response):
+    """Split a batched response into {SYMBOL: section text}"""
+    matches = list(_ASSET_HEADER.finditer(response))
+    blocks = {}
+    for i, match in enumerate(matches):
+        end = matches[i + 1].start() if i + 1 < len(matches) else len(response)
+        blocks[match.group(1).upper()] = response[match.end():end].strip()
+    return blocks
+
+def _complete_batch(prompt, batch_len, use, api_key):
+    """Run one batched prompt and return the response text"""
+    if use == "llama":
+        result = complete_with_llama(prompt)
+        if "error" in result:
+            raise RuntimeError(result["error"])
+        return result["analysis"]
+    
+    OpenAI = get_engine("openai")
+    client = OpenAI(api_key=api_key)
+    response = client.chat.completions.create(
+        model=OPENAI_MODEL,
+        messages=[
+            {"role": "system", "content": OPENAI_SYSTEM_PROMPT + "\n" + PROFESSIONAL_SYSTEM_PROMPT},
+            {"role": "user", "content": prompt}
+        ],
+        temperature=0.3,
+        max_tokens=min(1000 * batch_len, 4000)
+    )
+    return response.choices[0].message.content
+
+def portfolio_market_analysis(assets, use="llama", api_key=None, batch_size=PORTFOLIO_BATCH_SIZE):
+    """
+    Analyze a watchlist with as few model calls as possible.
+    
+    assets: list of {"symbol", "crypto_data", "stock_data", "news_data"} dicts
+    (the ai_market_analysis arguments). Up to batch_size uncached assets are
+    packed into one prompt; the shared system prompt is sent once per batch
+    and stays identical across batches, so the server can reuse its prefix.
+    Returns {SYMBOL: result} with results shaped like ai_market_analysis.
+    """
+    if not _engine_selected(use, api_key):
+        return {item["symbol"].upper(): {"error": "No valid AI engine selected"} for item in assets}
+    
+    batch_size = max(1, batch_size)
+    results = {}
+    pending = []
+    
+    for item in assets:
+        symbol = item["symbol"].upper()
+        asset = _resolve_asset(item.get("crypto_data"), item.get("stock_data"))
+        sentiment_result = advanced_sentiment_analysis(item.get("news_data"))
+        price_history = item.get("price_history") or _price_history_for(symbol, asset)
+        tech_indicators, history_info = _prepare_market_analysis(asset["price"], price_history)
+        
+        context = (symbol, asset, sentiment_result, tech_indicators)
+        key_args = (use, f"{symbol} ({asset['asset_type']})", asset["price"], asset["high"], asset["low"],
+                    asset["volume"], sentiment_result, tech_indicators, asset["market_cap"])
+        cache_key = _analysis_cache_key(*key_args, namespace=PORTFOLIO_CACHE_NAMESPACE)
+        # A full single-asset answer serves a portfolio just as well, not the other way round
+        cached = analysis_cache.get(cache_key)
+        if cached is None:
+            cached = analysis_cache.get(_analysis_cache_key(*key_args))
+        if cached is not None:
+            raw = _with_history(_result_from_text(use, cached, asset["price"], tech_indicators, sentiment_result),
+                                history_info)
+            results[symbol] = _build_analysis_result(symbol, asset, sentiment_result, raw)
+        else:
+            pending.append((cache_key, context, price_history, history_info))
+    
+    for start in range(0, len(pending), batch_size):
+        batch = pending[start:start + batch_size]
+        blocks = [(ctx[0], _portfolio_asset_block(*ctx)) for _, ctx, _, _ in batch]
+        
+        try:
+            sections = split_portfolio_response(_complete_batch(build_portfolio_prompt(blocks), len(batch), use, api_key))
+        except Exception as e:
+            sections = {}
+            print(f"Portfolio batch error: {e}")
+        
+        for cache_key, (symbol, asset, sentiment_result, tech_indicators), price_history, history_info in batch:
+            text = sections.get(symbol)
+            if text:
+                analysis_cache.set(cache_key, text, model=_model_name(use))
+                raw = _with_history(_result_from_text(use, text, asset["price"], tech_indicators, sentiment_result),
+                                    history_info)
+            else:
+                # Asset missing from the batched answer: analyze it on its own
+                raw = market_analysis(
+                    asset_name=f"{symbol} ({asset['asset_type']})",
+                    price=asset["price"],
+                    high=asset["high"],
+                    low=asset["low"],
+                    volume=asset["volume"],
+                    sentiment_data=sentiment_result,
+                    price_history=price_history,
+                    market_cap=asset["market_cap"],
+                    use=use,
+                    api_key=api_key
+                )
+            results[symbol] = _build_analysis_result(symbol, asset, sentiment_result, raw)
+    
+    return results
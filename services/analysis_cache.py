@@ -0,0 +1,165 @@
+import os
+import json
+import math
+import time
+import hashlib
+import tempfile
+import threading
+from collections import OrderedDict
+
+# -----------------------------------------------------------
+#  ANALYSIS CACHE CONFIGURATION
+# -----------------------------------------------------------
+
+ANALYSIS_CACHE_TTL = int(os.environ.get("ANALYSIS_CACHE_TTL", 900))  # 15 minutes
+ANALYSIS_CACHE_MEMORY_SIZE = int(os.environ.get("ANALYSIS_CACHE_MEMORY_SIZE", 256))
+ANALYSIS_CACHE_DISK_SIZE = int(os.environ.get("ANALYSIS_CACHE_DISK_SIZE", 2000))
+ANALYSIS_CACHE_DIR = os.environ.get(
+    "ANALYSIS_CACHE_DIR",
+    os.path.join(tempfile.gettempdir(), "ai_financial_agent", "analysis_cache")
+)
+
+# -----------------------------------------------------------
+#  KEY HELPERS
+# -----------------------------------------------------------
+
+def bucket_value(value, tolerance=0.005):
+    """
+    Snap a positive number onto a geometric grid with the given relative step,
+    so values within ~tolerance of each other produce the same cache key.
+    """
+    try:
+        value = float(value)
+    except (TypeError, ValueError):
+        return value
+    if value <= 0 or math.isnan(value) or math.isinf(value):
+        return value
+    step = math.log1p(tolerance)
+    return round(math.exp(round(math.log(value) / step) * step), 8)
+
+def round_to(value, step):
+    """Round to the nearest multiple of step (for bounded values such as RSI)"""
+    try:
+        return round(round(float(value) / step) * step, 6)
+    except (TypeError, ValueError):
+        return value
+
+def make_key(model, prompt):
+    """Cache key from model name and whitespace-normalised prompt"""
+    normalized = " ".join(prompt.split())
+    return hashlib.sha256(f"{model}\n{normalized}".encode("utf-8")).hexdigest()
+
+# -----------------------------------------------------------
+#  TWO-TIER CACHE (MEMORY LRU + DISK)
+# -----------------------------------------------------------
+
+class AnalysisCache:
+    """TTL cache of model responses: in-memory LRU backed by one JSON file per entry"""
+
+    def __init__(self, ttl=ANALYSIS_CACHE_TTL, memory_size=ANALYSIS_CACHE_MEMORY_SIZE,
+                 disk_dir=ANALYSIS_CACHE_DIR, disk_size=ANALYSIS_CACHE_DISK_SIZE):
+        self.ttl = ttl
+        self.memory_size = memory_size
+        self.disk_dir = disk_dir
+        self.disk_size = disk_size
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._writes_since_prune = 0
+        self.hits = 0
+        self.misses = 0
+
+    def _path(self, key):
+        return os.path.join(self.disk_dir, f"{key}.json")
+
+    def _remember(self, key, value, created):
+        with self._lock:
+            self._memory[key] = (value, created)
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.memory_size:
+                self._memory.popitem(last=False)
+
+    def get(self, key):
+        """Return the cached response text, or None if missing or expired"""
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                value, created = entry
+                if now - created < self.ttl:
+                    self._memory.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._memory[key]
+
+        # Disk tier
+        if self.disk_dir:
+            try:
+                with open(self._path(key), "r", encoding="utf-8") as f:
+                    entry = json.load(f)
+                if now - entry["created"] < self.ttl:
+                    self._remember(key, entry["value"], entry["created"])
+                    self.hits += 1
+                    return entry["value"]
+                os.remove(self._path(key))
+            except (OSError, ValueError, KeyError):
+                pass
+
+        self.misses += 1
+        return None
+
+    def set(self, key, value, model=None):
+        """Store a response in memory and on disk"""
+        created = time.time()
+        self._remember(key, value, created)
+
+        if not self.disk_dir:
+            return
+        try:
+            os.makedirs(self.disk_dir, exist_ok=True)
+            tmp_path = f"{self._path(key)}.{threading.get_ident()}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({"created": created, "model": model, "value": value}, f)
+            os.replace(tmp_path, self._path(key))
+        except OSError as e:
+            print(f"Analysis cache write error: {e}")
+            return
+
+        self._writes_since_prune += 1
+        if self._writes_since_prune >= 50:
+            self._writes_since_prune = 0
+            self.prune_disk()
+
+    def prune_disk(self):
+        """Drop expired files and the oldest files beyond disk_size"""
+        try:
+            entries = []
+            for name in os.listdir(self.disk_dir):
+                if name.endswith(".json"):
+                    path = os.path.join(self.disk_dir, name)
+                    entries.append((os.path.getmtime(path), path))
+        except OSError:
+            return
+
+        entries.sort(reverse=True)
+        cutoff = time.time() - self.ttl
+        for i, (mtime, path) in enumerate(entries):
+            if i >= self.disk_size or mtime < cutoff:
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+
+    def clear(self):
+        """Drop all entries from both tiers"""
+        with self._lock:
+            self._memory.clear()
+        if self.disk_dir and os.path.isdir(self.disk_dir):
+            for name in os.listdir(self.disk_dir):
+                if name.endswith(".json"):
+                    try:
+                        os.remove(os.path.join(self.disk_dir, name))
+                    except OSError:
+                        pass
+
+# Shared cache for all sessions
+analysis_cache = AnalysisCache()
@@ -0,0 +1,253 @@
+import os
+import time
+import uuid
+import inspect
+import threading
+from collections import OrderedDict, deque
+
+# -----------------------------------------------------------
+#  ANALYSIS JOB QUEUE CONFIGURATION
+# -----------------------------------------------------------
+
+ANALYSIS_WORKERS = int(os.environ.get("ANALYSIS_WORKERS", 2))
+ANALYSIS_MAX_QUEUE_DEPTH = int(os.environ.get("ANALYSIS_MAX_QUEUE_DEPTH", 100))
+ANALYSIS_MAX_JOBS_PER_SESSION = int(os.environ.get("ANALYSIS_MAX_JOBS_PER_SESSION", 3))
+ANALYSIS_JOB_RETENTION = 600  # Seconds a finished job stays pollable
+ANALYSIS_JOB_TIMEOUT = int(os.environ.get("ANALYSIS_JOB_TIMEOUT", 300))  # Seconds a page waits, queueing included
+
+class QueueFullError(RuntimeError):
+    """Raised when a job is rejected because the queue is at capacity"""
+
+# -----------------------------------------------------------
+#  JOB
+# -----------------------------------------------------------
+
+class AnalysisJob:
+    """A unit of queued work; generator results are collected as streamed events"""
+
+    def __init__(self, session_id, func, args, kwargs):
+        self.id = uuid.uuid4().hex
+        self.session_id = session_id
+        self.func = func
+        self.args = args
+        self.kwargs = kwargs
+        self.status = "queued"  # queued -> running -> done | error | cancelled
+        self.result = None
+        self.error = None
+        self.events = []
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self._done = threading.Event()
+        self._cancel = threading.Event()
+        self._lock = threading.Lock()
+
+    @property
+    def finished(self):
+        return self._done.is_set()
+
+    def read_events(self, cursor=0):
+        """Events produced since `cursor`; returns (events, new_cursor)"""
+        with self._lock:
+            events = self.events[cursor:]
+        return events, cursor + len(events)
+
+    def wait(self, timeout=None):
+        """Block until the job finishes; returns True if it did"""
+        return self._done.wait(timeout)
+
+    def _cancelled(self):
+        self.error = "Cancelled"
+        self.status = "cancelled"
+        self.finished_at = time.time()
+        self._done.set()
+
+    def _run(self):
+        if self._cancel.is_set():
+            self._cancelled()
+            return
+        self.status = "running"
+        self.started_at = time.time()
+        try:
+            output = self.func(*self.args, **self.kwargs)
+            if inspect.isgenerator(output):
+                # Streaming job: keep every event, the final "done" event carries the result
+                for event in output:
+                    if self._cancel.is_set():
+                        output.close()
+                        break
+                    with self._lock:
+                        self.events.append(event)
+                    if isinstance(event, dict) and event.get("type") == "done":
+                        self.result = event.get("result")
+            else:
+                self.result = output
+            if self._cancel.is_set():
+                self.error = "Cancelled"
+                self.status = "cancelled"
+            else:
+                self.status = "done"
+        except Exception as e:
+            self.error = str(e)
+            self.status = "error"
+        finally:
+            self.finished_at = time.time()
+            self._done.set()
+
+# -----------------------------------------------------------
+#  FAIR QUEUE WITH WORKER POOL
+# -----------------------------------------------------------
+
+class AnalysisJobQueue:
+    """
+    Bounded worker pool with one FIFO per session, served round-robin so one
+    session submitting many jobs cannot starve the others.
+    """
+
+    def __init__(self, workers=ANALYSIS_WORKERS, max_queue_depth=ANALYSIS_MAX_QUEUE_DEPTH,
+                 max_jobs_per_session=ANALYSIS_MAX_JOBS_PER_SESSION):
+        self.max_queue_depth = max_queue_depth
+        self.max_jobs_per_session = max_jobs_per_session
+        self._sessions = OrderedDict()  # session_id -> deque of queued jobs
+        self._jobs = {}
+        self._depth = 0
+        self._condition = threading.Condition()
+        self._workers = []
+        for i in range(workers):
+            thread = threading.Thread(target=self._worker_loop, name=f"analysis-worker-{i}", daemon=True)
+            thread.start()
+            self._workers.append(thread)
+
+    def submit(self, session_id, func, *args, **kwargs):
+        """Queue func(*args, **kwargs); raises QueueFullError when at capacity"""
+        with self._condition:
+            self._forget_finished()
+            if self._depth >= self.max_queue_depth:
+                raise QueueFullError("Analysis queue is full, please retry shortly")
+
+            active = sum(1 for job in self._jobs.values()
+                         if job.session_id == session_id and not job.finished)
+            if active >= self.max_jobs_per_session:
+                raise QueueFullError("Too many analyses in progress for this session")
+
+            job = AnalysisJob(session_id, func, args, kwargs)
+            self._jobs[job.id] = job
+            self._sessions.setdefault(session_id, deque()).append(job)
+            self._depth += 1
+            self._condition.notify()
+            return job
+
+    def run(self, session_id, func, *args, timeout=None, **kwargs):
+        """Submit and block until done; returns the job"""
+        job = self.submit(session_id, func, *args, **kwargs)
+        job.wait(timeout)
+        return job
+
+    def cancel(self, job_id):
+        """
+        Cancel a job: a queued job is dropped, a running streaming job stops at
+        its next event (a plain function runs to the end, its result is dropped).
+        Returns False if the job is unknown or already finished.
+        """
+        with self._condition:
+            job = self._jobs.get(job_id)
+            if job is None or job.finished:
+                return False
+            job._cancel.set()
+            jobs = self._sessions.get(job.session_id)
+            if jobs and job in jobs:
+                jobs.remove(job)
+                self._depth -= 1
+                job._cancelled()
+            return True
+
+    def get(self, job_id):
+        return self._jobs.get(job_id)
+
+    def status(self, job_id):
+        """Pollable job status"""
+        job = self._jobs.get(job_id)
+        if job is None:
+            return {"status": "unknown"}
+
+        status = {
+            "id": job.id,
+            "status": job.status,
+            "position": self.position(job_id) if job.status == "queued" else 0,
+            "queue_depth": self._depth,
+            "events": len(job.events)
+        }
+        if job.finished:
+            status["result"] = job.result
+            status["error"] = job.error
+            status["duration"] = job.finished_at - (job.started_at or job.created_at)
+        return status
+
+    def position(self, job_id):
+        """Approximate number of queued jobs that will start before this one"""
+        with self._condition:
+            job = self._jobs.get(job_id)
+            if job is None or job.status != "queued":
+                return 0
+            own_queue = self._sessions.get(job.session_id, ())
+            try:
+                index = list(own_queue).index(job)
+            except ValueError:
+                return 0
+            # Round-robin: sessions ahead in the rotation get index + 1 turns first,
+            # sessions behind it get index turns
+            ahead = index
+            before = True
+            for session_id, jobs in self._sessions.items():
+                if session_id == job.session_id:
+                    before = False
+                else:
+                    ahead += min(len(jobs), index + 1 if before else index)
+            return ahead
+
+    @property
+    def depth(self):
+        return self._depth
+
+    def _next_job(self):
+        # Caller holds the condition; rotate to the next session with work
+        while self._sessions:
+            session_id, jobs = self._sessions.popitem(last=False)
+            if jobs:
+                job = jobs.popleft()
+                if jobs:
+                    self._sessions[session_id] = jobs  # Back of the rotation
+                self._depth -= 1
+                return job
+        return None
+
+    def _worker_loop(self):
+        while True:
+            with self._condition:
+                job = self._next_job()
+                while job is None:
+                    self._condition.wait()
+                    job = self._next_job()
+            job._run()
+
+    def _forget_finished(self):
+        cutoff = time.time() - ANALYSIS_JOB_RETENTION
+        for job_id in [job_id for job_id, job in self._jobs.items()
+                       if job.finished and job.finished_at < cutoff]:
+            del self._jobs[job_id]
+
+# -----------------------------------------------------------
+#  SHARED QUEUE
+# -----------------------------------------------------------
+
+_queue = None
+_queue_lock = threading.Lock()
+
+def get_analysis_queue():
+    """Process-wide queue shared by all Streamlit sessions"""
+    global _queue
+    if _queue is None:
+        with _queue_lock:
+            if _queue is None:
+                _queue = AnalysisJobQueue()
+    return _queue
@@ -0,0 +1,159 @@
+import os
+import json
+import hashlib
+import tempfile
+import threading
+from collections import OrderedDict
+import numpy as np
+
+# -----------------------------------------------------------
+#  CHART CACHE CONFIGURATION
+# -----------------------------------------------------------
+
+CHART_CACHE_MEMORY_BYTES = int(os.environ.get("CHART_CACHE_MEMORY_MB", 64)) * 1024 * 1024
+CHART_CACHE_DISK_BYTES = int(os.environ.get("CHART_CACHE_DISK_MB", 256)) * 1024 * 1024
+CHART_CACHE_DIR = os.environ.get(
+    "CHART_CACHE_DIR",
+    os.path.join(tempfile.gettempdir(), "ai_financial_agent", "chart_cache")
+)
+
+# -----------------------------------------------------------
+#  CONTENT-ADDRESSED KEYS
+# -----------------------------------------------------------
+
+def chart_key(spec, *series):
+    """
+    Hash of the chart spec (type, size, dpi, version...) and every input series.
+    Identical inputs always render identical images, so the key never expires.
+    """
+    digest = hashlib.sha256(json.dumps(spec, sort_keys=True, default=str).encode("utf-8"))
+    for values in series:
+        values = np.ascontiguousarray(values, dtype=float)
+        digest.update(f"|{values.shape}|".encode("ascii"))
+        digest.update(values.tobytes())
+    return digest.hexdigest()
+
+# -----------------------------------------------------------
+#  SIZE-BOUNDED CACHE (MEMORY LRU + DISK)
+# -----------------------------------------------------------
+
+class ChartCache:
+    """Rendered chart images by content key, bounded by total bytes in memory and on disk"""
+
+    def __init__(self, memory_bytes=CHART_CACHE_MEMORY_BYTES, disk_dir=CHART_CACHE_DIR,
+                 disk_bytes=CHART_CACHE_DISK_BYTES):
+        self.memory_bytes = memory_bytes
+        self.disk_dir = disk_dir
+        self.disk_bytes = disk_bytes
+        self._memory = OrderedDict()
+        self._memory_size = 0
+        self._lock = threading.Lock()
+        self._writes_since_prune = 0
+        self.hits = 0
+        self.misses = 0
+
+    def _path(self, key):
+        return os.path.join(self.disk_dir, f"{key}.png")
+
+    def _remember(self, key, data):
+        with self._lock:
+            if key in self._memory:
+                self._memory_size -= len(self._memory.pop(key))
+            if len(data) > self.memory_bytes:
+                return
+            self._memory[key] = data
+            self._memory_size += len(data)
+            while self._memory_size > self.memory_bytes:
+                _, evicted = self._memory.popitem(last=False)
+                self._memory_size -= len(evicted)
+
+    def get(self, key):
+        """Return the cached image bytes, or None"""
+        with self._lock:
+            data = self._memory.get(key)
+            if data is not None:
+                self._memory.move_to_end(key)
+                self.hits += 1
+                return data
+
+        # Disk tier, shared by every process and session on this machine
+        if self.disk_dir:
+            try:
+                with open(self._path(key), "rb") as f:
+                    data = f.read()
+                os.utime(self._path(key))  # Recently used files survive pruning
+                self._remember(key, data)
+                self.hits += 1
+                return data
+            except OSError:
+                pass
+
+        self.misses += 1
+        return None
+
+    def set(self, key, data):
+        """Store image bytes in memory and on disk"""
+        self._remember(key, data)
+
+        if not self.disk_dir:
+            return
+        try:
+            os.makedirs(self.disk_dir, exist_ok=True)
+            tmp_path = f"{self._path(key)}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, self._path(key))
+        except OSError as e:
+            print(f"Chart cache write error: {e}")
+            return
+
+        self._writes_since_prune += 1
+        if self._writes_since_prune >= 20:
+            self._writes_since_prune = 0
+            self.prune_disk()
+
+    def get_or_render(self, key, render):
+        """Cached bytes for key, calling render() -> bytes on a miss"""
+        data = self.get(key)
+        if data is None:
+            data = render()
+            self.set(key, data)
+        return data
+
+    def prune_disk(self):
+        """Delete the least recently used files beyond disk_bytes"""
+        try:
+            entries = []
+            for name in os.listdir(self.disk_dir):
+                if name.endswith(".png"):
+                    path = os.path.join(self.disk_dir, name)
+                    stat = os.stat(path)
+                    entries.append((stat.st_mtime, stat.st_size, path))
+        except OSError:
+            return
+
+        entries.sort(reverse=True)
+        total = 0
+        for mtime, size, path in entries:
+            total += size
+            if total > self.disk_bytes:
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+
+    def clear(self):
+        """Drop all entries from both tiers"""
+        with self._lock:
+            self._memory.clear()
+            self._memory_size = 0
+        if self.disk_dir and os.path.isdir(self.disk_dir):
+            for name in os.listdir(self.disk_dir):
+                if name.endswith(".png"):
+                    try:
+                        os.remove(os.path.join(self.disk_dir, name))
+                    except OSError:
+                        pass
+
+# Shared cache for all reports and sessions
+chart_cache = ChartCache()
@@ -0,0 +1,153 @@
+import os
+import queue
+import threading
+from io import BytesIO
+import numpy as np
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.collections import PolyCollection
+from services import indicators
+
+# -----------------------------------------------------------
+#  CHART RENDERER CONFIGURATION
+# -----------------------------------------------------------
+
+CHART_FIGURE_POOL_SIZE = int(os.environ.get("CHART_FIGURE_POOL_SIZE", 4))
+
+# -----------------------------------------------------------
+#  TECHNICAL INDICATORS CHART (OBJECT-ORIENTED, AGG CANVAS)
+# -----------------------------------------------------------
+
+class _TechnicalFigure:
+    """
+    One preconfigured price / volume / RSI figure whose artists are updated in
+    place. Every update sets the limits of every axis, so the image depends on
+    the input only, never on what the pooled figure drew before.
+    """
+
+    BAR_WIDTH = 0.8
+    EMPTY_LIMITS = (0.0, 1.0)  # Axes with nothing to show
+
+    def __init__(self, figsize, dpi, rsi_period):
+        self.rsi_period = rsi_period
+        # Figure + Agg canvas directly: no pyplot global state, no GUI backend
+        self.figure = Figure(figsize=figsize, dpi=dpi)
+        self.canvas = FigureCanvasAgg(self.figure)
+        self.figure.subplots_adjust(left=0.08, right=0.98, top=0.96, bottom=0.04, hspace=0.35)
+        price_ax, volume_ax, rsi_ax = self.figure.subplots(3, 1)
+        self.axes = (price_ax, volume_ax, rsi_ax)
+
+        # Price chart
+        self.price_line, = price_ax.plot([], [], color='blue', linewidth=2)
+
+        # Volume chart: one collection of bar polygons, reshaped per render
+        self.volume_bars = PolyCollection([], facecolors='green', alpha=0.6, linewidths=0)
+        volume_ax.add_collection(self.volume_bars)
+
+        # RSI (Wilder)
+        self.rsi_line, = rsi_ax.plot([], [], color='purple', linewidth=2)
+        self.rsi_bands = (
+            rsi_ax.axhline(y=70, color='r', linestyle='--', alpha=0.5),
+            rsi_ax.axhline(y=30, color='g', linestyle='--', alpha=0.5)
+        )
+        rsi_ax.set_ylim(0, 100)
+
+        self.titles = ('Price Movement', 'Trading Volume', 'RSI Indicator')
+
+    def _show(self, index, visible):
+        ax = self.axes[index]
+        ax.set_title(self.titles[index] if visible else '', fontsize=12, fontweight='bold')
+        if visible and index < 2:
+            ax.grid(True, alpha=0.3)
+        else:
+            ax.grid(False)
+
+    def update(self, prices, volumes):
+        price_ax, volume_ax, rsi_ax = self.axes
+        x = np.arange(len(prices))
+
+        self.price_line.set_data(x, prices)
+        self._show(0, len(prices) > 0)
+        if len(prices):
+            price_ax.relim()
+            price_ax.autoscale_view()
+        else:
+            # auto=None: keep autoscaling on for the next series
+            price_ax.set_xlim(*self.EMPTY_LIMITS, auto=None)
+            price_ax.set_ylim(*self.EMPTY_LIMITS, auto=None)
+
+        n = len(volumes)
+        left = np.arange(n) - self.BAR_WIDTH / 2
+        right = left + self.BAR_WIDTH
+        verts = np.zeros((n, 4, 2))
+        verts[:, :2, 0] = left[:, None]
+        verts[:, 2:, 0] = right[:, None]
+        verts[:, 1, 1] = volumes
+        verts[:, 2, 1] = volumes
+        self.volume_bars.set_verts(verts)
+        self._show(1, n > 0)
+        if n:
+            # Same view as Axes.bar: 5% x margins, y starting at zero with 5% headroom
+            pad = 0.05 * (n - 1 + self.BAR_WIDTH)
+            volume_ax.set_xlim(left[0] - pad, right[-1] + pad)
+            low, high = min(0.0, float(np.min(volumes))), max(0.0, float(np.max(volumes)))
+            volume_ax.set_ylim(low, high + 0.05 * ((high - low) or 1.0))
+        else:
+            volume_ax.set_xlim(*self.EMPTY_LIMITS)
+            volume_ax.set_ylim(*self.EMPTY_LIMITS)
+
+        has_rsi = len(prices) > self.rsi_period
+        rsi = indicators.rsi(prices, self.rsi_period) if has_rsi else np.array([])
+        self.rsi_line.set_data(np.arange(len(rsi)), rsi)
+        for band in self.rsi_bands:
+            band.set_visible(has_rsi)
+        self._show(2, has_rsi)
+        rsi_ax.set_xlim(price_ax.get_xlim())
+
+    def to_image(self, fmt="png"):
+        buffer = BytesIO()
+        if fmt == "jpeg":
+            # No alpha channel: FPDF embeds JPEG data as is, while it decodes PNG pixel by pixel
+            self.canvas.print_jpg(buffer, pil_kwargs={"quality": 90})
+        else:
+            self.canvas.print_png(buffer)
+        return buffer.getvalue()
+
+class TechnicalChartRenderer:
+    """
+    Renders the price / volume / RSI chart on a pool of reusable Agg figures.
+    Each render checks a figure out of the pool, so concurrent calls from
+    Streamlit threads or a report batch never share one.
+    """
+
+    def __init__(self, figsize=(10, 8), dpi=150, rsi_period=14, pool_size=CHART_FIGURE_POOL_SIZE):
+        self.figsize = figsize
+        self.dpi = dpi
+        self.rsi_period = rsi_period
+        self.pool_size = max(1, pool_size)
+        self._idle = queue.LifoQueue()
+        self._created = 0
+        self._lock = threading.Lock()
+
+    def _acquire(self):
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        with self._lock:
+            if self._created < self.pool_size:
+                self._created += 1
+                return _TechnicalFigure(self.figsize, self.dpi, self.rsi_period)
+        # Pool exhausted: wait for a figure to come back
+        return self._idle.get()
+
+    def render(self, prices, volumes, fmt="png"):
+        """Image bytes ("png" or "jpeg") of the chart for the given price and volume series"""
+        prices = np.asarray(prices, dtype=float)
+        volumes = np.asarray(volumes, dtype=float)
+        chart = self._acquire()
+        try:
+            chart.update(prices, volumes)
+            return chart.to_image(fmt)
+        finally:
+            self._idle.put(chart)
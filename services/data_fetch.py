@@ -1,6 +1,7 @@
 import requests
 import yfinance as yf
 import pandas as pd
+import numpy as np
 from datetime import datetime, timedelta
 import time
 import json
@@ -13,7 +14,9 @@ cache = {}
 CACHE_DURATION = {
     'crypto': 15,  # Crypto prices update faster
     'stock': 30,   # Stock prices
-    'search': 300  # Search results
+    'search': 300,  # Search results
+    'history': 900,  # Daily bars
+    'synthetic_history': 60  # Fallback bars when no source answers
 }
 
 class CacheManager:
@@ -38,6 +41,11 @@ class CacheManager:
         ttl = CACHE_DURATION.get(cache_type, 60)
         cache[key] = (data, time.time(), ttl)
     
+    @staticmethod
+    def delete(key: str):
+        """Drop one entry so the next fetch goes to the providers"""
+        cache.pop(key, None)
+    
     @staticmethod
     def clean_old_entries():
         """Clean old cache entries"""
@@ -1028,6 +1036,214 @@ def get_multiple_stock_data(ticker_list: List[str]) -> Dict[str, Any]:
         results[ticker] = get_stock_data(ticker)
     return results
 
+# -----------------------------------------------------------
+#  HISTORICAL PRICE PROVIDER
+# -----------------------------------------------------------
+
+def _history_result(symbol: str, asset_type: str, frame: pd.DataFrame, source: str, synthetic: bool = False) -> Dict[str, Any]:
+    """Normalise OHLCV bars into the provider's dict of aligned lists"""
+    frame = frame.dropna(subset=['Close'])
+    dates = [pd.Timestamp(ts).to_pydatetime().replace(tzinfo=None) for ts in frame.index]
+    closes = [float(c) for c in frame['Close']]
+    last = f"{dates[-1].isoformat()}:{closes[-1]}" if closes else "empty"
+    return {
+        "symbol": symbol,
+        "asset_type": asset_type,
+        "dates": dates,
+        "open": [float(v) for v in frame.get('Open', frame['Close'])],
+        "high": [float(v) for v in frame.get('High', frame['Close'])],
+        "low": [float(v) for v in frame.get('Low', frame['Close'])],
+        "close": closes,
+        "volume": [float(v) for v in frame.get('Volume', pd.Series(0.0, index=frame.index)).fillna(0)],
+        "source": source,
+        "synthetic": synthetic,
+        # Identifies this exact bar set, so derived indicators can be computed once
+        "fingerprint": f"{source}:{symbol}:{len(closes)}:{last}"
+    }
+
+def _history_from_yfinance(yf_symbol: str, days: int) -> Optional[pd.DataFrame]:
+    try:
+        bars = yf.Ticker(yf_symbol).history(period=f"{max(days, 5)}d", interval="1d")
+        if bars is not None and len(bars) >= 2:
+            return bars.tail(days)
+    except Exception as e:
+        print(f"History fetch error ({yf_symbol}): {e}")
+    return None
+
+def _history_from_coingecko(coin_id: str, days: int) -> Optional[pd.DataFrame]:
+    try:
+        response = requests.get(
+            f"https://api.coingecko.com/api/v3/coins/{coin_id}/market_chart",
+            params={'vs_currency': 'usd', 'days': days, 'interval': 'daily'},
+            timeout=10
+        )
+        if response.status_code != 200:
+            return None
+        data = response.json()
+        prices = data.get('prices') or []
+        if len(prices) < 2:
+            return None
+        volumes = dict(data.get('total_volumes') or [])
+        index = pd.to_datetime([ts for ts, _ in prices], unit='ms')
+        return pd.DataFrame({
+            'Close': [price for _, price in prices],
+            'Volume': [volumes.get(ts, 0.0) for ts, _ in prices]
+        }, index=index).tail(days)
+    except (RequestException, ValueError) as e:
+        print(f"History fetch error ({coin_id}): {e}")
+    return None
+
+def synthetic_price_history(symbol: str, price: float, days: int = 90, asset_type: str = "unknown") -> Dict[str, Any]:
+    """
+    Random-walk bars ending at `price`, flagged synthetic=True.
+    Only for display and analysis when no real history can be fetched.
+    """
+    price = float(price) if price else 100.0
+    rng = np.random.default_rng()
+    steps = rng.normal(0, 0.02, days - 1)
+    closes = price / np.exp(np.concatenate([np.cumsum(steps[::-1])[::-1], [0.0]]))
+    index = pd.date_range(end=datetime.now(), periods=days, freq='D')
+    frame = pd.DataFrame({
+        'Open': closes * (1 + rng.normal(0, 0.005, days)),
+        'High': closes * (1 + np.abs(rng.normal(0, 0.01, days))),
+        'Low': closes * (1 - np.abs(rng.normal(0, 0.01, days))),
+        'Close': closes,
+        'Volume': rng.integers(1_000_000, 10_000_000, days).astype(float)
+    }, index=index)
+    history = _history_result(symbol, asset_type, frame, "synthetic", synthetic=True)
+    history["fingerprint"] += f":{rng.integers(1 << 62)}"
+    return history
+
+def get_price_history(symbol: str, asset_type: str = None, days: int = 90,
+                      fallback_price: float = None) -> Dict[str, Any]:
+    """
+    Daily bars for a crypto or stock symbol from a cached provider chain:
+    crypto via Yahoo (TICKER-USD) or CoinGecko market_chart, stocks via Yahoo.
+    Falls back to synthetic_price_history (synthetic=True) when every source fails.
+    """
+    symbol = symbol.strip()
+    cache_key = f"history_{asset_type}_{symbol.lower()}_{days}"
+    cached = CacheManager.get(cache_key)
+    if cached:
+        return cached
+    
+    frame, source = None, None
+    if asset_type == 'crypto':
+        attempts = [
+            ('yfinance', lambda: _history_from_yfinance(f"{symbol.upper()}-USD", days)),
+            ('coingecko', lambda: _history_from_coingecko(symbol.lower(), days))
+        ]
+        # Long names are CoinGecko ids ('bitcoin'), short ones tickers ('BTC')
+        if len(symbol) > 5:
+            attempts.reverse()
+    else:
+        attempts = [('yfinance', lambda: _history_from_yfinance(symbol.upper(), days))]
+    
+    for source_name, fetch in attempts:
+        frame = fetch()
+        if frame is not None and len(frame) >= 2:
+            source = source_name
+            break
+    
+    if source:
+        history = _history_result(symbol.upper(), asset_type or 'stock', frame, source)
+        CacheManager.set(cache_key, history, 'history')
+    else:
+        history = synthetic_price_history(symbol.upper(), fallback_price, days, asset_type or 'unknown')
+        # Keep the same fake series for a short while so pages agree with each other
+        CacheManager.set(cache_key, history, 'synthetic_history')
+    return history
+
+# -----------------------------------------------------------
+#  BULK MARKET QUOTES (SCREENER FEEDS)
+# -----------------------------------------------------------
+
+def get_top_crypto_markets(limit: int = 100) -> List[Dict[str, Any]]:
+    """
+    Top coins by market cap from CoinGecko's markets endpoint, 250 per request.
+    Each entry includes the 7-day hourly sparkline as `closes`; volume is in USD.
+    """
+    markets = []
+    page = 1
+    while len(markets) < limit:
+        per_page = min(250, limit - len(markets))
+        try:
+            response = requests.get("https://api.coingecko.com/api/v3/coins/markets", params={
+                'vs_currency': 'usd',
+                'order': 'market_cap_desc',
+                'per_page': per_page,
+                'page': page,
+                'sparkline': 'true',
+                'price_change_percentage': '24h'
+            }, timeout=10)
+            if response.status_code != 200:
+                break
+            batch = response.json()
+        except (RequestException, ValueError) as e:
+            print(f"Bulk crypto fetch error: {e}")
+            break
+        
+        for coin in batch:
+            markets.append({
+                "id": coin.get('id'),
+                "symbol": (coin.get('symbol') or '').upper(),
+                "name": coin.get('name', ''),
+                "current_price": float(coin.get('current_price') or 0),
+                "change_pct": float(coin.get('price_change_percentage_24h') or 0),
+                "volume": float(coin.get('total_volume') or 0),
+                "market_cap": float(coin.get('market_cap') or 0),
+                "closes": (coin.get('sparkline_in_7d') or {}).get('price') or [],
+                "interval": "1h"
+            })
+        if len(batch) < per_page:
+            break
+        page += 1
+    
+    return markets[:limit]
+
+def get_bulk_stock_quotes(tickers: List[str], period: str = "3mo") -> List[Dict[str, Any]]:
+    """
+    Daily bars for many tickers in one yfinance download.
+    Volume is the last session's dollar volume (close x shares) so it compares
+    with crypto volume. Market cap is not part of the bulk download and is left as None.
+    """
+    if not tickers:
+        return []
+    
+    try:
+        bars = yf.download(tickers, period=period, interval="1d", group_by="column",
+                           auto_adjust=True, progress=False, threads=True)
+    except Exception as e:
+        print(f"Bulk stock fetch error: {e}")
+        return []
+    if bars is None or bars.empty:
+        return []
+    
+    closes = bars["Close"]
+    volumes = bars["Volume"]
+    if isinstance(closes, pd.Series):  # Single ticker
+        closes = closes.to_frame(tickers[0])
+        volumes = volumes.to_frame(tickers[0])
+    
+    quotes = []
+    for ticker in closes.columns:
+        series = closes[ticker].dropna()
+        if len(series) < 2:
+            continue
+        price, previous = float(series.iloc[-1]), float(series.iloc[-2])
+        quotes.append({
+            "id": ticker,
+            "symbol": ticker,
+            "name": ticker,
+            "current_price": price,
+            "change_pct": (price - previous) / previous * 100 if previous else 0.0,
+            "volume": price * float(volumes[ticker].fillna(0).iloc[-1]),
+            "market_cap": None,
+            "closes": series.tolist(),
+            "interval": "1d"
+        })
+    return quotes
+
 # -----------------------------------------------------------
 #  NEW: PRICE VERIFICATION UTILITY
 # -----------------------------------------------------------
@@ -0,0 +1,174 @@
+import numpy as np
+
+# -----------------------------------------------------------
+#  VECTORIZED TECHNICAL INDICATORS
+# -----------------------------------------------------------
+#
+# Every function takes a price series and returns arrays of the same
+# shape, aligned to the input; positions without enough history are NaN.
+# A 2-D input (symbols x time) is processed row-wise along the last axis.
+# All of them run in O(n) without Python-level loops over the prices.
+
+def _as_array(values):
+    return np.asarray(values, dtype=float)
+
+def _prepend_zero(values):
+    """Zero column in front of the last axis, for differences of cumulative sums"""
+    return np.concatenate([np.zeros(values.shape[:-1] + (1,)), values], axis=-1)
+
+def _ewm(values, alpha, initial):
+    """
+    y[i] = (1 - alpha) * y[i-1] + alpha * x[i], starting from y[-1] = initial.
+    Evaluated block-wise in closed form so the decay powers stay finite.
+    """
+    values = _as_array(values)
+    result = np.empty_like(values)
+    length = values.shape[-1]
+    if not length:
+        return result
+
+    decay = 1.0 - alpha
+    if decay <= 0:
+        result[...] = values
+        return result
+
+    # Longest block for which decay ** -block stays far from overflow
+    block = max(1, min(length, int(300 / -np.log(decay))))
+    powers = decay ** np.arange(block)
+    inverse = 1.0 / powers
+
+    previous = np.asarray(initial, dtype=float)[..., np.newaxis]
+    for start in range(0, length, block):
+        chunk = values[..., start:start + block]
+        size = chunk.shape[-1]
+        weighted = np.cumsum(chunk * inverse[:size], axis=-1) * powers[:size]
+        result[..., start:start + size] = decay * powers[:size] * previous + alpha * weighted
+        previous = result[..., start + size - 1:start + size]
+    return result
+
+def sma(values, window):
+    """Simple moving average"""
+    values = _as_array(values)
+    result = np.full(values.shape, np.nan)
+    if window < 1 or values.shape[-1] < window:
+        return result
+
+    sums = _prepend_zero(np.cumsum(values, axis=-1))
+    result[..., window - 1:] = (sums[..., window:] - sums[..., :-window]) / window
+    return result
+
+def ema(values, span):
+    """Exponential moving average with alpha = 2 / (span + 1), seeded with the first value"""
+    values = _as_array(values)
+    if not values.shape[-1]:
+        return values.copy()
+    return _ewm(values, 2.0 / (span + 1), values[..., 0])
+
+def _wilder(values, period, start):
+    """Wilder smoothing: mean of the first `period` values, then alpha = 1/period"""
+    result = np.full(values.shape, np.nan)
+    end = start + period
+    if values.shape[-1] < end:
+        return result
+
+    seed = values[..., start:end].mean(axis=-1)
+    result[..., end - 1] = seed
+    result[..., end:] = _ewm(values[..., end:], 1.0 / period, seed)
+    return result
+
+def rsi(values, period=14):
+    """Wilder's Relative Strength Index (0-100); first valid value at index `period`"""
+    values = _as_array(values)
+    result = np.full(values.shape, np.nan)
+    if values.shape[-1] <= period:
+        return result
+
+    deltas = np.diff(values, axis=-1)
+    avg_gain = _wilder(np.clip(deltas, 0, None), period, 0)
+    avg_loss = _wilder(np.clip(-deltas, 0, None), period, 0)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        rs = avg_gain / avg_loss
+        values_rsi = 100 - 100 / (1 + rs)
+    # No losses in the window: RSI is 100 (50 if the price did not move at all)
+    values_rsi = np.where(avg_loss == 0, np.where(avg_gain == 0, 50.0, 100.0), values_rsi)
+    values_rsi[np.isnan(avg_gain)] = np.nan
+
+    result[..., 1:] = values_rsi
+    return result
+
+def macd(values, fast=12, slow=26, signal=9):
+    """MACD line, signal line and histogram"""
+    values = _as_array(values)
+    macd_line = ema(values, fast) - ema(values, slow)
+    signal_line = ema(macd_line, signal)
+    return macd_line, signal_line, macd_line - signal_line
+
+def rolling_std(values, window):
+    """Rolling population standard deviation"""
+    values = _as_array(values)
+    result = np.full(values.shape, np.nan)
+    if window < 1 or values.shape[-1] < window:
+        return result
+
+    # Centre on the series mean so the running sums of squares do not lose precision
+    centred = values - values.mean(axis=-1, keepdims=True)
+    sums = _prepend_zero(np.cumsum(centred, axis=-1))
+    squares = _prepend_zero(np.cumsum(centred ** 2, axis=-1))
+    mean = (sums[..., window:] - sums[..., :-window]) / window
+    variance = (squares[..., window:] - squares[..., :-window]) / window - mean ** 2
+    result[..., window - 1:] = np.sqrt(np.clip(variance, 0, None))
+    return result
+
+def bollinger_bands(values, window=20, num_std=2.0):
+    """Middle (SMA), upper and lower Bollinger bands"""
+    middle = sma(values, window)
+    width = num_std * rolling_std(values, window)
+    return middle, middle + width, middle - width
+
+def true_range(high, low, close):
+    """True range; the first bar uses high - low"""
+    high, low, close = _as_array(high), _as_array(low), _as_array(close)
+    ranges = high - low
+    if close.shape[-1] > 1:
+        previous = close[..., :-1]
+        ranges[..., 1:] = np.maximum.reduce([
+            ranges[..., 1:],
+            np.abs(high[..., 1:] - previous),
+            np.abs(low[..., 1:] - previous)
+        ])
+    return ranges
+
+def atr(high, low, close, period=14):
+    """Wilder's Average True Range; first valid value at index period - 1"""
+    return _wilder(true_range(high, low, close), period, 0)
+
+def compute_indicators(close, high=None, low=None):
+    """All indicators for one series in a dict of aligned arrays"""
+    close = _as_array(close)
+    macd_line, signal_line, histogram = macd(close)
+    middle, upper, lower = bollinger_bands(close)
+
+    series = {
+        "close": close,
+        "sma_20": sma(close, 20),
+        "sma_50": sma(close, 50),
+        "ema_12": ema(close, 12),
+        "ema_26": ema(close, 26),
+        "rsi": rsi(close),
+        "macd": macd_line,
+        "macd_signal": signal_line,
+        "macd_histogram": histogram,
+        "bollinger_middle": middle,
+        "bollinger_upper": upper,
+        "bollinger_lower": lower
+    }
+    if high is not None and low is not None:
+        series["atr"] = atr(high, low, close)
+    return series
+
+def last_valid(series, default=None):
+    """Most recent non-NaN value of a 1-D series"""
+    series = _as_array(series).ravel()
+    valid = series[~np.isnan(series)]
+    return float(valid[-1]) if len(valid) else default
@@ -0,0 +1,166 @@
+import os
+import json
+import threading
+import requests
+from requests.adapters import HTTPAdapter
+
+# -----------------------------------------------------------
+#  OLLAMA HTTP CLIENT CONFIGURATION
+# -----------------------------------------------------------
+
+OLLAMA_HOST = os.environ.get("OLLAMA_HOST", "http://localhost:11434")
+OLLAMA_MODEL = os.environ.get("OLLAMA_MODEL", "llama3")
+OLLAMA_CONNECT_TIMEOUT = float(os.environ.get("OLLAMA_CONNECT_TIMEOUT", 3))
+OLLAMA_READ_TIMEOUT = float(os.environ.get("OLLAMA_READ_TIMEOUT", 120))
+OLLAMA_KEEP_ALIVE = os.environ.get("OLLAMA_KEEP_ALIVE", "30m")  # How long the server keeps the model loaded
+OLLAMA_POOL_SIZE = int(os.environ.get("OLLAMA_POOL_SIZE", 10))
+
+class OllamaError(RuntimeError):
+    """Raised when the Ollama server returns an error response"""
+
+    def __init__(self, message, status_code=None):
+        super().__init__(message)
+        self.status_code = status_code  # HTTP status, None for errors inside a 200 response
+
+def _normalize_host(host):
+    """Accept 'localhost:11434' as well as full URLs"""
+    host = host.strip().rstrip('/')
+    if not host.startswith(('http://', 'https://')):
+        host = f"http://{host}"
+    return host
+
+# -----------------------------------------------------------
+#  POOLED CLIENT
+# -----------------------------------------------------------
+
+class OllamaClient:
+    """
+    Client for an Ollama-compatible HTTP server.
+    Reuses pooled keep-alive connections and keeps the model resident between calls.
+    """
+
+    def __init__(self, host=None, model=None, connect_timeout=None, read_timeout=None,
+                 keep_alive=None, pool_size=None):
+        self.host = _normalize_host(host or OLLAMA_HOST)
+        self.model = model or OLLAMA_MODEL
+        self.connect_timeout = connect_timeout if connect_timeout is not None else OLLAMA_CONNECT_TIMEOUT
+        self.read_timeout = read_timeout if read_timeout is not None else OLLAMA_READ_TIMEOUT
+        self.keep_alive = keep_alive or OLLAMA_KEEP_ALIVE
+
+        pool_size = pool_size or OLLAMA_POOL_SIZE
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def _timeout(self, read_timeout=None):
+        return (self.connect_timeout, read_timeout if read_timeout is not None else self.read_timeout)
+
+    def _post(self, path, payload, read_timeout=None, stream=False):
+        response = self.session.post(
+            f"{self.host}{path}",
+            json=payload,
+            timeout=self._timeout(read_timeout),
+            stream=stream
+        )
+        if response.status_code != 200:
+            try:
+                message = response.json().get("error", response.text)
+            except ValueError:
+                message = response.text
+            response.close()
+            raise OllamaError(f"Ollama HTTP {response.status_code}: {message}", response.status_code)
+        return response
+
+    def is_available(self):
+        """Check whether the server is reachable"""
+        try:
+            response = self.session.get(f"{self.host}/api/tags", timeout=(self.connect_timeout, 5))
+            return response.status_code == 200
+        except requests.RequestException:
+            return False
+
+    def list_models(self):
+        """Names of models installed on the server"""
+        response = self.session.get(f"{self.host}/api/tags", timeout=self._timeout(10))
+        response.raise_for_status()
+        return [m.get("name", "") for m in response.json().get("models", [])]
+
+    def preload(self, model=None):
+        """Load the model into memory so the first analysis does not pay for it"""
+        self._post("/api/generate", {
+            "model": model or self.model,
+            "keep_alive": self.keep_alive
+        }).close()
+
+    def _generate_payload(self, prompt, system, model, options, stream):
+        payload = {
+            "model": model or self.model,
+            "prompt": prompt,
+            "stream": stream,
+            "keep_alive": self.keep_alive
+        }
+        if system:
+            payload["system"] = system
+        if options:
+            payload["options"] = options
+        return payload
+
+    def generate(self, prompt, system=None, model=None, options=None, timeout=None):
+        """Run a completion and return the full response text"""
+        payload = self._generate_payload(prompt, system, model, options, stream=False)
+        response = self._post("/api/generate", payload, read_timeout=timeout)
+        data = response.json()
+        if data.get("error"):
+            raise OllamaError(data["error"])
+        return data.get("response", "")
+
+    def generate_stream(self, prompt, system=None, model=None, options=None, timeout=None):
+        """Run a completion and yield response text chunks as the model produces them"""
+        payload = self._generate_payload(prompt, system, model, options, stream=True)
+        response = self._post("/api/generate", payload, read_timeout=timeout, stream=True)
+        try:
+            # NDJSON: one JSON object per line
+            for line in response.iter_lines():
+                if not line:
+                    continue
+                data = json.loads(line)
+                if data.get("error"):
+                    raise OllamaError(data["error"])
+                if data.get("response"):
+                    yield data["response"]
+        finally:
+            response.close()
+
+    def close(self):
+        self.session.close()
+
+# -----------------------------------------------------------
+#  SHARED CLIENT
+# -----------------------------------------------------------
+
+_client = None
+_client_lock = threading.Lock()
+
+def get_client(preload=False):
+    """Process-wide client so all sessions share one connection pool"""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = OllamaClient()
+                if preload:
+                    start_preload(_client)
+    return _client
+
+def start_preload(client):
+    """Warm the model in a background thread; failures are ignored"""
+    def preload_model():
+        try:
+            client.preload()
+        except Exception:
+            pass
+    
+    thread = threading.Thread(target=preload_model, daemon=True)
+    thread.start()
+    return thread
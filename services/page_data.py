@@ -0,0 +1,157 @@
+"""
+Page-facing data access for the Streamlit pages.
+
+Every widget interaction reruns the page script; these wrappers memoize the
+service calls with st.cache_data, keyed on a hash of the arguments and
+shared by all sessions, so a rerun (or another user) within the TTL reuses
+the result instead of calling the providers again. Values come back as
+copies, so pages may modify what they get.
+
+This is the only module under services/ that imports Streamlit; scripts
+and workers keep using the services directly.
+"""
+import os
+import numpy as np
+import pandas as pd
+import streamlit as st
+from services.data_fetch import (CACHE_DURATION, CacheManager, get_crypto_data, get_crypto_price,
+                                 get_multi_source_price, get_price_history, get_stock_data, get_stock_price,
+                                 search_asset)
+from services.news_fetch import NEWS_CACHE_DURATION, get_asset_news, get_market_news
+
+# -----------------------------------------------------------
+#  PAGE DATA CACHE CONFIGURATION
+# -----------------------------------------------------------
+
+# Per function; oldest entries are dropped beyond this
+PAGE_CACHE_MAX_ENTRIES = int(os.environ.get("PAGE_CACHE_MAX_ENTRIES", 256))
+
+# Bars are shared for as long as synthetic fallback bars are (real bars stay
+# cached longer in data_fetch), so a failed fetch is retried soon
+PAGE_HISTORY_TTL = int(os.environ.get("PAGE_HISTORY_TTL", CACHE_DURATION['synthetic_history']))
+
+# Placeholder scores stay put for this long instead of changing on every rerun
+PAGE_PLACEHOLDER_TTL = int(os.environ.get("PAGE_PLACEHOLDER_TTL", NEWS_CACHE_DURATION))
+
+def _page_cache(ttl):
+    return st.cache_data(ttl=ttl, max_entries=PAGE_CACHE_MAX_ENTRIES, show_spinner=False)
+
+# -----------------------------------------------------------
+#  QUOTES
+# -----------------------------------------------------------
+
+@_page_cache(CACHE_DURATION['crypto'])
+def load_crypto_data(coin_id):
+    return get_crypto_data(coin_id)
+
+@_page_cache(CACHE_DURATION['stock'])
+def load_stock_data(ticker):
+    return get_stock_data(ticker)
+
+@_page_cache(CACHE_DURATION['crypto'])
+def load_crypto_price(symbol):
+    return get_crypto_price(symbol)
+
+@_page_cache(CACHE_DURATION['stock'])
+def load_stock_price(symbol):
+    return get_stock_price(symbol)
+
+@_page_cache(CACHE_DURATION['stock'])
+def load_multi_source_price(symbol):
+    return get_multi_source_price(symbol)
+
+@_page_cache(CACHE_DURATION['search'])
+def load_search(query):
+    return search_asset(query)
+
+# -----------------------------------------------------------
+#  PRICE HISTORY
+# -----------------------------------------------------------
+
+@_page_cache(PAGE_HISTORY_TTL)
+def load_price_history(symbol, asset_type=None, days=90, fallback_price=None):
+    """get_price_history bars (dict of aligned lists, synthetic=True for fallback bars)"""
+    return get_price_history(symbol, asset_type, days=days, fallback_price=fallback_price)
+
+@_page_cache(PAGE_HISTORY_TTL)
+def load_price_frame(symbol, asset_type=None, days=90, fallback_price=None):
+    """(DataFrame with Date/Open/High/Low/Price/Volume columns, history dict) for charts"""
+    history = load_price_history(symbol, asset_type, days, fallback_price)
+    price_data = pd.DataFrame({
+        'Date': history['dates'],
+        'Open': history['open'],
+        'High': history['high'],
+        'Low': history['low'],
+        'Price': history['close'],
+        'Volume': history['volume']
+    })
+    return price_data, history
+
+# Analysis page time frames in daily bars
+PERIOD_DAYS = {"1D": 5, "1W": 7, "1M": 30, "3M": 90, "6M": 180, "1Y": 365}
+
+@_page_cache(PAGE_HISTORY_TTL)
+def load_historical_data(symbol, period="1M", asset_type=None, fallback_price=None):
+    """(list of {timestamp, open, high, low, close, volume} records, history dict) for the bars"""
+    history = load_price_history(symbol, asset_type, PERIOD_DAYS.get(period, 30), fallback_price)
+    records = [
+        {'timestamp': pd.Timestamp(date), 'open': o, 'high': h, 'low': l, 'close': c, 'volume': v}
+        for date, o, h, l, c, v in zip(history['dates'], history['open'], history['high'],
+                                       history['low'], history['close'], history['volume'])
+    ]
+    return records, history
+
+# -----------------------------------------------------------
+#  NEWS
+# -----------------------------------------------------------
+
+@_page_cache(NEWS_CACHE_DURATION)
+def load_market_news(query="financial market", num_articles=10):
+    return get_market_news(query, num_articles)
+
+@_page_cache(NEWS_CACHE_DURATION)
+def load_asset_news(asset_name):
+    return get_asset_news(asset_name)
+
+def refresh_market_data(coin_ids=(), tickers=()):
+    """
+    Drop the cached quotes of these watchlist assets, in the page cache and
+    in data_fetch's own cache behind it, so the next load refetches them.
+    Other assets, and other sessions' watchlists, keep their cached quotes.
+    """
+    for coin_id in coin_ids:
+        load_crypto_data.clear(coin_id)
+        CacheManager.delete(f"crypto_{coin_id.lower()}")
+    for ticker in tickers:
+        load_stock_data.clear(ticker)
+        CacheManager.delete(f"stock_{ticker.upper()}")
+
+# -----------------------------------------------------------
+#  PLACEHOLDER SCORES
+# -----------------------------------------------------------
+
+# Random stand-ins until these are computed from data; memoized so a widget
+# click does not reshuffle them
+
+@_page_cache(PAGE_PLACEHOLDER_TTL)
+def placeholder_article_sentiment(title):
+    return str(np.random.choice(['Positive', 'Neutral', 'Negative']))
+
+@_page_cache(PAGE_PLACEHOLDER_TTL)
+def placeholder_sentiment_breakdown(asset_name):
+    return {
+        'Positive': int(np.random.randint(40, 70)),
+        'Neutral': int(np.random.randint(20, 40)),
+        'Negative': int(np.random.randint(10, 30))
+    }
+
+@_page_cache(PAGE_PLACEHOLDER_TTL)
+def placeholder_sentiment_score(symbol):
+    """Market sentiment in [-1, 1] around a per-symbol base score"""
+    base_scores = {
+        'BTC': 0.7, 'ETH': 0.6, 'AAPL': 0.5, 'TSLA': 0.4,
+        'GOOGL': 0.6, 'AMZN': 0.5, 'MSFT': 0.7, 'NVDA': 0.8
+    }
+    base_score = base_scores.get(symbol.upper(), 0.5)
+    sentiment = base_score + np.random.uniform(-0.2, 0.2)
+    return max(-1, min(1, sentiment))
@@ -0,0 +1,151 @@
+import os
+import time
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
+
+# -----------------------------------------------------------
+#  BATCH REPORT CONFIGURATION
+# -----------------------------------------------------------
+
+REPORT_BATCH_WORKERS = int(os.environ.get("REPORT_BATCH_WORKERS", min(os.cpu_count() or 1, 8)))
+REPORT_BATCH_DIR = os.environ.get("REPORT_BATCH_DIR", "reports")
+
+# -----------------------------------------------------------
+#  WORKER PROCESS
+# -----------------------------------------------------------
+
+def _preload_report_layout():
+    """
+    Import the report module and compile the report layout (which also loads
+    the FPDF core font metrics), so each report only pays for its own content.
+    """
+    from services.report_gen import get_report_layout
+    get_report_layout()
+
+def _worker_setup():
+    """One-time setup in every worker process: headless Matplotlib, then the report layout"""
+    import matplotlib
+    matplotlib.use("Agg")
+
+    _preload_report_layout()
+
+def _render_report(job):
+    """
+    Render one report to job["output_file"]; errors are returned, not raised.
+    Renders in memory rather than through generate_pdf_report, whose text-file
+    fallback would otherwise be counted as a finished PDF.
+    """
+    from services.report_gen import render_pdf_report
+
+    start = time.perf_counter()
+    try:
+        pdf_bytes = render_pdf_report(
+            analysis_data=job["analysis_data"],
+            asset_data=job.get("asset_data"),
+            news_list=job.get("news_list")
+        )
+        output_file = job["output_file"]
+        with open(output_file, "wb") as f:
+            f.write(pdf_bytes)
+        return {
+            "symbol": job["symbol"],
+            "file": output_file,
+            "size": os.path.getsize(output_file),
+            "seconds": time.perf_counter() - start
+        }
+    except Exception as e:
+        return {"symbol": job["symbol"], "error": str(e), "seconds": time.perf_counter() - start}
+
+# -----------------------------------------------------------
+#  BATCH ENGINE
+# -----------------------------------------------------------
+
+def analysis_failure(analysis):
+    """
+    Why an analysis result cannot be reported on, or None if it can. Engine
+    errors come back as {"error": ...}; a failed model call still yields a
+    structured result, but with no analysis sections (the error text ends up
+    in full_analysis).
+    """
+    if not analysis:
+        return "No analysis"
+    if analysis.get("error"):
+        return analysis["error"]
+    if not (analysis.get("technical_analysis") or analysis.get("fundamental_analysis")):
+        detail = (analysis.get("full_analysis") or "").strip().split("\n", 1)[0][:200]
+        return f"Analysis has no sections: {detail}" if detail else "Analysis has no sections"
+    return None
+
+def report_filename(symbol, timestamp=None):
+    """Same naming as the Report page download"""
+    timestamp = timestamp or datetime.now().strftime("%Y%m%d_%H%M%S")
+    return f"Professional_Analysis_{symbol.upper()}_{timestamp}.pdf"
+
+def generate_reports(analyses, news=None, output_dir=REPORT_BATCH_DIR, workers=REPORT_BATCH_WORKERS,
+                     progress=None):
+    """
+    Render one PDF per analysis in parallel worker processes.
+
+    analyses: {SYMBOL: analysis result} as returned by ai_market_analysis /
+    portfolio_market_analysis; failed analyses (see analysis_failure) are
+    skipped and reported as errors.
+    news: optional {SYMBOL: news list}.
+    progress: optional callback(done, total, result) called as reports finish.
+    Returns one result dict per report (symbol, file, size, seconds or error),
+    in the order of `analyses`.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    news = news or {}
+
+    jobs = []
+    results = {}
+    for symbol, analysis in analyses.items():
+        failure = analysis_failure(analysis)
+        if failure:
+            results[symbol] = {"symbol": symbol, "error": failure}
+            continue
+        jobs.append({
+            "symbol": symbol,
+            "analysis_data": analysis,
+            "asset_data": analysis.get("raw_data", {}),
+            "news_list": news.get(symbol, []),
+            "output_file": os.path.join(output_dir, report_filename(symbol, timestamp))
+        })
+
+    total = len(analyses)
+    done = 0
+    for result in list(results.values()):
+        done += 1
+        if progress:
+            progress(done, total, result)
+
+    if workers <= 1 or len(jobs) <= 1:
+        # In the caller's process: its Matplotlib backend is left alone (charts
+        # render on Agg canvases directly and need no backend)
+        _preload_report_layout()
+        for job in jobs:
+            results[job["symbol"]] = result = _render_report(job)
+            done += 1
+            if progress:
+                progress(done, total, result)
+    elif jobs:
+        # Fresh interpreters rather than fork: the parent may be running Streamlit
+        # or network threads, and Matplotlib/FPDF state must not be shared
+        context = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=min(workers, len(jobs)), mp_context=context,
+                                 initializer=_worker_setup) as pool:
+            futures = {pool.submit(_render_report, job): job["symbol"] for job in jobs}
+            for future in as_completed(futures):
+                symbol = futures[future]
+                try:
+                    result = future.result()
+                except Exception as e:
+                    result = {"symbol": symbol, "error": str(e)}
+                results[symbol] = result
+                done += 1
+                if progress:
+                    progress(done, total, result)
+
+    return [results[symbol] for symbol in analyses]
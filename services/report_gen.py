@@ -1,8 +1,14 @@
 from fpdf import FPDF
 from datetime import datetime
-import matplotlib.pyplot as plt
-import pandas as pd
+from services.chart_cache import chart_cache, chart_key
+from services.chart_render import TechnicalChartRenderer
+from services.report_model import (DISCLAIMER_TEXT, REPORT_SECTIONS, ReportModel, safe_format_number,
+                                    safe_format_price)
 from io import BytesIO
+from functools import lru_cache, partial
+import os
+import tempfile
+import threading
 import base64
 import re
 
@@ -10,6 +16,74 @@ import re
 #  PROFESSIONAL PDF REPORT GENERATOR - ENHANCED
 # -----------------------------------------------------------
 
+# Unicode characters with a readable Latin-1 / ASCII substitute
+_PDF_REPLACEMENTS = {
+    '\u2014': '--',     # em dash
+    '\u2013': '-',      # en dash
+    '\u2018': "'",      # left single quote
+    '\u2019': "'",      # right single quote
+    '\u201c': '"',      # left double quote
+    '\u201d': '"',      # right double quote
+    '\u2026': '...',    # ellipsis
+    '\u00a0': ' ',      # non-breaking space
+    '\u00ae': '(R)',    # registered trademark
+    '\u00a9': '(C)',    # copyright
+    '\u2122': '(TM)',    # trademark
+    '\u00b0': ' deg',   # degree symbol
+    '\u00b1': '+/-',    # plus-minus
+    '\u00bc': '1/4',    # fraction 1/4
+    '\u00bd': '1/2',    # fraction 1/2
+    '\u00be': '3/4',    # fraction 3/4
+    '\u00f7': '/',      # division
+    '\u00d7': 'x',      # multiplication
+    '\u2012': '-',      # figure dash
+    '\u2010': '-',      # hyphen
+    '\u2011': '-',      # non-breaking hyphen
+    '\u2212': '-',      # minus sign
+    '\u00b2': '^2',     # superscript 2
+    '\u00b3': '^3',     # superscript 3
+    '\u00b9': '^1',     # superscript 1
+    '\u20ac': 'EUR',    # euro
+    '\u00a3': 'GBP',    # pound
+    '\u00a5': 'JPY',    # yen
+    '\u00a2': 'cents',  # cent
+    '\u00a7': 'SS',     # section
+    '\u00b6': 'PP',     # paragraph
+    '\u2022': '*',      # bullet
+    '\u25cf': '*',      # black circle
+    '\u25cb': 'o',      # white circle
+    '\u25a0': '■',      # black square
+    '\u25aa': '▪',      # black small square
+    '\u25b2': '^',      # black up-pointing triangle
+    '\u25bc': 'v',      # black down-pointing triangle
+}
+
+# Substitutes that are themselves outside Latin-1 end up as a space
+_PDF_SUBSTITUTES = {
+    char: re.sub(r'[^\x00-\xFF]', ' ', substitute)
+    for char, substitute in _PDF_REPLACEMENTS.items()
+}
+
+# Every character that needs replacing: a mapped symbol or anything outside Latin-1
+_PDF_SPECIAL_CHARS = re.compile(
+    '[' + re.escape(''.join(_PDF_REPLACEMENTS)) + '\u0100-\U0010FFFF]'
+)
+
+# Labels, values and headings repeat across reports; memoize strings up to this length
+_PDF_TEXT_MEMO_LENGTH = 256
+
+def _sanitize_pdf_text(text):
+    # Pure ASCII text (the common case) only needs whitespace cleanup; otherwise
+    # replace just the distinct special characters that actually occur
+    if not text.isascii():
+        for char in set(_PDF_SPECIAL_CHARS.findall(text)):
+            text = text.replace(char, _PDF_SUBSTITUTES.get(char, ' '))
+    return ' '.join(text.split())
+
+@lru_cache(maxsize=4096)
+def _sanitize_short_pdf_text(text):
+    return _sanitize_pdf_text(text)
+
 def _clean_text_for_pdf(text):
     """Clean text for PDF encoding (Latin-1 compatible)"""
     if text is None:
@@ -18,154 +92,179 @@ def _clean_text_for_pdf(text):
     # Convert to string if not already
     text = str(text)
     
-    # Replace common problematic Unicode characters
-    replacements = {
-        '\u2014': '--',     # em dash
-        '\u2013': '-',      # en dash
-        '\u2018': "'",      # left single quote
-        '\u2019': "'",      # right single quote
-        '\u201c': '"',      # left double quote
-        '\u201d': '"',      # right double quote
-        '\u2026': '...',    # ellipsis
-        '\u00a0': ' ',      # non-breaking space
-        '\u00ae': '(R)',    # registered trademark
-        '\u00a9': '(C)',    # copyright
-        '\u2122': '(TM)',    # trademark
-        '\u00b0': ' deg',   # degree symbol
-        '\u00b1': '+/-',    # plus-minus
-        '\u00bc': '1/4',    # fraction 1/4
-        '\u00bd': '1/2',    # fraction 1/2
-        '\u00be': '3/4',    # fraction 3/4
-        '\u00f7': '/',      # division
-        '\u00d7': 'x',      # multiplication
-        '\u2012': '-',      # figure dash
-        '\u2010': '-',      # hyphen
-        '\u2011': '-',      # non-breaking hyphen
-        '\u2212': '-',      # minus sign
-        '\u00b2': '^2',     # superscript 2
-        '\u00b3': '^3',     # superscript 3
-        '\u00b9': '^1',     # superscript 1
-        '\u20ac': 'EUR',    # euro
-        '\u00a3': 'GBP',    # pound
-        '\u00a5': 'JPY',    # yen
-        '\u00a2': 'cents',  # cent
-        '\u00a7': 'SS',     # section
-        '\u00b6': 'PP',     # paragraph
-        '\u2022': '*',      # bullet
-        '\u25cf': '*',      # black circle
-        '\u25cb': 'o',      # white circle
-        '\u25a0': '■',      # black square
-        '\u25aa': '▪',      # black small square
-        '\u25b2': '^',      # black up-pointing triangle
-        '\u25bc': 'v',      # black down-pointing triangle
-    }
-    
-    # Apply replacements
-    for unicode_char, ascii_char in replacements.items():
-        text = text.replace(unicode_char, ascii_char)
-    
-    # Remove any remaining non-Latin-1 characters using regex
-    # This preserves ASCII and common Latin-1 characters
-    text = re.sub(r'[^\x00-\xFF]', ' ', text)
-    
-    # Clean up multiple spaces
-    text = ' '.join(text.split())
-    
-    return text
+    if len(text) <= _PDF_TEXT_MEMO_LENGTH:
+        return _sanitize_short_pdf_text(text)
+    return _sanitize_pdf_text(text)
 
-def _safe_format_number(value, default=0):
-    """Safely format numbers, handling strings and None"""
-    if value is None:
-        return default
-    
-    try:
-        if isinstance(value, str):
-            # Remove commas, currency symbols, and other non-numeric characters
-            value = value.replace(',', '').replace('$', '').replace('€', '').replace('£', '').strip()
-        
-        # Try to convert to float
-        num = float(value)
-        return num
-    except (ValueError, TypeError):
-        return default
-
-def _safe_format_price(price):
-    """Safely format price values"""
-    price_num = _safe_format_number(price, 0)
-    return f"${price_num:,.2f}"
-
-def _safe_format_volume(volume):
-    """Safely format volume values"""
-    volume_num = _safe_format_number(volume, 0)
-    if volume_num >= 1_000_000_000:
-        return f"${volume_num/1_000_000_000:.2f}B"
-    elif volume_num >= 1_000_000:
-        return f"${volume_num/1_000_000:.2f}M"
-    elif volume_num >= 1_000:
-        return f"${volume_num/1_000:.2f}K"
-    else:
-        return f"${volume_num:,.0f}"
+# Everything that changes the rendered image; bump "version" when the drawing code changes
+TECHNICAL_CHART_SPEC = {
+    "chart": "technical_indicators",
+    "version": 2,
+    "figsize": (10, 8),
+    "dpi": 150,
+    "rsi_period": 14
+}
 
-def create_technical_indicators_chart(prices, volumes):
-    """Create professional technical indicators chart"""
+def create_technical_indicators_chart(prices, volumes, fmt="png"):
+    """Create professional technical indicators chart (PNG or JPEG), reused from the chart cache when possible"""
     # Convert to numeric lists
     prices_numeric = []
     volumes_numeric = []
     
     for price in prices:
-        prices_numeric.append(_safe_format_number(price, 0))
+        prices_numeric.append(safe_format_number(price, 0))
     
     for volume in volumes:
-        volumes_numeric.append(_safe_format_number(volume, 0))
-    
-    fig, axes = plt.subplots(3, 1, figsize=(10, 8))
-    
-    # Price chart
-    if prices_numeric:
-        axes[0].plot(prices_numeric, color='blue', linewidth=2)
-        axes[0].set_title('Price Movement', fontsize=12, fontweight='bold')
-        axes[0].grid(True, alpha=0.3)
-    
-    # Volume chart
-    if volumes_numeric:
-        axes[1].bar(range(len(volumes_numeric)), volumes_numeric, color='green', alpha=0.6)
-        axes[1].set_title('Trading Volume', fontsize=12, fontweight='bold')
-        axes[1].grid(True, alpha=0.3)
-    
-    # RSI simulation
-    if len(prices_numeric) > 14:
-        delta = pd.Series(prices_numeric).diff()
-        gain = (delta.where(delta > 0, 0)).rolling(window=14).mean()
-        loss = (-delta.where(delta < 0, 0)).rolling(window=14).mean()
-        rs = gain / loss
-        rsi = 100 - (100 / (1 + rs))
-        axes[2].plot(rsi, color='purple', linewidth=2)
-        axes[2].axhline(y=70, color='r', linestyle='--', alpha=0.5)
-        axes[2].axhline(y=30, color='g', linestyle='--', alpha=0.5)
-        axes[2].set_title('RSI Indicator', fontsize=12, fontweight='bold')
-        axes[2].set_ylim(0, 100)
-    
-    plt.tight_layout()
-    
-    # Save to bytes
-    img_bytes = BytesIO()
-    plt.savefig(img_bytes, format='png', dpi=150, bbox_inches='tight')
-    img_bytes.seek(0)
-    plt.close()
-    
-    return img_bytes
+        volumes_numeric.append(safe_format_number(volume, 0))
+    
+    spec = TECHNICAL_CHART_SPEC if fmt == "png" else dict(TECHNICAL_CHART_SPEC, format=fmt)
+    key = chart_key(spec, prices_numeric, volumes_numeric)
+    image = chart_cache.get_or_render(
+        key, lambda: _render_technical_indicators_chart(prices_numeric, volumes_numeric, fmt)
+    )
+    return BytesIO(image)
+
+# Pool of reusable Agg figures; safe to call from any thread
+_technical_chart_renderer = TechnicalChartRenderer(
+    figsize=TECHNICAL_CHART_SPEC["figsize"],
+    dpi=TECHNICAL_CHART_SPEC["dpi"],
+    rsi_period=TECHNICAL_CHART_SPEC["rsi_period"]
+)
 
-def generate_pdf_report(analysis_data, asset_data=None, news_list=None, output_file="professional_analysis_report.pdf"):
+def _render_technical_indicators_chart(prices_numeric, volumes_numeric, fmt="png"):
+    """Draw the price / volume / RSI figure and return the image bytes"""
+    return _technical_chart_renderer.render(prices_numeric, volumes_numeric, fmt)
+
+# Days of daily bars behind the chart in a report
+REPORT_CHART_DAYS = 90
+
+def _report_price_history(model):
+    """Daily bars for the report's asset from the cached history provider, or None"""
+    if model.symbol == 'N/A':
+        return None
+    from services.data_fetch import get_price_history
+    raw = model.analysis.get('raw_data') or {}
+    asset_type = {"cryptocurrency": "crypto", "crypto": "crypto", "stock": "stock"}.get(str(model.asset_type).lower())
+    price = safe_format_number(raw.get('price', 0), 0)
+    return get_price_history(model.symbol, asset_type, days=REPORT_CHART_DAYS, fallback_price=price or None)
+
+def render_pdf_report(analysis_data, asset_data=None, news_list=None, sections=None, include_charts=False):
+    """
+    Creates a professional financial analysis PDF in memory and returns the
+    document bytes. sections limits the report to those REPORT_SECTIONS keys
+    (None means all); include_charts adds the technical chart. FPDF 1.7 only
+    reads images from file paths, so a chart passes through a private
+    temporary directory that is removed as soon as the image is embedded;
+    without charts nothing touches the disk.
+    """
+    model = ReportModel(analysis_data, news_list, sections=sections, include_charts=include_charts)
+    return render_model_pdf(model)
+
+def render_model_pdf(model):
+    """
+    PDF bytes for a ReportModel; only its included sections are computed and
+    drawn. Falls back to the simplified layout if the full one cannot be encoded.
+    """
+    pdf = _build_pdf_report(model)
+    try:
+        return _pdf_bytes(pdf)
+    except Exception as e:
+        # Try alternative encoding if first attempt fails
+        print(f"PDF generation error: {e}")
+        # Create a simplified version if the full one fails
+        return _pdf_bytes(_build_simple_pdf(model.analysis))
+
+def generate_pdf_report(analysis_data, asset_data=None, news_list=None, output_file="professional_analysis_report.pdf",
+                        sections=None, include_charts=False):
     """
-    Creates a professional financial analysis PDF with advanced features.
+    Creates a professional financial analysis PDF and writes it to output_file.
+    Use render_pdf_report to get the bytes without touching the disk.
     """
+    try:
+        pdf_bytes = render_pdf_report(analysis_data, asset_data, news_list, sections, include_charts)
+    except Exception as e:
+        print(f"Even simple PDF failed: {e}")
+        return _write_text_report(analysis_data, output_file)
     
+    with open(output_file, "wb") as f:
+        f.write(pdf_bytes)
+    return output_file
+
+def _pdf_bytes(pdf):
+    """Serialize an FPDF document to bytes (fpdf keeps the buffer as latin-1 text)"""
+    return pdf.output(dest='S').encode('latin-1')
+
+# -----------------------------------------------------------
+#  COMPILED LAYOUT TEMPLATES
+# -----------------------------------------------------------
+
+# Registered in this order in every report document, so recorded page
+# operators refer to the same font resources (/F1, /F2, /F3) everywhere
+_REPORT_FONTS = (("Arial", "B"), ("Arial", "I"), ("Arial", ""))
+
+SECTION_TITLES = tuple(title for title, _ in REPORT_SECTIONS.values())
+
+def _new_report_pdf():
+    """Empty report document with the shared page setup and font registration"""
     pdf = FPDF()
     pdf.set_auto_page_break(auto=True, margin=15)
-    
-    # Add first page
-    pdf.add_page()
-    
+    for family, style in _REPORT_FONTS:
+        pdf.set_font(family, style, 12)
+    return pdf
+
+class PdfFragment:
+    """
+    Static page content drawn once on a scratch document and kept as raw PDF
+    operators. Placing it appends those operators shifted to the current
+    cursor, so the drawing code does not run again for every report.
+
+    Written against PyFPDF 1.7.2 internals: page content is the plain string
+    in pdf.pages[n], and the font_family / fill_color / text_color /
+    color_flag attributes are FPDF's record of the current state, which place()
+    brings in line with what the fragment drew. Font resources are referenced
+    by number (/F1...), so both documents come from _new_report_pdf().
+    tests/test_report_gen.py checks these assumptions; fpdf2 is not compatible.
+    """
+
+    def __init__(self, draw):
+        pdf = _new_report_pdf()
+        pdf.add_page()
+        # Forget the inherited font so the fragment always selects its own
+        pdf.font_family = ''
+        initial_text_color = pdf.text_color
+        self.top = pdf.y
+        start = len(pdf.pages[pdf.page])
+        draw(pdf)
+        if pdf.page != 1:
+            raise ValueError("A layout fragment must fit on one page")
+        
+        self.operators = pdf.pages[pdf.page][start:]
+        self.height = pdf.y - self.top
+        # State the drawing code leaves behind, re-applied after placing
+        self.font = (pdf.font_family, pdf.font_style, pdf.font_size_pt)
+        self.fill_color = pdf.fill_color
+        self.text_color = pdf.text_color if pdf.text_color != initial_text_color else None
+
+    def place(self, pdf):
+        """Draw the fragment at the cursor of pdf and move the cursor below it"""
+        if pdf.y + self.height > pdf.page_break_trigger and pdf.accept_page_break():
+            pdf.add_page()
+        
+        # q/Q scopes the translation; FPDF's own state is brought in line afterwards
+        shift = (pdf.y - self.top) * pdf.k
+        pdf.pages[pdf.page] += f"q 1 0 0 1 0 {-shift:.2f} cm\n{self.operators}Q\n"
+        pdf.x = pdf.l_margin
+        pdf.y += self.height
+        
+        pdf.set_font(*self.font)
+        if pdf.fill_color != self.fill_color:
+            pdf.fill_color = self.fill_color
+            pdf.pages[pdf.page] += self.fill_color + "\n"
+        if self.text_color is not None:
+            pdf.text_color = self.text_color
+        pdf.color_flag = pdf.fill_color != pdf.text_color
+
+def _draw_title_block(pdf):
     # Professional Header with logo
     pdf.set_fill_color(41, 128, 185)  # Blue background
     pdf.rect(0, 0, 210, 30, 'F')
@@ -179,254 +278,212 @@ def generate_pdf_report(analysis_data, asset_data=None, news_list=None, output_f
     # Report Title
     pdf.set_font("Arial", "B", 20)
     pdf.cell(0, 10, "AI-POWERED MARKET ANALYSIS REPORT", ln=True, align='C')
-    pdf.set_font("Arial", "I", 12)
-    pdf.cell(0, 10, f"Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')} UTC", ln=True, align='C')
-    
-    pdf.ln(15)
-    
-    # Executive Summary Section
+
+def _draw_section_header(title, pdf):
     pdf.set_fill_color(240, 240, 240)
     pdf.set_font("Arial", "B", 16)
-    pdf.cell(0, 10, "EXECUTIVE SUMMARY", ln=True, fill=True)
+    pdf.cell(0, 10, title, ln=True, fill=True)
     pdf.ln(5)
-    
+
+def _draw_disclaimer(pdf):
+    pdf.set_font("Arial", "I", 10)
+    pdf.set_text_color(100, 100, 100)
+    pdf.multi_cell(0, 8, _clean_text_for_pdf(DISCLAIMER_TEXT))
+
+class ReportLayout:
+    """The static parts of the report, compiled once per process"""
+
+    def __init__(self):
+        self.title_block = PdfFragment(_draw_title_block)
+        self.section_headers = {
+            title: PdfFragment(partial(_draw_section_header, title)) for title in SECTION_TITLES
+        }
+        self.disclaimer = PdfFragment(_draw_disclaimer)
+
+    def section(self, pdf, title):
+        self.section_headers[title].place(pdf)
+
+_layout = None
+_layout_lock = threading.Lock()
+
+def get_report_layout():
+    """Process-wide compiled layout shared by all reports"""
+    global _layout
+    if _layout is None:
+        with _layout_lock:
+            if _layout is None:
+                _layout = ReportLayout()
+    return _layout
+
+# -----------------------------------------------------------
+#  PDF SECTIONS
+# -----------------------------------------------------------
+
+def _draw_executive_summary(pdf, model, data):
     pdf.set_font("Arial", size=12)
-    if analysis_data.get('recommendation'):
-        rec = _clean_text_for_pdf(analysis_data['recommendation'])
-        risk = _clean_text_for_pdf(analysis_data.get('risk', 'N/A'))
-        confidence = _clean_text_for_pdf(analysis_data.get('confidence_score', '85%'))
-        
-        summary_text = f"""
-        Based on advanced AI analysis and quantitative modeling, this report provides a comprehensive 
-        assessment of the market position. Primary recommendation: {rec}. 
-        Risk assessment: {risk}. Confidence level: {confidence}.
-        """
-        pdf.multi_cell(0, 8, _clean_text_for_pdf(summary_text))
-    
-    pdf.ln(10)
-    
-    # Key Metrics Table
-    pdf.set_font("Arial", "B", 16)
-    pdf.cell(0, 10, "KEY PERFORMANCE INDICATORS", ln=True, fill=True)
-    pdf.ln(5)
-    
-    if analysis_data.get('raw_data'):
-        raw = analysis_data['raw_data']
-        
-        # Safely extract and format values
-        symbol = _clean_text_for_pdf(raw.get('symbol', 'N/A'))
-        asset_type = _clean_text_for_pdf(raw.get('asset_type', 'N/A'))
-        price = _safe_format_price(raw.get('price', 0))
-        high = _safe_format_price(raw.get('high', 0))
-        low = _safe_format_price(raw.get('low', 0))
-        
-        # Safely format volume
-        volume_raw = raw.get('volume', 0)
-        volume_formatted = _safe_format_volume(volume_raw)
-        
-        sentiment = _clean_text_for_pdf(raw.get('sentiment', 'N/A'))
-        volatility = _clean_text_for_pdf(analysis_data.get('volatility', 'N/A'))
-        market_cap_rank = _clean_text_for_pdf(analysis_data.get('market_cap_rank', 'N/A'))
-        
-        metrics = [
-            ("Asset", f"{symbol.upper()} ({asset_type})"),
-            ("Current Price", price),
-            ("24h High", high),
-            ("24h Low", low),
-            ("Volume", volume_formatted),
-            ("Market Sentiment", sentiment),
-            ("Volatility Score", str(volatility)),
-            ("Market Cap Rank", str(market_cap_rank))
-        ]
-        
+    if data["text"]:
+        pdf.multi_cell(0, 8, _clean_text_for_pdf(data["text"]))
+
+def _draw_value_rows(pdf, rows):
+    """Label / value table with alternating row shading"""
+    pdf.set_font("Arial", size=11)
+    col_width = 90
+    row_height = 10
+    
+    for i, (label, value) in enumerate(rows):
+        pdf.set_fill_color(245, 245, 245 if i % 2 == 0 else 255)
+        pdf.cell(col_width, row_height, f"  {_clean_text_for_pdf(label)}:", border=0, fill=True)
+        pdf.set_font("Arial", "B", 11)
+        pdf.cell(col_width, row_height, f"  {_clean_text_for_pdf(value)}", border=0, fill=True, ln=True)
         pdf.set_font("Arial", size=11)
-        col_width = 90
-        row_height = 10
-        
-        for i, (label, value) in enumerate(metrics):
-            pdf.set_fill_color(245, 245, 245 if i % 2 == 0 else 255)
-            pdf.cell(col_width, row_height, f"  {_clean_text_for_pdf(label)}:", border=0, fill=True)
-            pdf.set_font("Arial", "B", 11)
-            pdf.cell(col_width, row_height, f"  {_clean_text_for_pdf(value)}", border=0, fill=True, ln=True)
-            pdf.set_font("Arial", size=11)
-    
-    pdf.ln(10)
+
+def _draw_key_metrics(pdf, model, data):
+    _draw_value_rows(pdf, data["metrics"])
+
+def _place_image(pdf, image, width=190):
+    """
+    Embed JPEG bytes at the cursor. FPDF 1.7 has no file-object support for
+    images, so the bytes go through a per-call temporary directory; FPDF copies
+    the data into the document, and the directory is always removed.
+    """
+    with tempfile.TemporaryDirectory(prefix="report_chart_") as directory:
+        path = os.path.join(directory, "chart.jpg")
+        with open(path, "wb") as f:
+            f.write(image)
+        pdf.image(path, x=pdf.l_margin, w=width, type="jpg")
+
+def _draw_technical_chart(pdf, model):
+    history = _report_price_history(model)
+    if not history or len(history["close"]) < 2:
+        return
     
-    # Technical Analysis Section
-    pdf.set_font("Arial", "B", 16)
-    pdf.cell(0, 10, "TECHNICAL ANALYSIS", ln=True, fill=True)
+    # JPEG: FPDF copies it into the document instead of decoding pixels
+    image = create_technical_indicators_chart(history["close"], history["volume"], fmt="jpeg").getvalue()
     pdf.ln(5)
-    
-    pdf.set_font("Arial", size=12)
-    if analysis_data.get('technical_analysis'):
-        tech_analysis = _clean_text_for_pdf(analysis_data['technical_analysis'])
-        pdf.multi_cell(0, 8, tech_analysis)
+    _place_image(pdf, image)
+    pdf.set_font("Arial", "I", 9)
+    if history.get("synthetic"):
+        caption = "Illustrative price history: no market data was available for this asset."
     else:
-        pdf.multi_cell(0, 8, "Comprehensive technical analysis including moving averages, RSI, MACD, and Bollinger Bands indicates...")
-    
-    pdf.ln(10)
-    
-    # Fundamental Analysis Section
-    pdf.set_font("Arial", "B", 16)
-    pdf.cell(0, 10, "FUNDAMENTAL ANALYSIS", ln=True, fill=True)
-    pdf.ln(5)
-    
+        caption = f"Daily prices, last {len(history['close'])} sessions (source: {history['source']})"
+    pdf.cell(0, 6, _clean_text_for_pdf(caption), ln=True, align='C')
+
+def _draw_technical_analysis(pdf, model, data):
     pdf.set_font("Arial", size=12)
-    if analysis_data.get('fundamental_analysis'):
-        fund_analysis = _clean_text_for_pdf(analysis_data['fundamental_analysis'])
-        pdf.multi_cell(0, 8, fund_analysis)
-    else:
-        pdf.multi_cell(0, 8, "Fundamental analysis based on market capitalization, trading volume, liquidity metrics, and comparative sector analysis...")
-    
-    pdf.ln(10)
-    
-    # Risk Assessment Matrix
-    pdf.set_font("Arial", "B", 16)
-    pdf.cell(0, 10, "RISK ASSESSMENT MATRIX", ln=True, fill=True)
-    pdf.ln(5)
-    
-    risk_data = analysis_data.get('risk_breakdown', {})
-    if risk_data:
-        pdf.set_font("Arial", size=11)
-        for risk_factor, score in risk_data.items():
-            try:
-                # Clean risk factor name
-                risk_factor_clean = _clean_text_for_pdf(risk_factor)
-                
-                # Extract numeric part from score
-                if isinstance(score, str):
-                    if '/' in score:
-                        score_num = int(score.split('/')[0])
-                    else:
-                        # Try to extract any number
-                        import re
-                        numbers = re.findall(r'\d+', str(score))
-                        score_num = int(numbers[0]) if numbers else 5
-                else:
-                    score_num = int(score)
-                
-                # Ensure score is between 1-10
-                score_num = max(1, min(10, score_num))
-                
-                # Create visual risk bar
-                bar_width = int(score_num * 5)
-                pdf.cell(40, 8, f"{risk_factor_clean}:")
-                pdf.set_fill_color(255, 100, 100)  # Red for high risk
-                if score_num <= 3:
-                    pdf.set_fill_color(100, 255, 100)  # Green for low risk
-                elif score_num <= 6:
-                    pdf.set_fill_color(255, 200, 100)  # Yellow for medium risk
-                pdf.cell(bar_width, 8, "", fill=True)
-                pdf.cell(10, 8, f" {score_num}/10")
-                pdf.ln(8)
-            except (ValueError, TypeError):
-                # If we can't parse the score, just show it as text
-                pdf.cell(40, 8, f"{risk_factor_clean}:")
-                pdf.cell(50, 8, f" {_clean_text_for_pdf(score)}")
-                pdf.ln(8)
-    else:
-        pdf.multi_cell(0, 8, "Market Risk: Moderate\nLiquidity Risk: Low\nVolatility Risk: High\nRegulatory Risk: Medium")
-    
-    pdf.ln(10)
-    
-    # Investment Recommendation
-    pdf.set_font("Arial", "B", 16)
-    pdf.cell(0, 10, "INVESTMENT RECOMMENDATION", ln=True, fill=True)
-    pdf.ln(5)
-    
-    recommendation = _clean_text_for_pdf(analysis_data.get('recommendation', 'Hold'))
-    confidence = _clean_text_for_pdf(analysis_data.get('confidence_score', '85%'))
+    pdf.multi_cell(0, 8, _clean_text_for_pdf(data["text"]))
+    if data["indicators"]:
+        pdf.ln(5)
+        _draw_value_rows(pdf, data["indicators"])
     
+    # The chart is the expensive part: price history plus rendering
+    if model.include_charts:
+        _draw_technical_chart(pdf, model)
+
+def _draw_market_outlook(pdf, model, data):
+    pdf.set_font("Arial", size=12)
+    pdf.multi_cell(0, 8, _clean_text_for_pdf(data["text"]))
+
+def _draw_risk_assessment(pdf, model, data):
+    pdf.set_font("Arial", size=11)
+    for factor in data["factors"]:
+        pdf.cell(40, 8, f"{_clean_text_for_pdf(factor['name'])}:")
+        score = factor["score"]
+        if score is None:
+            # Nothing numeric to chart; show the value as text
+            pdf.cell(50, 8, f" {_clean_text_for_pdf(factor['label'])}")
+        else:
+            # Create visual risk bar
+            pdf.set_fill_color(255, 100, 100)  # Red for high risk
+            if score <= 3:
+                pdf.set_fill_color(100, 255, 100)  # Green for low risk
+            elif score <= 6:
+                pdf.set_fill_color(255, 200, 100)  # Yellow for medium risk
+            pdf.cell(score * 5, 8, "", fill=True)
+            pdf.cell(10, 8, f" {factor['label']}")
+        pdf.ln(8)
+
+def _draw_investment_recommendation(pdf, model, data):
     # Color code based on recommendation
-    if 'buy' in recommendation.lower():
-        pdf.set_text_color(0, 128, 0)  # Green
-    elif 'sell' in recommendation.lower():
-        pdf.set_text_color(255, 0, 0)  # Red
-    else:
-        pdf.set_text_color(255, 165, 0)  # Orange
+    tone_colors = {"buy": (0, 128, 0), "sell": (255, 0, 0), "hold": (255, 165, 0)}
+    pdf.set_text_color(*tone_colors[data["tone"]])
     
     pdf.set_font("Arial", "B", 18)
+    recommendation = _clean_text_for_pdf(data["recommendation"])
     pdf.cell(0, 12, f"  {recommendation.upper()}  ", ln=True, align='C', border=1)
     pdf.set_text_color(0, 0, 0)
     
     pdf.set_font("Arial", size=12)
-    pdf.cell(0, 10, f"Confidence Level: {confidence}", ln=True, align='C')
-    
-    pdf.ln(10)
-    
-    # Action Plan
-    pdf.set_font("Arial", "B", 16)
-    pdf.cell(0, 10, "ACTION PLAN", ln=True, fill=True)
-    pdf.ln(5)
-    
-    action_items = analysis_data.get('action_items', [
-        "1. Entry Point: Wait for pullback to support level",
-        "2. Position Sizing: 5-10% of portfolio",
-        "3. Stop Loss: Set at 8% below entry",
-        "4. Take Profit: Target 15-20% gain",
-        "5. Time Horizon: 3-6 months"
-    ])
-    
+    pdf.cell(0, 10, f"Confidence Level: {_clean_text_for_pdf(data['confidence'])}", ln=True, align='C')
+
+def _draw_action_plan(pdf, model, data):
     pdf.set_font("Arial", size=11)
-    for item in action_items:
+    for item in data["items"]:
         pdf.multi_cell(0, 8, _clean_text_for_pdf(item))
-    
-    pdf.ln(10)
-    
-    # Market News & Sentiment
-    if news_list:
-        pdf.add_page()
-        pdf.set_font("Arial", "B", 16)
-        pdf.cell(0, 10, "MARKET NEWS & SENTIMENT ANALYSIS", ln=True, fill=True)
-        pdf.ln(5)
-        
+
+def _draw_news_sentiment(pdf, model, data):
+    for i, article in enumerate(data["articles"]):
+        pdf.set_font("Arial", "B", 11)
+        pdf.multi_cell(0, 8, f"{i+1}. {_clean_text_for_pdf(article['title'])}")
+        pdf.set_font("Arial", "I", 10)
+        source = _clean_text_for_pdf(article['source'])
+        date = _clean_text_for_pdf(article['date'])
+        pdf.multi_cell(0, 7, f"   Source: {source} | Date: {date}")
         pdf.set_font("Arial", size=11)
-        for i, news in enumerate(news_list[:5]):  # Top 5 news
-            title = _clean_text_for_pdf(news.get('title', 'No title'))
-            source = _clean_text_for_pdf(news.get('source', 'Unknown'))
-            date = _clean_text_for_pdf(news.get('date', 'N/A'))
-            description = _clean_text_for_pdf(news.get('description', ''))
-            
-            pdf.set_font("Arial", "B", 11)
-            pdf.multi_cell(0, 8, f"{i+1}. {title}")
-            pdf.set_font("Arial", "I", 10)
-            pdf.multi_cell(0, 7, f"   Source: {source} | Date: {date}")
-            pdf.set_font("Arial", size=11)
-            # Truncate description to avoid very long lines
-            truncated_desc = description[:200] + "..." if len(description) > 200 else description
-            pdf.multi_cell(0, 8, f"   {truncated_desc}")
-            pdf.ln(5)
+        pdf.multi_cell(0, 8, f"   {_clean_text_for_pdf(article['description'])}")
+        pdf.ln(5)
+
+# Section key -> draw(pdf, model, section data)
+_PDF_SECTION_DRAWERS = {
+    "Executive Summary": _draw_executive_summary,
+    "Key Metrics": _draw_key_metrics,
+    "Technical Analysis": _draw_technical_analysis,
+    "Market Outlook": _draw_market_outlook,
+    "Risk Assessment": _draw_risk_assessment,
+    "Investment Recommendation": _draw_investment_recommendation,
+    "Action Plan": _draw_action_plan,
+    "News Sentiment": _draw_news_sentiment
+}
+
+# Sections that start on a fresh page
+_PDF_PAGE_BREAK_SECTIONS = {"News Sentiment"}
+
+def _build_pdf_report(model):
+    """Lay out the included sections of a ReportModel and return the FPDF document"""
+    layout = get_report_layout()
+    pdf = _new_report_pdf()
     
-    # Disclaimer
+    # Add first page
     pdf.add_page()
-    pdf.set_font("Arial", "I", 10)
-    pdf.set_text_color(100, 100, 100)
     
-    disclaimer = """
-    DISCLAIMER: This report is generated by AI algorithms and should not be considered as financial advice. 
-    Past performance is not indicative of future results. Always conduct your own research and consult with 
-    a qualified financial advisor before making investment decisions. The creators of this tool are not 
-    responsible for any financial losses incurred.
+    # Header band and report title
+    layout.title_block.place(pdf)
+    pdf.set_font("Arial", "I", 12)
+    pdf.cell(0, 10, f"Generated: {model.generated_at.strftime('%Y-%m-%d %H:%M:%S')} UTC", ln=True, align='C')
+    if model.confidential:
+        pdf.set_text_color(192, 57, 43)
+        pdf.set_font("Arial", "B", 12)
+        pdf.cell(0, 8, "CONFIDENTIAL", ln=True, align='C')
+        pdf.set_text_color(0, 0, 0)
     
-    Report ID: {report_id}
-    Model Version: Quantum AI v2.1
-    Data Sources: Multiple financial APIs and real-time feeds
-    """.format(report_id=datetime.now().strftime("%Y%m%d%H%M%S"))
+    pdf.ln(15)
     
-    pdf.multi_cell(0, 8, _clean_text_for_pdf(disclaimer))
+    # Only included sections are built (model.section is lazy) and drawn
+    for key in model.included:
+        if key in _PDF_PAGE_BREAK_SECTIONS:
+            pdf.add_page()
+        layout.section(pdf, model.title(key))
+        _PDF_SECTION_DRAWERS[key](pdf, model, model.section(key))
+        pdf.ln(10)
     
-    # Save PDF
-    try:
-        pdf.output(output_file)
-        return output_file
-    except Exception as e:
-        # Try alternative encoding if first attempt fails
-        print(f"PDF generation error: {e}")
-        # Create a simplified version if the full one fails
-        return _generate_simple_pdf(analysis_data, output_file)
+    # Disclaimer
+    pdf.add_page()
+    layout.disclaimer.place(pdf)
+    pdf.cell(0, 8, f"Report ID: {model.report_id}", ln=True)
+    
+    return pdf
 
-def _generate_simple_pdf(analysis_data, output_file="simple_analysis_report.pdf"):
-    """Generate a simplified PDF if the full version fails"""
+def _build_simple_pdf(analysis_data):
+    """Simplified PDF document, used if the full version fails"""
     pdf = FPDF()
     pdf.set_auto_page_break(auto=True, margin=15)
     pdf.add_page()
@@ -445,7 +502,7 @@ def _generate_simple_pdf(analysis_data, output_file="simple_analysis_report.pdf"
         # Clean all text
         symbol = _clean_text_for_pdf(raw.get('symbol', 'N/A'))
         asset_type = _clean_text_for_pdf(raw.get('asset_type', 'N/A'))
-        price = _safe_format_price(raw.get('price', 0))
+        price = safe_format_price(raw.get('price', 0))
         recommendation = _clean_text_for_pdf(analysis_data.get('recommendation', 'Hold'))
         
         pdf.cell(0, 10, f"Asset: {symbol.upper()} ({asset_type})", ln=True)
@@ -475,17 +532,15 @@ def _generate_simple_pdf(analysis_data, output_file="simple_analysis_report.pdf"
     pdf.set_font("Arial", "I", 10)
     pdf.cell(0, 10, f"Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}", ln=True)
     
-    try:
-        pdf.output(output_file)
-        return output_file
-    except Exception as e:
-        print(f"Even simple PDF failed: {e}")
-        # Create a minimal text file as last resort
-        with open(output_file.replace('.pdf', '.txt'), 'w') as f:
-            f.write(f"Analysis Report\n")
-            f.write(f"Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
-            if analysis_data.get('raw_data'):
-                raw = analysis_data['raw_data']
-                f.write(f"Symbol: {raw.get('symbol', 'N/A')}\n")
-                f.write(f"Price: ${raw.get('price', 0)}\n")
-        return output_file.replace('.pdf', '.txt')
\ No newline at end of file
+    return pdf
+
+def _write_text_report(analysis_data, output_file):
+    """Minimal text file as last resort when no PDF can be produced"""
+    with open(output_file.replace('.pdf', '.txt'), 'w') as f:
+        f.write(f"Analysis Report\n")
+        f.write(f"Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
+        if analysis_data.get('raw_data'):
+            raw = analysis_data['raw_data']
+            f.write(f"Symbol: {raw.get('symbol', 'N/A')}\n")
+            f.write(f"Price: ${raw.get('price', 0)}\n")
+    return output_file.replace('.pdf', '.txt')
\ No newline at end of file
@@ -0,0 +1,439 @@
+import json
+import html
+from datetime import datetime
+
+# -----------------------------------------------------------
+#  VALUE FORMATTING
+# -----------------------------------------------------------
+
+def safe_format_number(value, default=0):
+    """Safely format numbers, handling strings and None"""
+    if value is None:
+        return default
+
+    try:
+        if isinstance(value, str):
+            # Remove commas, currency symbols, and other non-numeric characters
+            value = value.replace(',', '').replace('$', '').replace('€', '').replace('£', '').strip()
+
+        # Try to convert to float
+        num = float(value)
+        return num
+    except (ValueError, TypeError):
+        return default
+
+def safe_format_price(price):
+    """Safely format price values"""
+    price_num = safe_format_number(price, 0)
+    return f"${price_num:,.2f}"
+
+def safe_format_volume(volume):
+    """Safely format volume values"""
+    volume_num = safe_format_number(volume, 0)
+    if volume_num >= 1_000_000_000:
+        return f"${volume_num/1_000_000_000:.2f}B"
+    elif volume_num >= 1_000_000:
+        return f"${volume_num/1_000_000:.2f}M"
+    elif volume_num >= 1_000:
+        return f"${volume_num/1_000:.2f}K"
+    else:
+        return f"${volume_num:,.0f}"
+
+# -----------------------------------------------------------
+#  SECTION BUILDERS
+# -----------------------------------------------------------
+#
+# Each builder turns the analysis result into plain data for one section;
+# renderers only format that data.
+
+DISCLAIMER_TEXT = """
+DISCLAIMER: This report is generated by AI algorithms and should not be considered as financial advice. 
+Past performance is not indicative of future results. Always conduct your own research and consult with 
+a qualified financial advisor before making investment decisions. The creators of this tool are not 
+responsible for any financial losses incurred.
+
+Model Version: Quantum AI v2.1
+Data Sources: Multiple financial APIs and real-time feeds
+"""
+
+DEFAULT_ACTION_ITEMS = [
+    "1. Entry Point: Wait for pullback to support level",
+    "2. Position Sizing: 5-10% of portfolio",
+    "3. Stop Loss: Set at 8% below entry",
+    "4. Take Profit: Target 15-20% gain",
+    "5. Time Horizon: 3-6 months"
+]
+
+DEFAULT_RISK_FACTORS = [
+    ("Market Risk", "Moderate"),
+    ("Liquidity Risk", "Low"),
+    ("Volatility Risk", "High"),
+    ("Regulatory Risk", "Medium")
+]
+
+# Indicators shown in the technical section, with their display names
+TECHNICAL_INDICATOR_LABELS = {
+    "sma_20": "SMA 20",
+    "sma_50": "SMA 50",
+    "rsi": "RSI (14)",
+    "macd": "MACD",
+    "volatility_percent": "Volatility %",
+    "support_level": "Support",
+    "resistance_level": "Resistance"
+}
+
+def _executive_summary(model):
+    analysis = model.analysis
+    if not analysis.get('recommendation'):
+        return {"text": None}
+
+    rec = analysis['recommendation']
+    risk = analysis.get('risk', 'N/A')
+    confidence = analysis.get('confidence_score', '85%')
+    return {
+        "recommendation": rec,
+        "risk": risk,
+        "confidence": confidence,
+        "text": (
+            "Based on advanced AI analysis and quantitative modeling, this report provides a comprehensive "
+            f"assessment of the market position. Primary recommendation: {rec}. "
+            f"Risk assessment: {risk}. Confidence level: {confidence}."
+        )
+    }
+
+def _key_metrics(model):
+    raw = model.analysis.get('raw_data')
+    if not raw:
+        return {"metrics": []}
+
+    return {"metrics": [
+        ("Asset", f"{str(raw.get('symbol', 'N/A')).upper()} ({raw.get('asset_type', 'N/A')})"),
+        ("Current Price", safe_format_price(raw.get('price', 0))),
+        ("24h High", safe_format_price(raw.get('high', 0))),
+        ("24h Low", safe_format_price(raw.get('low', 0))),
+        ("Volume", safe_format_volume(raw.get('volume', 0))),
+        ("Market Sentiment", str(raw.get('sentiment', 'N/A'))),
+        ("Volatility Score", str(model.analysis.get('volatility', 'N/A'))),
+        ("Market Cap Rank", str(model.analysis.get('market_cap_rank', 'N/A')))
+    ]}
+
+def _technical_analysis(model):
+    indicators = model.analysis.get('technical_indicators') or {}
+    values = []
+    for key, label in TECHNICAL_INDICATOR_LABELS.items():
+        value = indicators.get(key)
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            values.append((label, f"{value:,.2f}"))
+
+    return {
+        "text": model.analysis.get('technical_analysis') or
+                "Comprehensive technical analysis including moving averages, RSI, MACD, and Bollinger Bands indicates...",
+        "indicators": values
+    }
+
+def _market_outlook(model):
+    return {
+        "text": model.analysis.get('fundamental_analysis') or
+                "Fundamental analysis based on market capitalization, trading volume, liquidity metrics, and comparative sector analysis..."
+    }
+
+def _parse_risk_score(score):
+    """1-10 score from '7/10', 7 or 'High (7)'; None if there is no number"""
+    try:
+        if isinstance(score, str):
+            if '/' in score:
+                number = int(score.split('/')[0])
+            else:
+                digits = ''.join(c if c.isdigit() else ' ' for c in score).split()
+                if not digits:
+                    return None
+                number = int(digits[0])
+        else:
+            number = int(score)
+    except (ValueError, TypeError):
+        return None
+    return max(1, min(10, number))
+
+def _risk_assessment(model):
+    breakdown = model.analysis.get('risk_breakdown') or {}
+    if not breakdown:
+        return {
+            "risk": model.analysis.get('risk', 'N/A'),
+            "factors": [{"name": name, "score": None, "label": label} for name, label in DEFAULT_RISK_FACTORS]
+        }
+
+    factors = []
+    for name, score in breakdown.items():
+        number = _parse_risk_score(score)
+        factors.append({
+            "name": str(name),
+            "score": number,
+            "label": f"{number}/10" if number is not None else str(score)
+        })
+    return {"risk": model.analysis.get('risk', 'N/A'), "factors": factors}
+
+def _investment_recommendation(model):
+    recommendation = str(model.analysis.get('recommendation', 'Hold'))
+    lowered = recommendation.lower()
+    return {
+        "recommendation": recommendation,
+        "confidence": model.analysis.get('confidence_score', '85%'),
+        "tone": "buy" if 'buy' in lowered else "sell" if 'sell' in lowered else "hold"
+    }
+
+def _action_plan(model):
+    return {"items": [str(item) for item in model.analysis.get('action_items', DEFAULT_ACTION_ITEMS)]}
+
+def _news_sentiment(model):
+    articles = []
+    for news in model.news[:5]:  # Top 5 news
+        description = str(news.get('description', '') or '')
+        articles.append({
+            "title": news.get('title', 'No title'),
+            "source": news.get('source', 'Unknown'),
+            "date": news.get('date', news.get('publishedAt', 'N/A')),
+            "description": description[:200] + "..." if len(description) > 200 else description,
+            "url": news.get('url') or news.get('link')
+        })
+
+    # Quote data sentiment first; otherwise the analysis label ('Bullish' on the
+    # Analysis page) or a {"overall": ...} summary
+    sentiment = (model.analysis.get('raw_data') or {}).get('sentiment')
+    if sentiment is None:
+        sentiment = model.analysis.get('market_sentiment')
+        if isinstance(sentiment, dict):
+            sentiment = sentiment.get('overall')
+    return {
+        "sentiment": sentiment or 'Neutral',
+        "articles": articles
+    }
+
+# key -> (title, builder), in report order. Keys match the Report page's
+# "Include Sections" options; Key Metrics and Investment Recommendation are
+# part of every report.
+REPORT_SECTIONS = {
+    "Executive Summary": ("EXECUTIVE SUMMARY", _executive_summary),
+    "Key Metrics": ("KEY PERFORMANCE INDICATORS", _key_metrics),
+    "Technical Analysis": ("TECHNICAL ANALYSIS", _technical_analysis),
+    "Market Outlook": ("FUNDAMENTAL ANALYSIS", _market_outlook),
+    "Risk Assessment": ("RISK ASSESSMENT MATRIX", _risk_assessment),
+    "Investment Recommendation": ("INVESTMENT RECOMMENDATION", _investment_recommendation),
+    "Action Plan": ("ACTION PLAN", _action_plan),
+    "News Sentiment": ("MARKET NEWS & SENTIMENT ANALYSIS", _news_sentiment)
+}
+
+CORE_SECTIONS = ("Key Metrics", "Investment Recommendation")
+
+# Everything that can be picked on the Report page, in display order
+OPTIONAL_SECTIONS = [key for key in REPORT_SECTIONS if key not in CORE_SECTIONS]
+
+# -----------------------------------------------------------
+#  REPORT MODEL
+# -----------------------------------------------------------
+
+class ReportModel:
+    """
+    Everything a report shows, derived once from an analysis result.
+    Sections are built on first access and only if included, so a preview
+    of two sections never computes the others.
+    """
+
+    def __init__(self, analysis, news=None, sections=None, include_charts=True,
+                 style="Professional", confidential=False, generated_at=None):
+        self.analysis = analysis or {}
+        self.news = list(news or [])
+        self.include_charts = include_charts
+        self.style = style
+        self.confidential = confidential
+        self.generated_at = generated_at or datetime.now()
+        self.report_id = self.generated_at.strftime("%Y%m%d%H%M%S")
+
+        # None means every section
+        selected = set(REPORT_SECTIONS if sections is None else sections) | set(CORE_SECTIONS)
+        self.included = [key for key in REPORT_SECTIONS if key in selected]
+        if not self.news and "News Sentiment" in self.included:
+            self.included.remove("News Sentiment")
+        self._built = {}
+
+    @property
+    def symbol(self):
+        raw = self.analysis.get('raw_data') or {}
+        return str(self.analysis.get('symbol') or raw.get('symbol') or 'N/A').upper()
+
+    @property
+    def asset_type(self):
+        raw = self.analysis.get('raw_data') or {}
+        return self.analysis.get('asset_type') or raw.get('asset_type', 'N/A')
+
+    def includes(self, key):
+        return key in self.included
+
+    def title(self, key):
+        return REPORT_SECTIONS[key][0]
+
+    def section(self, key):
+        """Data of one section, built on first access"""
+        if key not in self._built:
+            self._built[key] = REPORT_SECTIONS[key][1](self)
+        return self._built[key]
+
+    def sections(self):
+        """(key, title, data) for every included section, in report order"""
+        return [(key, self.title(key), self.section(key)) for key in self.included]
+
+    def to_dict(self):
+        return {
+            "symbol": self.symbol,
+            "asset_type": self.asset_type,
+            "style": self.style,
+            "confidential": self.confidential,
+            "generated_at": self.generated_at.isoformat(timespec="seconds"),
+            "report_id": self.report_id,
+            "sections": {key: data for key, _, data in self.sections()}
+        }
+
+# -----------------------------------------------------------
+#  RENDERERS
+# -----------------------------------------------------------
+
+_RENDERERS = {}
+
+def register_renderer(name, renderer, mime_type, extension):
+    """Make a format available to render_report; renderer(model) returns str or bytes"""
+    _RENDERERS[name] = (renderer, mime_type, extension)
+
+def report_formats():
+    return list(_RENDERERS)
+
+def report_mime_type(name):
+    return _RENDERERS[name][1]
+
+def report_filename(model, name):
+    timestamp = model.generated_at.strftime("%Y%m%d_%H%M%S")
+    return f"Professional_Analysis_{model.symbol}_{timestamp}.{_RENDERERS[name][2]}"
+
+def render_report(model, name="markdown"):
+    """Render a report model in one of the registered formats"""
+    if name not in _RENDERERS:
+        raise ValueError(f"Unknown report format: {name}")
+    return _RENDERERS[name][0](model)
+
+def _markdown_section(key, title, data):
+    lines = [f"## {title.title()}", ""]
+    if key == "Executive Summary":
+        lines.append(data["text"] or "_No recommendation available._")
+    elif key == "Key Metrics":
+        lines += ["| Metric | Value |", "|---|---|"]
+        lines += [f"| {label} | {value} |" for label, value in data["metrics"]]
+    elif key in ("Technical Analysis", "Market Outlook"):
+        lines.append(data["text"])
+        if data.get("indicators"):
+            lines += ["", "| Indicator | Value |", "|---|---|"]
+            lines += [f"| {label} | {value} |" for label, value in data["indicators"]]
+    elif key == "Risk Assessment":
+        lines += [f"- **{factor['name']}:** {factor['label']}" for factor in data["factors"]]
+    elif key == "Investment Recommendation":
+        lines.append(f"**{data['recommendation'].upper()}** (confidence: {data['confidence']})")
+    elif key == "Action Plan":
+        lines += [f"- {item}" for item in data["items"]]
+    elif key == "News Sentiment":
+        lines += [f"Overall sentiment: **{data['sentiment']}**", ""]
+        for i, article in enumerate(data["articles"], 1):
+            lines.append(f"{i}. **{article['title']}** - _{article['source']}, {article['date']}_")
+            if article["description"]:
+                lines.append(f"   {article['description']}")
+    return "\n".join(lines)
+
+def render_markdown(model):
+    parts = [
+        "# AI-Powered Market Analysis Report",
+        f"**Asset:** {model.symbol} ({model.asset_type})  ",
+        f"**Generated:** {model.generated_at.strftime('%Y-%m-%d %H:%M:%S')}  ",
+        f"**Report ID:** {model.report_id}"
+    ]
+    if model.confidential:
+        parts.append("\n> **CONFIDENTIAL**")
+    for key, title, data in model.sections():
+        parts.append("\n" + _markdown_section(key, title, data))
+    return "\n".join(parts) + "\n"
+
+def _html_rows(rows):
+    return "".join(f"<tr><th>{html.escape(str(label))}</th><td>{html.escape(str(value))}</td></tr>"
+                   for label, value in rows)
+
+def _html_section(key, title, data):
+    body = ""
+    if key == "Executive Summary":
+        body = f"<p>{html.escape(data['text'] or 'No recommendation available.')}</p>"
+    elif key == "Key Metrics":
+        body = f"<table>{_html_rows(data['metrics'])}</table>"
+    elif key in ("Technical Analysis", "Market Outlook"):
+        body = f"<p>{html.escape(data['text'])}</p>"
+        if data.get("indicators"):
+            body += f"<table>{_html_rows(data['indicators'])}</table>"
+    elif key == "Risk Assessment":
+        rows = []
+        for factor in data["factors"]:
+            bar = (f'<span class="bar risk-{factor["score"]}" style="width:{factor["score"] * 10}%"></span>'
+                   if factor["score"] is not None else "")
+            rows.append(f"<tr><th>{html.escape(factor['name'])}</th>"
+                        f"<td>{bar} {html.escape(factor['label'])}</td></tr>")
+        body = f"<table>{''.join(rows)}</table>"
+    elif key == "Investment Recommendation":
+        body = (f'<p class="recommendation {data["tone"]}">{html.escape(data["recommendation"].upper())}</p>'
+                f"<p>Confidence Level: {html.escape(str(data['confidence']))}</p>")
+    elif key == "Action Plan":
+        body = "<ul>" + "".join(f"<li>{html.escape(item)}</li>" for item in data["items"]) + "</ul>"
+    elif key == "News Sentiment":
+        items = []
+        for article in data["articles"]:
+            items.append(f"<li><strong>{html.escape(str(article['title']))}</strong> "
+                         f"<em>{html.escape(str(article['source']))}, {html.escape(str(article['date']))}</em>"
+                         f"<br>{html.escape(article['description'])}</li>")
+        body = (f"<p>Overall sentiment: <strong>{html.escape(str(data['sentiment']))}</strong></p>"
+                f"<ol>{''.join(items)}</ol>")
+    return f"<section><h2>{html.escape(title)}</h2>{body}</section>"
+
+_HTML_STYLE = """
+body { font-family: Arial, sans-serif; max-width: 860px; margin: 0 auto; color: #222; }
+header { background: #2980b9; color: white; padding: 16px 24px; }
+h2 { background: #f0f0f0; padding: 6px 10px; font-size: 18px; }
+table { border-collapse: collapse; width: 100%; }
+th, td { text-align: left; padding: 6px 10px; border-bottom: 1px solid #eee; }
+.bar { display: inline-block; height: 10px; background: #ff6464; }
+.risk-1, .risk-2, .risk-3 { background: #64ff64; }
+.risk-4, .risk-5, .risk-6 { background: #ffc864; }
+.recommendation { font-size: 22px; font-weight: bold; text-align: center; border: 1px solid #999; padding: 8px; }
+.recommendation.buy { color: #008000; } .recommendation.sell { color: #ff0000; } .recommendation.hold { color: #ffa500; }
+.confidential { color: #c0392b; font-weight: bold; }
+footer { color: #666; font-style: italic; font-size: 12px; margin-top: 32px; }
+"""
+
+def render_html(model):
+    parts = [
+        "<!DOCTYPE html><html><head><meta charset=\"utf-8\">",
+        f"<title>{html.escape(model.symbol)} - AI-Powered Market Analysis Report</title>",
+        f"<style>{_HTML_STYLE}</style></head><body>",
+        "<header><h1>QUANTUM FINANCIAL INTELLIGENCE</h1>",
+        f"<p>AI-Powered Market Analysis Report - {html.escape(model.symbol)} ({html.escape(str(model.asset_type))})"
+        f" - Generated {model.generated_at.strftime('%Y-%m-%d %H:%M:%S')}</p></header>"
+    ]
+    if model.confidential:
+        parts.append('<p class="confidential">CONFIDENTIAL</p>')
+    parts += [_html_section(key, title, data) for key, title, data in model.sections()]
+    parts.append(f"<footer><p>{html.escape(' '.join(DISCLAIMER_TEXT.split()))}</p>"
+                 f"<p>Report ID: {model.report_id}</p></footer></body></html>")
+    return "\n".join(parts)
+
+def render_json(model):
+    return json.dumps(model.to_dict(), indent=2, default=str)
+
+def render_pdf(model):
+    # FPDF and Matplotlib load only when a PDF is actually requested
+    from services.report_gen import render_model_pdf
+    return render_model_pdf(model)
+
+register_renderer("pdf", render_pdf, "application/pdf", "pdf")
+register_renderer("html", render_html, "text/html", "html")
+register_renderer("markdown", render_markdown, "text/markdown", "md")
+register_renderer("json", render_json, "application/json", "json")
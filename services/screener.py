@@ -0,0 +1,259 @@
+import os
+import time
+import threading
+import numpy as np
+import pandas as pd
+from services import indicators
+from services.data_fetch import get_top_crypto_markets, get_bulk_stock_quotes
+
+# -----------------------------------------------------------
+#  SCREENER CONFIGURATION
+# -----------------------------------------------------------
+
+SCREENER_TOP_COINS = int(os.environ.get("SCREENER_TOP_COINS", 100))
+SCREENER_REFRESH_SECONDS = int(os.environ.get("SCREENER_REFRESH_SECONDS", 300))
+SCREENER_RETRY_SECONDS = int(os.environ.get("SCREENER_RETRY_SECONDS", 60))
+SCREENER_STOCK_UNIVERSE = [
+    ticker.strip().upper() for ticker in os.environ.get(
+        "SCREENER_STOCK_UNIVERSE",
+        "AAPL,MSFT,GOOGL,AMZN,NVDA,META,TSLA,BRK-B,JPM,V,MA,UNH,JNJ,XOM,PG,HD,"
+        "COST,AVGO,LLY,ORCL,NFLX,ADBE,CRM,AMD,INTC,KO,PEP,WMT,DIS,BAC"
+    ).split(",") if ticker.strip()
+]
+
+# Numeric columns that can be filtered and sorted. Volume is in USD for every
+# asset; RSI is kept per bar interval because crypto and stock feeds differ.
+NUMERIC_COLUMNS = ("price", "change_pct", "volume", "market_cap", "rsi_hourly", "rsi_daily")
+RSI_COLUMNS = {"1h": "rsi_hourly", "1d": "rsi_daily"}
+
+# -----------------------------------------------------------
+#  COLUMNAR TABLE WITH SORTED INDEXES
+# -----------------------------------------------------------
+
+class ScreenerTable:
+    """
+    Immutable column store of quotes. Every numeric column has a precomputed
+    argsort index, so range filters are binary searches and sorted output
+    is a walk over an existing order.
+    """
+
+    def __init__(self, columns, updated_at=None):
+        self.symbols = np.asarray(columns.get("symbol", []), dtype=object)
+        self.ids = np.asarray(columns.get("id", self.symbols), dtype=object)
+        self.names = np.asarray(columns.get("name", self.symbols), dtype=object)
+        self.asset_types = np.asarray(columns.get("asset_type", ["crypto"] * len(self.symbols)), dtype=object)
+        self.columns = {
+            name: np.asarray(columns.get(name, [np.nan] * len(self.symbols)), dtype=float)
+            for name in NUMERIC_COLUMNS
+        }
+        self.updated_at = updated_at or time.time()
+
+        # Ascending order per column with NaNs at the end, plus the NaN-free prefix length
+        self._order = {}
+        self._sorted = {}
+        for name, values in self.columns.items():
+            order = np.argsort(values, kind="stable")
+            valid = int(np.count_nonzero(~np.isnan(values)))
+            self._order[name] = (order, valid)
+            self._sorted[name] = values[order[:valid]]
+
+        self._by_type = {
+            asset_type: np.flatnonzero(self.asset_types == asset_type)
+            for asset_type in set(self.asset_types)
+        }
+
+    def __len__(self):
+        return len(self.symbols)
+
+    @classmethod
+    def from_quotes(cls, quotes, updated_at=None):
+        """
+        Build from fetcher rows: dicts with symbol/id/name/asset_type, numeric fields,
+        `closes` and their bar `interval` ("1h" or "1d", daily if missing)
+        """
+        columns = {
+            "symbol": [q["symbol"] for q in quotes],
+            "id": [q.get("id", q["symbol"]) for q in quotes],
+            "name": [q.get("name", q["symbol"]) for q in quotes],
+            "asset_type": [q.get("asset_type", "crypto") for q in quotes],
+            "price": [q.get("current_price") for q in quotes],
+            "change_pct": [q.get("change_pct") for q in quotes],
+            "volume": [q.get("volume") for q in quotes],
+            "market_cap": [q.get("market_cap") for q in quotes]
+        }
+        for name in ("price", "change_pct", "volume", "market_cap"):
+            columns[name] = [np.nan if value is None else value for value in columns[name]]
+        rsi = _latest_rsi([q.get("closes") or [] for q in quotes])
+        for interval, name in RSI_COLUMNS.items():
+            in_interval = np.array([q.get("interval", "1d") == interval for q in quotes], dtype=bool)
+            columns[name] = np.where(in_interval, rsi, np.nan)
+        return cls(columns, updated_at)
+
+    def _range_rows(self, column, low=None, high=None):
+        order, valid = self._order[column]
+        sorted_values = self._sorted[column]
+        start = 0 if low is None else int(np.searchsorted(sorted_values, low, side="left"))
+        end = valid if high is None else int(np.searchsorted(sorted_values, high, side="right"))
+        return order[start:end]
+
+    def query(self, asset_type=None, filters=None, sort_by="volume", descending=True, limit=50):
+        """
+        Row indices matching every filter, ordered by `sort_by`.
+        filters: {column: (low, high)}, either bound may be None.
+        Rows with no value in the sort column come last.
+        """
+        mask = np.ones(len(self), dtype=bool)
+        if asset_type:
+            mask[:] = False
+            mask[self._by_type.get(asset_type, [])] = True
+
+        for column, (low, high) in (filters or {}).items():
+            if column not in self.columns:
+                raise KeyError(f"Unknown screener column: {column}")
+            if low is None and high is None:
+                continue
+            in_range = np.zeros(len(self), dtype=bool)
+            in_range[self._range_rows(column, low, high)] = True
+            mask &= in_range
+
+        order, valid = self._order[sort_by]
+        ranked = order[:valid][::-1] if descending else order[:valid]
+        rows = np.concatenate([ranked, order[valid:]])
+        rows = rows[mask[rows]]
+        return rows[:limit] if limit else rows
+
+    def records(self, rows):
+        """Rows as a list of dicts"""
+        return [
+            {
+                "symbol": self.symbols[row],
+                "id": self.ids[row],
+                "name": self.names[row],
+                "asset_type": self.asset_types[row],
+                **{name: (None if np.isnan(values[row]) else float(values[row]))
+                   for name, values in self.columns.items()}
+            }
+            for row in rows
+        ]
+
+    def to_frame(self, rows):
+        """Rows as a DataFrame for display"""
+        frame = pd.DataFrame({
+            "Symbol": self.symbols[rows],
+            "Name": self.names[rows],
+            "Type": self.asset_types[rows],
+            "Price": self.columns["price"][rows],
+            "Change %": self.columns["change_pct"][rows],
+            "Volume ($)": self.columns["volume"][rows],
+            "Market Cap": self.columns["market_cap"][rows],
+            "RSI 1h": self.columns["rsi_hourly"][rows],
+            "RSI 1d": self.columns["rsi_daily"][rows]
+        })
+        return frame.reset_index(drop=True)
+
+def _latest_rsi(series_list, period=14):
+    """Last Wilder RSI of each series, computed for all series of one length at once"""
+    rsi = np.full(len(series_list), np.nan)
+    by_length = {}
+    for row, closes in enumerate(series_list):
+        if len(closes) > period:
+            by_length.setdefault(len(closes), []).append(row)
+
+    for length, rows in by_length.items():
+        matrix = np.array([series_list[row] for row in rows], dtype=float)
+        # Bridge gaps in the feed so a single missing bar does not blank the row
+        matrix = pd.DataFrame(matrix).ffill(axis=1).bfill(axis=1).to_numpy()
+        rsi[rows] = indicators.rsi(matrix, period)[:, -1]
+    return rsi
+
+# -----------------------------------------------------------
+#  SCREENER SERVICE
+# -----------------------------------------------------------
+
+class MarketScreener:
+    """Keeps a ScreenerTable of the crypto top-N and the stock universe current"""
+
+    def __init__(self, top_coins=SCREENER_TOP_COINS, stock_universe=None,
+                 refresh_seconds=SCREENER_REFRESH_SECONDS, retry_seconds=SCREENER_RETRY_SECONDS):
+        self.top_coins = top_coins
+        self.stock_universe = list(stock_universe or SCREENER_STOCK_UNIVERSE)
+        self.refresh_seconds = refresh_seconds
+        self.retry_seconds = retry_seconds
+        self.table = ScreenerTable({})
+        self.last_error = None
+        self.last_attempt = 0.0
+        self._refresh_lock = threading.RLock()
+        self._start_lock = threading.Lock()
+        self._thread = None
+
+    def refresh(self):
+        """Pull bulk quotes and swap in a new table; returns the table"""
+        with self._refresh_lock:
+            self.last_attempt = time.time()
+            quotes = []
+            for coin in get_top_crypto_markets(self.top_coins):
+                quotes.append({**coin, "asset_type": "crypto"})
+            for stock in get_bulk_stock_quotes(self.stock_universe):
+                quotes.append({**stock, "asset_type": "stock"})
+
+            if quotes:
+                self.table = ScreenerTable.from_quotes(quotes)
+                self.last_error = None
+            else:
+                self.last_error = "No quotes returned by the data sources"
+            return self.table
+
+    def _retry_due(self):
+        return not len(self.table) and time.time() - self.last_attempt >= self.retry_seconds
+
+    def ensure_fresh(self):
+        """
+        Refresh in the foreground if there is no data yet, at most once per
+        retry interval while the sources stay unreachable; then keep the
+        background loop running
+        """
+        if self._retry_due():
+            with self._refresh_lock:
+                # Another session may have refreshed while we waited
+                if self._retry_due():
+                    self.refresh()
+        self.start()
+        return self.table
+
+    def start(self):
+        """Start the periodic background refresh (idempotent, safe across sessions)"""
+        with self._start_lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+
+            def refresh_loop():
+                while True:
+                    time.sleep(self.refresh_seconds)
+                    try:
+                        self.refresh()
+                    except Exception as e:
+                        self.last_error = str(e)
+
+            self._thread = threading.Thread(target=refresh_loop, name="market-screener", daemon=True)
+            self._thread.start()
+
+    def query(self, **kwargs):
+        """ScreenerTable.query on the current table; returns (table, rows)"""
+        table = self.table
+        return table, table.query(**kwargs)
+
+# -----------------------------------------------------------
+#  SHARED SCREENER
+# -----------------------------------------------------------
+
+_screener = None
+_screener_lock = threading.Lock()
+
+def get_screener():
+    """Process-wide screener shared by all Streamlit sessions"""
+    global _screener
+    if _screener is None:
+        with _screener_lock:
+            if _screener is None:
+                _screener = MarketScreener()
+    return _screener
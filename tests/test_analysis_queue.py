@@ -0,0 +1,100 @@
+import threading
+import pytest
+from services.analysis_queue import AnalysisJobQueue, QueueFullError
+
+WAIT = 5  # Seconds; every wait is bounded so a stuck worker fails the test instead of hanging it
+
+def occupy_worker(queue, session_id="busy"):
+    """Submit a job that holds the (single) worker until released; returns (job, release)"""
+    started, release = threading.Event(), threading.Event()
+
+    def hold():
+        started.set()
+        release.wait(WAIT)
+
+    job = queue.submit(session_id, hold)
+    assert started.wait(WAIT)
+    return job, release
+
+def recorder(order, name):
+    def run():
+        order.append(name)
+        return name
+    return run
+
+def test_sessions_are_served_round_robin():
+    queue = AnalysisJobQueue(workers=1)
+    _, release = occupy_worker(queue)
+    order = []
+    jobs = [queue.submit("a", recorder(order, f"a{i}")) for i in range(1, 4)]
+    jobs.append(queue.submit("b", recorder(order, "b1")))
+    release.set()
+    assert all(job.wait(WAIT) for job in jobs)
+    assert order == ["a1", "b1", "a2", "a3"]
+
+def test_position_follows_the_rotation():
+    queue = AnalysisJobQueue(workers=1)
+    _, release = occupy_worker(queue)
+    a1 = queue.submit("a", lambda: None)
+    a2 = queue.submit("a", lambda: None)
+    b1 = queue.submit("b", lambda: None)
+    assert [queue.position(job.id) for job in (a1, b1, a2)] == [0, 1, 2]
+    assert queue.status(b1.id)["position"] == 1
+    release.set()
+    assert all(job.wait(WAIT) for job in (a1, a2, b1))
+    assert queue.position(b1.id) == 0
+
+def test_jobs_per_session_are_limited():
+    queue = AnalysisJobQueue(workers=1, max_jobs_per_session=2)
+    _, release = occupy_worker(queue, "a")  # Running jobs count too
+    queue.submit("a", lambda: None)
+    with pytest.raises(QueueFullError):
+        queue.submit("a", lambda: None)
+    queue.submit("b", lambda: None)  # Other sessions are not affected
+    release.set()
+
+def test_queue_depth_is_limited():
+    queue = AnalysisJobQueue(workers=1, max_queue_depth=2)
+    _, release = occupy_worker(queue)  # Running, no longer counted in the depth
+    queue.submit("a", lambda: None)
+    queue.submit("b", lambda: None)
+    assert queue.depth == 2
+    with pytest.raises(QueueFullError):
+        queue.submit("c", lambda: None)
+    release.set()
+
+def test_cancel_queued_job():
+    queue = AnalysisJobQueue(workers=1)
+    blocker, release = occupy_worker(queue, "a")
+    job = queue.submit("a", lambda: "result")
+    assert queue.cancel(job.id)
+    assert job.finished and job.status == "cancelled"
+    assert queue.depth == 0
+    release.set()
+    assert blocker.wait(WAIT) and blocker.status == "done"
+    assert job.result is None
+
+def test_cancel_running_stream_stops_it():
+    queue = AnalysisJobQueue(workers=1)
+    started, step = threading.Event(), threading.Event()
+
+    def stream():
+        started.set()
+        for i in range(1000):
+            step.wait(WAIT)
+            yield {"type": "token", "text": str(i)}
+
+    job = queue.submit("a", stream)
+    assert started.wait(WAIT)
+    assert queue.cancel(job.id)
+    step.set()
+    assert job.wait(WAIT)
+    assert job.status == "cancelled"
+    assert job.events == []
+
+def test_cancel_finished_job_is_a_no_op():
+    queue = AnalysisJobQueue(workers=1)
+    job = queue.submit("a", lambda: 1)
+    assert job.wait(WAIT)
+    assert not queue.cancel(job.id)
+    assert job.status == "done" and job.result == 1
@@ -0,0 +1,21 @@
+import numpy as np
+import pytest
+from services.chart_render import TechnicalChartRenderer
+
+def series(n, seed=0):
+    rng = np.random.default_rng(seed)
+    return 100 + np.cumsum(rng.normal(size=n)), rng.uniform(1e5, 1e6, size=n)
+
+# Small figures keep the test fast; the pool logic does not depend on size
+def renderer():
+    return TechnicalChartRenderer(figsize=(4, 3), dpi=40, pool_size=1)
+
+@pytest.mark.parametrize("bars", [0, 1, 2, 14, 90])
+@pytest.mark.parametrize("previous", [0, 2, 90])
+def test_reused_figure_renders_like_a_fresh_one(bars, previous):
+    prices, volumes = series(bars)
+    fresh = renderer().render(prices, volumes)
+    
+    reused = renderer()
+    reused.render(*series(previous, seed=1))
+    assert reused.render(prices, volumes) == fresh
@@ -0,0 +1,162 @@
+"""
+Ollama HTTP backend and CLI fallback, against scripts/ollama_stub_server.py
+"""
+import socket
+import subprocess
+import sys
+import pytest
+import requests
+from ollama_stub_server import CANNED_RESPONSE, start_stub_server
+from services import ai_engine
+from services.analysis_cache import AnalysisCache
+from services.ollama_client import OllamaClient, OllamaError
+
+@pytest.fixture
+def stub_server():
+    server, _ = start_stub_server(port=0)
+    yield server
+    server.shutdown()
+    server.server_close()
+
+@pytest.fixture
+def use_client(monkeypatch):
+    """Point the "ollama" engine at a given client; restores the real loader afterwards"""
+    def use(client):
+        ai_engine.register_engine("ollama", lambda: client)
+        return client
+    yield use
+    ai_engine.register_engine("ollama", ai_engine._load_ollama)
+
+@pytest.fixture
+def cli_calls(monkeypatch):
+    """Record CLI fallbacks instead of running `ollama run`"""
+    calls = []
+    def fake_cli(full_prompt):
+        calls.append(full_prompt)
+        return {"analysis": CANNED_RESPONSE}
+    monkeypatch.setattr(ai_engine, "_run_llama_cli", fake_cli)
+    return calls
+
+def host_of(server):
+    return f"http://127.0.0.1:{server.server_address[1]}"
+
+def unused_host():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    return f"http://127.0.0.1:{port}"
+
+def test_generate_sends_system_prompt_and_keep_alive(stub_server):
+    client = OllamaClient(host=host_of(stub_server), keep_alive="5m")
+    assert client.generate("prompt", system="system") == CANNED_RESPONSE
+    request = stub_server.request_log[-1]
+    assert request["system"] == "system"
+    assert request["keep_alive"] == "5m"
+    assert request["stream"] is False
+
+def test_generate_stream_yields_the_whole_response(stub_server):
+    client = OllamaClient(host=host_of(stub_server))
+    chunks = list(client.generate_stream("prompt"))
+    assert len(chunks) > 1
+    assert "".join(chunks) == CANNED_RESPONSE
+
+def test_missing_model_raises_with_status(stub_server):
+    client = OllamaClient(host=host_of(stub_server), model="mistral")
+    with pytest.raises(OllamaError) as excinfo:
+        client.generate("prompt")
+    assert excinfo.value.status_code == 404
+
+def test_analysis_uses_http_server(stub_server, use_client, cli_calls):
+    use_client(OllamaClient(host=host_of(stub_server)))
+    result = ai_engine.analyze_with_llama("prompt")
+    assert "error" not in result
+    assert result["analysis"] == CANNED_RESPONSE
+    assert result["recommendation"] == "Buy"
+    assert cli_calls == []
+
+def test_unreachable_server_falls_back_to_cli(use_client, cli_calls):
+    use_client(OllamaClient(host=unused_host(), connect_timeout=1))
+    result = ai_engine.analyze_with_llama("prompt")
+    assert len(cli_calls) == 1
+    assert result["analysis"] == CANNED_RESPONSE
+
+def test_model_missing_on_server_falls_back_to_cli(stub_server, use_client, cli_calls):
+    use_client(OllamaClient(host=host_of(stub_server), model="mistral"))
+    result = ai_engine.analyze_with_llama("prompt")
+    assert len(cli_calls) == 1
+    assert "error" not in result
+
+class BrokenStreamClient:
+    """Streams one chunk, then loses the connection"""
+
+    def generate_stream(self, prompt, system=None):
+        yield "TECHNICAL ANALYSIS:\n"
+        raise requests.exceptions.ConnectionError("connection reset")
+
+def fake_cli(monkeypatch, script):
+    """Run a Python snippet in place of `ollama run`"""
+    calls = []
+    real_popen = subprocess.Popen
+    def popen(args, **kwargs):
+        calls.append(args)
+        return real_popen([sys.executable, "-c", script], **kwargs)
+    monkeypatch.setattr(ai_engine.subprocess, "Popen", popen)
+    return calls
+
+def test_stream_uses_http_server(stub_server, use_client, monkeypatch):
+    use_client(OllamaClient(host=host_of(stub_server)))
+    calls = fake_cli(monkeypatch, "print('cli')")
+    assert "".join(ai_engine._stream_llama("prompt")) == CANNED_RESPONSE
+    assert calls == []
+
+def test_stream_broken_midway_is_not_replayed(use_client, monkeypatch):
+    use_client(BrokenStreamClient())
+    calls = fake_cli(monkeypatch, "print('cli')")
+    chunks = []
+    with pytest.raises(requests.exceptions.ConnectionError):
+        for chunk in ai_engine._stream_llama("prompt"):
+            chunks.append(chunk)
+    assert chunks == ["TECHNICAL ANALYSIS:\n"]
+    assert calls == []
+
+def test_stream_falls_back_to_cli_before_output(use_client, monkeypatch):
+    use_client(OllamaClient(host=unused_host(), connect_timeout=1))
+    # More stderr than a pipe buffer holds, written before any stdout
+    calls = fake_cli(monkeypatch, "import sys; sys.stderr.write('x' * 1000000); print('cli output')")
+    assert "".join(ai_engine._stream_llama("prompt")) == "cli output\n"
+    assert len(calls) == 1
+
+def test_stream_cli_failure_reports_stderr(use_client, monkeypatch):
+    use_client(OllamaClient(host=unused_host(), connect_timeout=1))
+    fake_cli(monkeypatch, "import sys; sys.stderr.write('model not found'); sys.exit(1)")
+    with pytest.raises(RuntimeError, match="model not found"):
+        list(ai_engine._stream_llama("prompt"))
+
+def test_cli_fallback_runs_the_configured_model(stub_server, use_client, monkeypatch):
+    use_client(OllamaClient(host=host_of(stub_server), model="mistral"))
+    commands = []
+    def fake_run(args, **kwargs):
+        commands.append(args)
+        return subprocess.CompletedProcess(args, 0, stdout=CANNED_RESPONSE, stderr="")
+    monkeypatch.setattr(ai_engine.subprocess, "run", fake_run)
+    assert "error" not in ai_engine.analyze_with_llama("prompt")
+    assert commands[0][:3] == ["ollama", "run", "mistral"]
+    assert ai_engine._model_name("llama") == "ollama:mistral"
+
+def test_stream_cli_fallback_runs_the_configured_model(stub_server, use_client, monkeypatch):
+    use_client(OllamaClient(host=host_of(stub_server), model="mistral"))
+    calls = fake_cli(monkeypatch, "print('cli output')")
+    assert "".join(ai_engine._stream_llama("prompt")) == "cli output\n"
+    assert calls[0][:3] == ["ollama", "run", "mistral"]
+
+def test_stream_cli_timeout_is_reported_as_a_timeout(use_client, monkeypatch, tmp_path):
+    use_client(OllamaClient(host=unused_host(), connect_timeout=1))
+    monkeypatch.setattr(ai_engine, "LLAMA_CLI_TIMEOUT", 0.5)
+    fake_cli(monkeypatch, "import time; print('partial', flush=True); time.sleep(10)")
+    with pytest.raises(subprocess.TimeoutExpired):
+        list(ai_engine._stream_llama("prompt"))
+    
+    monkeypatch.setattr(ai_engine, "analysis_cache", AnalysisCache(disk_dir=str(tmp_path)))
+    events = list(ai_engine.stream_market_analysis("BTC", 100.0, 105.0, 95.0, 1e6, {"overall": "Neutral", "score": 0},
+                                                   price_history=[100.0 + i for i in range(30)]))
+    assert events[-1] == {"type": "done", "result": {"error": "Analysis timeout - service busy"}}
@@ -0,0 +1,32 @@
+from collections import Counter
+import services.page_data as page_data
+from services.data_fetch import CacheManager
+
+def test_refresh_drops_only_the_watchlist_quotes(monkeypatch):
+    fetches = Counter()
+
+    def fake_quote(symbol):
+        fetches[symbol] += 1
+        return {"symbol": symbol, "current_price": float(fetches[symbol])}
+
+    monkeypatch.setattr(page_data, "get_crypto_data", fake_quote)
+    monkeypatch.setattr(page_data, "get_stock_data", fake_quote)
+    for coin_id in ("refresh-coin", "other-coin"):
+        page_data.load_crypto_data(coin_id)
+    for ticker in ("RFSH", "OTHR"):
+        page_data.load_stock_data(ticker)
+
+    page_data.refresh_market_data(["refresh-coin"], ["RFSH"])
+    assert page_data.load_crypto_data("refresh-coin")["current_price"] == 2.0
+    assert page_data.load_stock_data("RFSH")["current_price"] == 2.0
+    assert page_data.load_crypto_data("other-coin")["current_price"] == 1.0
+    assert page_data.load_stock_data("OTHR")["current_price"] == 1.0
+
+def test_refresh_invalidates_the_fetcher_cache():
+    for key in ("crypto_refresh-coin", "crypto_other-coin", "stock_RFSH", "stock_OTHR"):
+        CacheManager.set(key, {"current_price": 1.0}, "crypto")
+
+    page_data.refresh_market_data(["Refresh-Coin"], ["rfsh"])
+    assert CacheManager.get("crypto_refresh-coin") is None
+    assert CacheManager.get("stock_RFSH") is None
+    assert CacheManager.get("crypto_other-coin") and CacheManager.get("stock_OTHR")
@@ -0,0 +1,54 @@
+import pytest
+from services import ai_engine
+from services.analysis_cache import AnalysisCache
+
+BATCH_ANSWER = """ASSET: BTC
+RECOMMENDATION: Buy
+Confidence: 70%
+
+ASSET: ETH
+RECOMMENDATION: Hold
+Confidence: 60%
+"""
+
+@pytest.fixture
+def model_calls(monkeypatch, tmp_path):
+    """Fresh analysis cache and a fake Llama that answers every batch with BATCH_ANSWER"""
+    monkeypatch.setattr(ai_engine, "analysis_cache", AnalysisCache(disk_dir=str(tmp_path)))
+    calls = []
+    def fake_complete(prompt, enhanced_context=None):
+        calls.append(prompt)
+        return {"analysis": BATCH_ANSWER}
+    monkeypatch.setattr(ai_engine, "complete_with_llama", fake_complete)
+    return calls
+
+def asset(symbol, price):
+    return {
+        "symbol": symbol,
+        "crypto_data": {"price": price, "high_24h": price * 1.02, "low_24h": price * 0.98, "volume_24h": 1e9},
+        "news_data": [],
+        "price_history": [price * (1 + 0.001 * i) for i in range(60)]
+    }
+
+ASSETS = [asset("BTC", 60000.0), asset("ETH", 3000.0)]
+
+@pytest.mark.parametrize("batch_size", [0, -1])
+def test_non_positive_batch_size_still_analyzes_every_asset(model_calls, batch_size):
+    results = ai_engine.portfolio_market_analysis(ASSETS, batch_size=batch_size)
+    assert set(results) == {"BTC", "ETH"}
+    assert all("error" not in result for result in results.values())
+    assert len(model_calls) == 2  # One asset per batch
+
+def test_batched_answers_are_not_served_to_single_asset_analysis(model_calls):
+    ai_engine.portfolio_market_analysis(ASSETS)
+    assert len(model_calls) == 1
+    
+    # Same snapshot through ai_market_analysis: must not reuse the compact batch answer
+    btc = ASSETS[0]
+    ai_engine.ai_market_analysis(btc["symbol"], crypto_data=btc["crypto_data"], stock_data=None,
+                                 news_data=btc["news_data"], price_history=btc["price_history"])
+    assert len(model_calls) == 2
+    
+    # The portfolio is still served from its own entries
+    ai_engine.portfolio_market_analysis(ASSETS)
+    assert len(model_calls) == 2
@@ -0,0 +1,50 @@
+import os
+from services.report_batch import analysis_failure, generate_reports
+
+def analysis(symbol, technical="Price holds above the 20-day SMA."):
+    return {
+        "symbol": symbol,
+        "recommendation": "Buy",
+        "risk": "5/10",
+        "confidence_score": "70%",
+        "technical_analysis": technical,
+        "fundamental_analysis": "",
+        "full_analysis": technical or "Analysis timeout - service busy",
+        "raw_data": {"symbol": symbol, "price": 100.0, "high": 105.0, "low": 95.0, "volume": 1e6,
+                     "asset_type": "Cryptocurrency"}
+    }
+
+def test_analysis_failure():
+    assert analysis_failure(analysis("BTC")) is None
+    assert analysis_failure({}) == "No analysis"
+    assert analysis_failure({"error": "No valid AI engine selected"}) == "No valid AI engine selected"
+    assert "service busy" in analysis_failure(analysis("BTC", technical=""))
+
+def test_failed_analyses_produce_no_pdf(tmp_path):
+    analyses = {
+        "BTC": analysis("BTC"),
+        "ETH": analysis("ETH", technical=""),
+        "SOL": {"error": "No valid AI engine selected"}
+    }
+    results = generate_reports(analyses, output_dir=str(tmp_path), workers=1)
+    assert [r["symbol"] for r in results] == ["BTC", "ETH", "SOL"]
+    assert "error" not in results[0] and os.path.getsize(results[0]["file"]) > 0
+    assert "error" in results[1] and "error" in results[2]
+    assert len(os.listdir(tmp_path)) == 1
+
+def test_in_process_batch_keeps_the_matplotlib_backend(tmp_path):
+    import matplotlib
+    backend = matplotlib.get_backend()
+    generate_reports({"BTC": analysis("BTC")}, output_dir=str(tmp_path), workers=1)
+    assert matplotlib.get_backend() == backend
+
+def test_pdf_render_failure_is_an_error_not_a_text_report(tmp_path, monkeypatch):
+    import services.report_gen as report_gen
+
+    def broken_render(*args, **kwargs):
+        raise RuntimeError("font metrics missing")
+
+    monkeypatch.setattr(report_gen, "render_pdf_report", broken_render)
+    [result] = generate_reports({"BTC": analysis("BTC")}, output_dir=str(tmp_path), workers=1)
+    assert result["error"] == "font metrics missing"
+    assert os.listdir(tmp_path) == []
@@ -0,0 +1,156 @@
+import re
+import fpdf
+import pytest
+import services.report_gen as report_gen
+from services.report_gen import PdfFragment, _build_pdf_report, _new_report_pdf, get_report_layout
+from services.report_model import ReportModel
+
+# Operators that change the font or fill colour, and the q/Q graphics-state stack
+_STATE_OPERATORS = re.compile(
+    r"(?<![\w.])(?P<push>q)(?!\w)|(?<![\w.])(?P<pop>Q)(?!\w)"
+    r"|/F(?P<font>\d+) (?P<size>[\d.]+) Tf"
+    r"|(?P<fill>[\d.]+ [\d.]+ [\d.]+ rg|(?<![\d.])[\d.]+ g)(?!\w)"
+)
+
+def rendered_state(operators):
+    """Font (index, size) and fill colour in effect at the end of a page content stream"""
+    state = {"font": None, "fill": "0 g"}
+    stack = []
+    for match in _STATE_OPERATORS.finditer(operators):
+        if match["push"]:
+            stack.append(dict(state))
+        elif match["pop"]:
+            state = stack.pop()
+        elif match["font"]:
+            state["font"] = (int(match["font"]), float(match["size"]))
+        elif match["fill"]:
+            state["fill"] = match["fill"]
+    assert not stack, "unbalanced q/Q"
+    return state
+
+def tracked_state(pdf):
+    """The font and fill colour FPDF believes are current"""
+    return {"font": (pdf.current_font["i"], pdf.font_size_pt), "fill": pdf.fill_color}
+
+def assert_state_in_sync(pdf):
+    """What the next cell is drawn with must be what FPDF tracks, or it skips needed operators"""
+    assert rendered_state(pdf.pages[pdf.page]) == tracked_state(pdf)
+
+def fragments():
+    layout = get_report_layout()
+    return {"title": layout.title_block, "disclaimer": layout.disclaimer,
+            **{f"header {title}": fragment for title, fragment in layout.section_headers.items()}}
+
+def test_fpdf_version():
+    # PdfFragment writes FPDF 1.7 page buffers and state attributes directly
+    assert fpdf.FPDF_VERSION.startswith("1.7")
+
+def test_fragment_fonts_match_report_documents():
+    scratch, report = _new_report_pdf(), _new_report_pdf()
+    assert {key: font["i"] for key, font in scratch.fonts.items()} == \
+           {key: font["i"] for key, font in report.fonts.items()}
+    for fragment in fragments().values():
+        for index in re.findall(r"/F(\d+) ", fragment.operators):
+            assert int(index) <= len(report.fonts)
+
+@pytest.mark.parametrize("name", list(fragments()))
+def test_place_matches_drawing_directly(name):
+    fragment = fragments()[name]
+    layout = get_report_layout()
+    draw = {"title": report_gen._draw_title_block, "disclaimer": report_gen._draw_disclaimer}.get(name)
+    if draw is None:
+        title = name.split(" ", 1)[1]
+        draw = lambda pdf: report_gen._draw_section_header(title, pdf)
+
+    placed, direct = _new_report_pdf(), _new_report_pdf()
+    for pdf in (placed, direct):
+        pdf.add_page()
+        pdf.set_font("Arial", "", 12)
+        pdf.set_y(60)
+    fragment.place(placed)
+    draw(direct)
+
+    for attribute in ("page", "x", "y", "font_family", "font_style", "font_size_pt",
+                      "fill_color", "text_color", "color_flag"):
+        assert getattr(placed, attribute) == pytest.approx(getattr(direct, attribute)), attribute
+    assert layout is get_report_layout()
+
+@pytest.mark.parametrize("name", list(fragments()))
+@pytest.mark.parametrize("font", [("Arial", "", 12), ("Arial", "B", 16), ("Arial", "I", 10)])
+def test_stream_state_after_place_matches_tracked_state(name, font):
+    fragment = fragments()[name]
+    pdf = _new_report_pdf()
+    pdf.add_page()
+    pdf.set_font(*font)
+    pdf.set_fill_color(240, 240, 240)
+    fragment.place(pdf)
+    assert_state_in_sync(pdf)
+
+@pytest.mark.parametrize("name", ["title", "header TECHNICAL ANALYSIS", "disclaimer"])
+@pytest.mark.parametrize("gap", [-1.0, 0.0, 1.0, 5.0])
+def test_place_near_a_page_break(name, gap):
+    fragment = fragments()[name]
+    pdf = _new_report_pdf()
+    pdf.add_page()
+    pdf.set_font("Arial", "I", 10)
+    pdf.set_y(pdf.page_break_trigger - fragment.height + gap)
+    fits = pdf.y + fragment.height <= pdf.page_break_trigger
+    fragment.place(pdf)
+
+    if fits:
+        assert pdf.page == 1
+    else:
+        assert pdf.page == 2
+        assert pdf.y == pytest.approx(pdf.t_margin + fragment.height)
+        assert fragment.operators in pdf.pages[2]
+        assert fragment.operators not in pdf.pages[1]
+    assert pdf.y <= pdf.page_break_trigger
+    assert_state_in_sync(pdf)
+
+def report_analysis(paragraphs):
+    text = " ".join(["Price holds above the 20-day SMA with rising volume."] * 6)
+    return {
+        "symbol": "BTC",
+        "recommendation": "Buy",
+        "risk": "5/10",
+        "confidence_score": "70%",
+        "technical_analysis": "\n".join([text] * paragraphs),
+        "fundamental_analysis": "\n".join([text] * paragraphs),
+        "full_analysis": text,
+        "raw_data": {"symbol": "BTC", "price": 100.0, "high": 105.0, "low": 95.0, "volume": 1e6,
+                     "asset_type": "Cryptocurrency"}
+    }
+
+def test_long_reports_place_headers_within_the_page(monkeypatch):
+    placements = []
+    place = PdfFragment.place
+
+    def recording_place(fragment, pdf):
+        place(fragment, pdf)
+        placements.append((pdf.page, pdf.y - fragment.height, pdf.y, pdf.page_break_trigger, pdf.t_margin))
+
+    monkeypatch.setattr(PdfFragment, "place", recording_place)
+    # Growing sections move the following headers through every offset on the page
+    for paragraphs in range(1, 16):
+        placements.clear()
+        model = ReportModel(report_analysis(paragraphs), [], include_charts=False)
+        pdf = _build_pdf_report(model)
+        assert pdf.page >= 3
+        assert len(placements) == len(model.included) + 2
+        assert len({page for page, *_ in placements}) >= 3
+        for page, top, bottom, trigger, margin in placements:
+            assert margin <= top and bottom <= trigger
+        assert_state_in_sync(pdf)
+
+def test_fragment_selects_its_own_font():
+    # Drawn in the font the scratch document was left in, so FPDF would skip the Tf
+    plain = PdfFragment(lambda pdf: (pdf.set_font("Arial", "", 12), pdf.cell(0, 10, "Plain", ln=True)))
+    for fragment in [plain, *fragments().values()]:
+        first_text = fragment.operators.index(" Tj")
+        assert " Tf" in fragment.operators[:first_text]
+
+    pdf = _new_report_pdf()
+    pdf.add_page()
+    pdf.set_font("Arial", "B", 16)
+    plain.place(pdf)
+    assert_state_in_sync(pdf)
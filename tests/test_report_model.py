@@ -0,0 +1,46 @@
+import json
+import pytest
+from services.report_model import ReportModel, render_report, report_formats
+
+NEWS = [{"title": "ETF inflows continue", "source": "Wire", "date": "2024-05-01",
+         "description": "Spot ETFs took in more capital.", "url": "https://example.com/etf"}]
+
+def analysis_page_result(raw_sentiment="Positive"):
+    """ai_market_analysis output as the Analysis page stores it, market_sentiment being a label"""
+    raw_data = {"symbol": "BTC", "price": 100.0, "high": 105.0, "low": 95.0, "volume": 1e6,
+                "market_cap": 2e12, "asset_type": "Cryptocurrency"}
+    if raw_sentiment is not None:
+        raw_data["sentiment"] = raw_sentiment
+    return {
+        "symbol": "BTC",
+        "recommendation": "Buy",
+        "risk": "5/10",
+        "confidence_score": "70%",
+        "technical_analysis": "Price holds above the 20-day SMA.",
+        "fundamental_analysis": "Liquidity is deep.",
+        "technical_indicators": {"rsi": 55.0, "volatility_percent": 20.0},
+        "raw_data": raw_data,
+        "market_sentiment": "Bullish",
+        "sentiment_score": 0.4,
+        "price_change_24h": 1.5,
+        "volatility_percent": 20.0
+    }
+
+@pytest.mark.parametrize("fmt", report_formats())
+def test_analysis_page_result_renders_news_sentiment(fmt):
+    for raw_sentiment in ("Positive", None):
+        model = ReportModel(analysis_page_result(raw_sentiment), NEWS, sections=["News Sentiment"],
+                            include_charts=False)
+        assert render_report(model, fmt)
+
+def test_news_sentiment_sources():
+    def sentiment(analysis):
+        return ReportModel(analysis, NEWS, include_charts=False).section("News Sentiment")["sentiment"]
+
+    assert sentiment(analysis_page_result("Positive")) == "Positive"
+    assert sentiment(analysis_page_result(None)) == "Bullish"
+    assert sentiment(dict(analysis_page_result(None), market_sentiment={"overall": "Bearish"})) == "Bearish"
+    assert sentiment(dict(analysis_page_result(None), market_sentiment=None)) == "Neutral"
+
+    model = ReportModel(analysis_page_result(None), NEWS, sections=["News Sentiment"], include_charts=False)
+    assert "Bullish" in json.dumps(json.loads(render_report(model, "json")))
@@ -0,0 +1,31 @@
+from services.ai_engine import StreamingSectionParser, parse_structured_response
+
+RESPONSE = """TECHNICAL ANALYSIS:
+Model confidence in the trend is 40% given thin volume.
+
+RECOMMENDATION: Buy
+Confidence: 75%
+
+KEY SUPPORT/RESISTANCE:
+Support at $42,000, resistance at 45000.
+"""
+
+def test_levels_stop_before_trailing_punctuation():
+    components = parse_structured_response(RESPONSE)
+    assert components["support_level"] == "$42,000"
+    assert components["resistance_level"] == "45000"
+
+def test_levels_keep_thousands_groups_and_decimals():
+    components = parse_structured_response("KEY SUPPORT/RESISTANCE:\nSupport 1,250.50; resistance $1,310.\n")
+    assert components["support_level"] == "1,250.50"
+    assert components["resistance_level"] == "$1,310"
+
+def test_confidence_comes_from_the_recommendation():
+    assert parse_structured_response(RESPONSE)["confidence_score"] == "75%"
+
+def test_streamed_confidence_comes_from_the_recommendation():
+    parser = StreamingSectionParser()
+    for i in range(0, len(RESPONSE), 7):
+        parser.feed(RESPONSE[i:i + 7])
+    parser.close()
+    assert parser.components()["confidence_score"] == "75%"
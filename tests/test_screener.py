@@ -0,0 +1,69 @@
+import threading
+import numpy as np
+import pandas as pd
+import services.screener as screener
+import services.data_fetch as data_fetch
+from services.screener import MarketScreener, ScreenerTable
+
+def quote(symbol, asset_type, interval, volume, market_cap=None, bars=60):
+    closes = list(100 + np.cumsum(np.random.default_rng(len(symbol)).normal(size=bars)))
+    return {"symbol": symbol, "asset_type": asset_type, "current_price": closes[-1], "change_pct": 1.0,
+            "volume": volume, "market_cap": market_cap, "closes": closes, "interval": interval}
+
+def test_rsi_is_kept_per_bar_interval():
+    table = ScreenerTable.from_quotes([
+        quote("BTC", "crypto", "1h", 3e10, 1e12, bars=168),
+        quote("AAPL", "stock", "1d", 1e10)
+    ])
+    btc, aapl = table.records(range(2))
+    assert btc["rsi_hourly"] is not None and btc["rsi_daily"] is None
+    assert aapl["rsi_daily"] is not None and aapl["rsi_hourly"] is None
+    assert list(table.query(filters={"rsi_daily": (0, 100)})) == [1]
+
+def test_default_sort_ranks_equities_with_coins():
+    quotes = [quote(f"C{i}", "crypto", "1h", 1e6 * i, 1e9 * i) for i in range(1, 50)]
+    quotes.append(quote("AAPL", "stock", "1d", 1e10))
+    table = ScreenerTable.from_quotes(quotes)
+    assert table.records(table.query(limit=1))[0]["symbol"] == "AAPL"
+
+def test_bulk_stock_volume_is_in_dollars(monkeypatch):
+    index = pd.date_range("2024-01-01", periods=3)
+    bars = pd.concat({"Close": pd.DataFrame({"AAPL": [10.0, 11.0, 12.0]}, index=index),
+                      "Volume": pd.DataFrame({"AAPL": [1e6, 2e6, 3e6]}, index=index)}, axis=1)
+    monkeypatch.setattr(data_fetch.yf, "download", lambda *args, **kwargs: bars)
+    [aapl] = data_fetch.get_bulk_stock_quotes(["AAPL"])
+    assert aapl["volume"] == 12.0 * 3e6
+    assert aapl["interval"] == "1d"
+
+def test_empty_screener_backs_off_between_attempts(monkeypatch):
+    calls = []
+    monkeypatch.setattr(screener, "get_top_crypto_markets", lambda limit: calls.append(limit) or [])
+    monkeypatch.setattr(screener, "get_bulk_stock_quotes", lambda tickers: [])
+    feed = MarketScreener(top_coins=5, stock_universe=["AAPL"], refresh_seconds=3600, retry_seconds=3600)
+    for _ in range(3):
+        feed.ensure_fresh()
+    assert calls == [5]
+    assert feed.last_error
+
+    feed.last_attempt -= 3600
+    feed.ensure_fresh()
+    assert calls == [5, 5]
+
+def screener_threads():
+    return sum(thread.name == "market-screener" for thread in threading.enumerate())
+
+def test_concurrent_start_runs_one_refresh_thread():
+    feed = MarketScreener(refresh_seconds=3600)
+    before = screener_threads()
+    barrier = threading.Barrier(8)
+
+    def start():
+        barrier.wait()
+        feed.start()
+
+    threads = [threading.Thread(target=start) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(5)
+    assert screener_threads() - before == 1
@@ -0,0 +1,43 @@
+import json
+import threading
+from services.ai_engine import SentimentCache
+
+def test_save_is_throttled(tmp_path):
+    path = tmp_path / "sentiment.json"
+    cache = SentimentCache(persist_path=str(path), save_interval=3600)
+    cache.set("first", 0.5, 0.1)
+    cache.save()
+    cache.set("second", -0.5, 0.2)
+    cache.save()  # Within the interval: skipped
+    assert len(json.loads(path.read_text())) == 1
+    cache.save(force=True)
+    assert len(json.loads(path.read_text())) == 2
+
+def test_concurrent_savers_share_one_file(tmp_path):
+    path = tmp_path / "sentiment.json"
+    caches = [SentimentCache(persist_path=str(path), save_interval=0) for _ in range(8)]
+    errors = []
+
+    def save_repeatedly(cache, n):
+        try:
+            for i in range(50):
+                cache.set(f"text {n} {i}", 0.1, 0.1)
+                cache.save(force=True)
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=save_repeatedly, args=(cache, n)) for n, cache in enumerate(caches)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert errors == []
+    assert len(json.loads(path.read_text())) == 50
+    assert [p.name for p in tmp_path.iterdir()] == ["sentiment.json"]
+
+def test_reload(tmp_path):
+    path = tmp_path / "sentiment.json"
+    cache = SentimentCache(persist_path=str(path))
+    cache.set("text", 0.25, 0.75)
+    cache.save(force=True)
+    assert SentimentCache(persist_path=str(path)).get("text") == (0.25, 0.75)